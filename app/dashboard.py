@@ -8,8 +8,17 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import sys
 from pathlib import Path
 
+# Agregar src al path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from almacen_series import abrir_almacen_series, matrices_semana_ano, matriz_ano_semana, matriz_semanas
+from calendario_epi import fecha_inicio_semana
+from cubo import cargar_cubo, filtrar_cubo, contar_casos
+from ingestion import listar_particiones, leer_dataset_particionado, cargar_datos_procesados
+
 # ============================================================================
 # CONFIGURACIÓN DE PÁGINA
 # ============================================================================
@@ -393,13 +402,18 @@ st.markdown("""
 # FUNCIONES DE CARGA DE DATOS
 # ============================================================================
 
+RUTA_PROCESADOS = Path(__file__).parent.parent / 'data' / 'processed'
+RUTA_DATASET = RUTA_PROCESADOS / 'dengue_loreto_limpio'
+RUTA_CUBO = RUTA_PROCESADOS / 'dengue_loreto_cubo.parquet'
+RUTA_ALMACEN = RUTA_PROCESADOS / 'dengue_loreto_series'
+
+
 @st.cache_data
 def cargar_datos():
-    """Carga los datos procesados"""
-    base_path = Path(__file__).parent.parent
-    
-    df_limpio = pd.read_csv(base_path / 'data' / 'processed' / 'dengue_loreto_limpio.csv')
-    df_serie = pd.read_csv(base_path / 'data' / 'processed' / 'dengue_loreto_serie_temporal.csv')
+    """Carga los datos procesados (formato más rápido disponible, con suma de verificación)"""
+    df_limpio = cargar_datos_procesados(RUTA_PROCESADOS / 'dengue_loreto_limpio.csv')
+    df_serie = cargar_datos_procesados(RUTA_PROCESADOS / 'dengue_loreto_serie_temporal.csv',
+                                       compacto=False)
     
     if 'fecha' in df_limpio.columns:
         df_limpio['fecha'] = pd.to_datetime(df_limpio['fecha'])
@@ -407,6 +421,56 @@ def cargar_datos():
     return df_limpio, df_serie
 
 
+@st.cache_data
+def cargar_serie():
+    """Carga la serie temporal semanal"""
+    return cargar_datos_procesados(RUTA_PROCESADOS / 'dengue_loreto_serie_temporal.csv', compacto=False)
+
+
+@st.cache_data
+def cargar_particiones():
+    """Lista las particiones (ano, provincia) del dataset procesado, o None si no existe"""
+    if not RUTA_DATASET.exists():
+        return None
+    particiones = listar_particiones(RUTA_DATASET)
+    return particiones.drop(columns='ruta') if not particiones.empty else None
+
+
+@st.cache_data
+def cargar_cubo_casos():
+    """Carga el cubo de casos preagregado, o None si no existe"""
+    return cargar_cubo(RUTA_CUBO)
+
+
+@st.cache_resource
+def cargar_almacen_series():
+    """Abre el almacén de series semanales (memoria mapeada), o None si no existe"""
+    return abrir_almacen_series(RUTA_ALMACEN)
+
+
+@st.cache_data
+def cargar_matrices_semanas():
+    """Matrices semana x año de la región y de cada provincia y distrito, en una pasada sobre el cubo
+    (solo la región si no hay cubo)"""
+    cubo = cargar_cubo_casos()
+    if cubo is not None:
+        return matrices_semana_ano(cubo, ['provincia', 'distrito'])
+    return matrices_semana_ano(cargar_serie())
+
+
+@st.cache_data
+def cargar_casos_filtrados(ano_min, ano_max, provincia):
+    """Carga solo las particiones del rango de años y la provincia seleccionados"""
+    provincias = None if provincia == 'Todas' else [provincia]
+    df = leer_dataset_particionado(RUTA_DATASET, anos=range(ano_min, ano_max + 1),
+                                   provincias=provincias)
+    
+    if 'fecha' in df.columns:
+        df['fecha'] = pd.to_datetime(df['fecha'])
+    
+    return df
+
+
 # ============================================================================
 # COMPONENTES UI
 # ============================================================================
@@ -534,11 +598,7 @@ def get_plotly_theme():
 
 def grafico_serie_temporal(df_serie):
     """Serie temporal"""
-    df_serie['fecha'] = pd.to_datetime(
-        df_serie['ano'].astype(str) + '-W' + df_serie['semana'].astype(str).str.zfill(2) + '-1',
-        format='%Y-W%W-%w',
-        errors='coerce'
-    )
+    df_serie['fecha'] = fecha_inicio_semana(df_serie['ano'], df_serie['semana'])
     
     fig = go.Figure()
     
@@ -567,8 +627,8 @@ def grafico_serie_temporal(df_serie):
 
 
 def grafico_casos_por_ano(df):
-    """Gráfico de barras por año"""
-    casos_ano = df.groupby('ano').size().reset_index(name='casos')
+    """Gráfico de barras por año (registros o cubo de casos)"""
+    casos_ano = contar_casos(df, 'ano').sort_index().rename('casos').reset_index()
     
     fig = px.bar(
         casos_ano,
@@ -595,9 +655,11 @@ def grafico_casos_por_ano(df):
 
 
 def grafico_casos_por_provincia(df):
-    """Gráfico horizontal de provincias"""
-    casos_provincia = df['provincia'].value_counts().reset_index()
+    """Gráfico horizontal de provincias (registros o cubo de casos)"""
+    casos_provincia = contar_casos(df, 'provincia').reset_index()
     casos_provincia.columns = ['provincia', 'casos']
+    # Las categorías sin casos tras el filtrado no se muestran
+    casos_provincia = casos_provincia[casos_provincia['casos'] > 0]
     
     fig = px.bar(
         casos_provincia,
@@ -648,9 +710,10 @@ def grafico_distribucion_edad(df):
 
 
 def grafico_casos_por_sexo(df):
-    """Gráfico de pastel por sexo"""
-    casos_sexo = df['sexo'].value_counts().reset_index()
+    """Gráfico de pastel por sexo (registros o cubo de casos)"""
+    casos_sexo = contar_casos(df, 'sexo').reset_index()
     casos_sexo.columns = ['sexo', 'casos']
+    casos_sexo = casos_sexo[casos_sexo['casos'] > 0]
     casos_sexo['sexo'] = casos_sexo['sexo'].map({'F': 'Femenino', 'M': 'Masculino'})
     
     fig = px.pie(
@@ -676,15 +739,26 @@ def grafico_casos_por_sexo(df):
     return fig
 
 
-def grafico_mapa_calor(df_serie):
-    """Mapa de calor año x semana"""
-    pivot = df_serie.pivot_table(
-        values='casos',
-        index='semana',
-        columns='ano',
-        aggfunc='sum',
-        fill_value=0
-    )
+def grafico_mapa_calor(df_serie, almacen=None, ano_min=None, ano_max=None, provincia=None, matrices=None,
+                       distrito=None):
+    """Mapa de calor año x semana de la región, de la provincia seleccionada o
+    de un distrito de esa provincia (del almacén de series o de las matrices
+    semana x año precalculadas; los distritos se buscan por (provincia, distrito))"""
+    if provincia in (None, 'Todas'):
+        nivel, nombre = 'region', None
+    elif distrito is not None:
+        nivel, nombre = 'distrito', (provincia, distrito)
+    else:
+        nivel, nombre = 'provincia', provincia
+    
+    if almacen is not None:
+        pivot = matriz_ano_semana(almacen, nivel, nombre, ano_min=ano_min, ano_max=ano_max)
+    else:
+        if matrices is None:
+            matrices = matrices_semana_ano(df_serie, ano_min=ano_min, ano_max=ano_max)
+        if (nivel, nombre) not in matrices['filas']:
+            nivel, nombre = 'region', None
+        pivot = matriz_semanas(matrices, nivel, nombre).loc[:, ano_min:ano_max]
     
     fig = px.imshow(
         pivot,
@@ -707,8 +781,13 @@ def grafico_mapa_calor(df_serie):
 # SIDEBAR
 # ============================================================================
 
-def render_sidebar(df):
-    """Renderiza el sidebar con filtros"""
+def render_sidebar(df, particionado=False):
+    """
+    Renderiza el sidebar con filtros.
+    
+    Con `particionado=True`, `df` es el listado de particiones (ano, provincia)
+    y los filtros se aplican como poda de particiones al cargar los casos.
+    """
     with st.sidebar:
         st.markdown("""
             <div class="sidebar-header">
@@ -741,10 +820,13 @@ def render_sidebar(df):
         )
         
         # Aplicar filtros
-        df_filtrado = df[(df['ano'] >= ano_min) & (df['ano'] <= ano_max)]
-        
-        if provincia_seleccionada != 'Todas':
-            df_filtrado = df_filtrado[df_filtrado['provincia'] == provincia_seleccionada]
+        if particionado:
+            df_filtrado = cargar_casos_filtrados(int(ano_min), int(ano_max), provincia_seleccionada)
+        else:
+            df_filtrado = df[(df['ano'] >= ano_min) & (df['ano'] <= ano_max)]
+            
+            if provincia_seleccionada != 'Todas':
+                df_filtrado = df_filtrado[df_filtrado['provincia'] == provincia_seleccionada]
         
         # Info de registros filtrados
         st.markdown(f"""
@@ -770,12 +852,26 @@ def main():
     # Info institucional
     render_info_institucional()
     
-    # Cargar datos
+    # Cargar datos (con dataset particionado solo se listan las particiones)
     with st.spinner('Cargando datos...'):
-        df_limpio, df_serie = cargar_datos()
+        particiones = cargar_particiones()
+        if particiones is not None:
+            df_limpio, df_serie = particiones, cargar_serie()
+        else:
+            df_limpio, df_serie = cargar_datos()
     
     # Sidebar con filtros
-    df_filtrado, ano_min, ano_max, provincia = render_sidebar(df_limpio)
+    df_filtrado, ano_min, ano_max, provincia = render_sidebar(
+        df_limpio, particionado=particiones is not None
+    )
+    
+    # Los conteos por año, provincia, distrito y sexo se suman sobre el cubo
+    cubo = cargar_cubo_casos()
+    if cubo is not None:
+        conteos = filtrar_cubo(cubo, int(ano_min), int(ano_max),
+                               None if provincia == 'Todas' else [provincia])
+    else:
+        conteos = df_filtrado
     
     # Alerta de filtros
     render_filter_alert(provincia, ano_min, ano_max)
@@ -806,7 +902,7 @@ def main():
             st.plotly_chart(fig_serie, use_container_width=True)
         
         with col2:
-            fig_ano = grafico_casos_por_ano(df_filtrado)
+            fig_ano = grafico_casos_por_ano(conteos)
             st.plotly_chart(fig_ano, use_container_width=True)
         
         # Estadísticas
@@ -816,8 +912,9 @@ def main():
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            ano_max_casos = df_filtrado['ano'].value_counts().idxmax()
-            casos_max = df_filtrado['ano'].value_counts().max()
+            casos_por_ano = contar_casos(conteos, 'ano')
+            ano_max_casos = casos_por_ano.idxmax()
+            casos_max = casos_por_ano.max()
             st.metric("Año con Más Casos", ano_max_casos, f"{casos_max:,} casos")
         
         with col2:
@@ -834,13 +931,14 @@ def main():
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            fig_provincia = grafico_casos_por_provincia(df_filtrado)
+            fig_provincia = grafico_casos_por_provincia(conteos)
             st.plotly_chart(fig_provincia, use_container_width=True)
         
         with col2:
             st.markdown("### Top 10 Distritos")
-            top_distritos = df_filtrado['distrito'].value_counts().head(10).reset_index()
+            top_distritos = contar_casos(conteos, 'distrito').head(10).reset_index()
             top_distritos.columns = ['Distrito', 'Casos']
+            top_distritos = top_distritos[top_distritos['Casos'] > 0]
             
             st.dataframe(
                 top_distritos,
@@ -859,7 +957,7 @@ def main():
             st.plotly_chart(fig_edad, use_container_width=True)
         
         with col2:
-            fig_sexo = grafico_casos_por_sexo(df_filtrado)
+            fig_sexo = grafico_casos_por_sexo(conteos)
             st.plotly_chart(fig_sexo, use_container_width=True)
         
         # Estadísticas demográficas
@@ -883,8 +981,22 @@ def main():
     with tab4:
         st.markdown("<br>", unsafe_allow_html=True)
         
+        almacen = cargar_almacen_series()
+        matrices = None if almacen is not None else cargar_matrices_semanas()
+        
+        # Distritos de la provincia seleccionada, por (provincia, distrito)
+        distrito = None
+        if provincia != 'Todas':
+            filas = (almacen or matrices)['filas']
+            distritos = sorted(nombre[1] for nivel, nombre in filas
+                               if nivel == 'distrito' and nombre[0] == provincia)
+            seleccion = st.selectbox("Distrito", ['Todos'] + distritos, key='distrito_mapa_calor')
+            distrito = None if seleccion == 'Todos' else seleccion
+        
         fig_calor = grafico_mapa_calor(
-            df_serie[(df_serie['ano'] >= ano_min) & (df_serie['ano'] <= ano_max)]
+            df_serie[(df_serie['ano'] >= ano_min) & (df_serie['ano'] <= ano_max)],
+            almacen=almacen, ano_min=int(ano_min), ano_max=int(ano_max), provincia=provincia,
+            matrices=matrices, distrito=distrito
         )
         st.plotly_chart(fig_calor, use_container_width=True)
         
@@ -0,0 +1,79 @@
+"""
+Benchmark de la caché Parquet del dataset crudo
+Compara la lectura CSV con la primera carga (conversión) y las cargas con caché
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar src al path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+import pandas as pd
+from cache_datos import cargar_con_cache
+from datos_sinteticos import generar_csv_sintetico
+
+
+def medir(funcion, repeticiones: int = 1) -> float:
+    """Devuelve el mejor tiempo (segundos) de varias ejecuciones"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main():
+    """Función principal del benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ruta', help='CSV crudo a usar (por defecto se genera uno sintetico)')
+    parser.add_argument('--filas', type=int, default=2_000_000, help='Filas del CSV sintetico')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("BENCHMARK - CACHE PARQUET DEL DATASET CRUDO")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.ruta:
+            ruta_csv = Path(args.ruta)
+        else:
+            print(f"\nGenerando CSV sintetico de {args.filas:,} filas...")
+            ruta_csv = generar_csv_sintetico(str(Path(tmp) / 'vigilancia_sintetica.csv'), args.filas)
+        dir_cache = Path(tmp) / 'cache'
+        
+        print(f"Archivo: {ruta_csv} ({ruta_csv.stat().st_size / 1e6:,.1f} MB)")
+        
+        t_csv = medir(lambda: pd.read_csv(ruta_csv, sep=';', encoding='utf-8', low_memory=False),
+                      args.repeticiones)
+        t_frio = medir(lambda: cargar_con_cache(str(ruta_csv), dir_cache=str(dir_cache)))
+        t_tibio = medir(lambda: cargar_con_cache(str(ruta_csv), dir_cache=str(dir_cache)),
+                        args.repeticiones)
+        t_proyeccion = medir(
+            lambda: cargar_con_cache(str(ruta_csv), dir_cache=str(dir_cache),
+                                     columnas=['departamento', 'provincia', 'ano', 'semana']),
+            args.repeticiones
+        )
+        t_filtro = medir(
+            lambda: cargar_con_cache(str(ruta_csv), dir_cache=str(dir_cache),
+                                     filtros=[('departamento', '==', 'LORETO')]),
+            args.repeticiones
+        )
+    
+    print("\n" + "=" * 60)
+    print("RESULTADOS (mejor de varias ejecuciones)")
+    print("=" * 60)
+    print(f"  - CSV (pd.read_csv):              {t_csv:8.2f} s")
+    print(f"  - Cache fria (CSV -> Parquet):    {t_frio:8.2f} s")
+    print(f"  - Cache tibia (Parquet):          {t_tibio:8.2f} s  ({t_csv / t_tibio:.1f}x)")
+    print(f"  - Cache tibia, 4 columnas:        {t_proyeccion:8.2f} s  ({t_csv / t_proyeccion:.1f}x)")
+    print(f"  - Cache tibia, filtro LORETO:     {t_filtro:8.2f} s  ({t_csv / t_filtro:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
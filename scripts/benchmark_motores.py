@@ -0,0 +1,131 @@
+"""
+Benchmark y verificación de paridad de los motores de DataFrame (pandas y Polars)
+Compara la carga con filtro de departamento, la limpieza y la agrupación semanal
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar src al path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+import pandas as pd
+from ingestion import cargar_datos_dengue
+from cleaning import limpiar_datos_fusionado, agrupar_por_semana_epidemiologica
+from esquema import aplicar_esquema
+from motores import MOTORES, leer_csv_polars, validar_motor
+from datos_sinteticos import generar_csv_sintetico
+
+
+COLUMNAS_TEXTO = ['departamento', 'provincia', 'distrito', 'localidad', 'enfermedad']
+
+
+def medir(funcion):
+    """Ejecuta la función sin imprimir sus mensajes y devuelve (resultado, segundos)"""
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def cargar_semanas_nacional(ruta_csv: Path, motor: str) -> pd.DataFrame:
+    """Columnas 'ano' y 'semana' de todo el archivo, con tipos compactos"""
+    if motor == 'polars':
+        df = leer_csv_polars(str(ruta_csv), columnas=['ano', 'semana'])
+    else:
+        df = pd.read_csv(ruta_csv, sep=';', usecols=['ano', 'semana'])
+    return aplicar_esquema(df)
+
+
+def ejecutar_pipeline(ruta_csv: Path, motor: str) -> dict:
+    """Carga Loreto, limpia y agrupa por semana con el motor indicado"""
+    df, t_carga = medir(lambda: cargar_datos_dengue(str(ruta_csv), chunksize=1_000_000,
+                                                    departamento='LORETO', compacto=True,
+                                                    motor=motor))
+    df_limpio, t_limpieza = medir(lambda: limpiar_datos_fusionado(df, COLUMNAS_TEXTO))
+    df_serie, t_agrupacion = medir(lambda: agrupar_por_semana_epidemiologica(df_limpio, motor=motor))
+    
+    # Agrupación nacional: la tabla completa, donde pesa el paralelismo
+    df_nacional, _ = medir(lambda: cargar_semanas_nacional(ruta_csv, motor))
+    df_serie_nacional, t_nacional = medir(lambda: agrupar_por_semana_epidemiologica(df_nacional,
+                                                                                     motor=motor))
+    
+    return {
+        'salidas': {'carga': df, 'limpieza': df_limpio, 'serie': df_serie,
+                    'serie_nacional': df_serie_nacional},
+        'tiempos': {'carga': t_carga, 'limpieza': t_limpieza, 'agrupacion': t_agrupacion,
+                    'agrupacion_nacional': t_nacional}
+    }
+
+
+def verificar_paridad(referencia: dict, otra: dict) -> list:
+    """Compara las salidas de dos motores y devuelve las diferencias encontradas"""
+    diferencias = []
+    for nombre, df_referencia in referencia.items():
+        try:
+            pd.testing.assert_frame_equal(df_referencia.reset_index(drop=True),
+                                          otra[nombre].reset_index(drop=True), check_index_type=False)
+            if nombre in ('carga', 'limpieza'):
+                pd.testing.assert_index_equal(df_referencia.index, otra[nombre].index, exact=False)
+        except AssertionError as e:
+            diferencias.append(f"{nombre}: {e}")
+    return diferencias
+
+
+def main():
+    """Función principal del benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ruta', help='CSV crudo a usar (por defecto se genera uno sintetico)')
+    parser.add_argument('--filas', type=int, default=10_000_000, help='Filas del CSV sintetico')
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("BENCHMARK - MOTORES PANDAS Y POLARS")
+    print("=" * 60)
+    
+    if validar_motor('polars') != 'polars':
+        print("[ERROR] Instale polars para comparar los motores")
+        return 1
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.ruta:
+            ruta_csv = Path(args.ruta)
+        else:
+            print(f"\nGenerando CSV sintetico de {args.filas:,} filas...")
+            ruta_csv = generar_csv_sintetico(str(Path(tmp) / 'vigilancia_sintetica.csv'), args.filas)
+    
+        print(f"Archivo: {ruta_csv} ({ruta_csv.stat().st_size / 1e6:,.1f} MB)")
+    
+        resultados = {}
+        for motor in MOTORES:
+            print(f"Ejecutando motor {motor}...")
+            resultados[motor] = ejecutar_pipeline(ruta_csv, motor)
+    
+    print("\n" + "=" * 60)
+    print("RESULTADOS (segundos)")
+    print("=" * 60)
+    print(f"{'Etapa':<24}" + "".join(f"{motor:>12}" for motor in MOTORES) + f"{'Factor':>10}")
+    for etapa in resultados['pandas']['tiempos']:
+        tiempos = [resultados[motor]['tiempos'][etapa] for motor in MOTORES]
+        print(f"{etapa:<24}" + "".join(f"{t:>12.2f}" for t in tiempos) + f"{tiempos[0] / tiempos[1]:>9.1f}x")
+    
+    print("\n" + "=" * 60)
+    print("PARIDAD DE SALIDAS")
+    print("=" * 60)
+    diferencias = verificar_paridad(resultados['pandas']['salidas'], resultados['polars']['salidas'])
+    for nombre in resultados['pandas']['salidas']:
+        estado = 'DIFERENTE' if any(d.startswith(nombre + ':') for d in diferencias) else 'OK'
+        print(f"  - {nombre:<20} {estado}")
+    for diferencia in diferencias:
+        print(f"\n[ERROR] {diferencia}")
+    
+    return 1 if diferencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Generador de datos sintéticos con el formato del CSV de vigilancia del MINSA
+Se usa en los benchmarks cuando no se dispone del archivo real
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+
+DEPARTAMENTOS = ['LORETO', 'LIMA', 'PIURA', 'TUMBES', 'UCAYALI', 'SAN MARTIN',
+                 'MADRE DE DIOS', 'JUNIN', 'CAJAMARCA', 'AMAZONAS']
+PROVINCIAS = ['MAYNAS', 'ALTO AMAZONAS', 'LORETO', 'MARISCAL RAMON CASTILLA',
+              'REQUENA', 'UCAYALI', 'DATEM DEL MARAÑON', 'PUTUMAYO']
+ENFERMEDADES = ['DENGUE SIN SIGNOS DE ALARMA', 'DENGUE CON SIGNOS DE ALARMA', 'DENGUE GRAVE']
+
+
+def generar_csv_sintetico(ruta_salida: str, n_filas: int, semilla: int = 42,
+                          tamano_bloque: int = 1_000_000) -> Path:
+    """
+    Genera un CSV sintético separado por ';' con las columnas del dataset nacional.
+    
+    Args:
+        ruta_salida: Ruta del CSV a generar
+        n_filas: Número de filas
+        semilla: Semilla aleatoria
+        tamano_bloque: Filas generadas y escritas por bloque
+    
+    Returns:
+        Ruta del archivo generado
+    """
+    rng = np.random.default_rng(semilla)
+    ruta = Path(ruta_salida)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    
+    distritos = np.array([f'DISTRITO {i:02d}' for i in range(1, 54)])
+    localidades = np.array([f'LOCALIDAD {i:04d}' for i in range(1, 2001)])
+    
+    escritas = 0
+    while escritas < n_filas:
+        n = min(tamano_bloque, n_filas - escritas)
+        bloque = pd.DataFrame({
+            'departamento': np.array(DEPARTAMENTOS)[rng.integers(0, len(DEPARTAMENTOS), n)],
+            'provincia': np.array(PROVINCIAS)[rng.integers(0, len(PROVINCIAS), n)],
+            'distrito': distritos[rng.integers(0, len(distritos), n)],
+            'localidad': localidades[rng.integers(0, len(localidades), n)],
+            'enfermedad': np.array(ENFERMEDADES)[rng.integers(0, len(ENFERMEDADES), n)],
+            'ano': rng.integers(2000, 2025, n),
+            'semana': rng.integers(1, 54, n),
+            'diagnostic': 'A97.0',
+            'diresa': rng.integers(1, 26, n),
+            'ubigeo': rng.integers(10101, 250401, n),
+            'edad': rng.integers(0, 100, n),
+            'tipo_edad': 'A',
+            'sexo': np.array(['M', 'F'])[rng.integers(0, 2, n)]
+        })
+        bloque.to_csv(ruta, sep=';', index=False, mode='w' if escritas == 0 else 'a',
+                      header=escritas == 0, encoding='utf-8')
+        escritas += n
+    
+    return ruta
@@ -3,7 +3,9 @@ Script de ejecución de Análisis Exploratorio de Datos (EDA)
 Genera todos los análisis y visualizaciones
 """
 
+import argparse
 import sys
+import time
 from pathlib import Path
 
 # Agregar src al path
@@ -12,20 +14,98 @@ sys.path.append(str(Path(__file__).parent.parent / 'src'))
 import pandas as pd
 from eda import (
     configurar_estilo_graficos,
-    analisis_temporal_anual,
-    analisis_temporal_mensual,
-    analisis_serie_temporal,
-    analisis_geografico,
-    analisis_demografico_edad,
-    analisis_demografico_sexo,
-    mapa_calor_temporal,
+    graficar_casos_por_ano,
+    contar_casos_por_mes,
+    graficar_casos_por_mes,
+    graficar_serie_temporal,
+    graficar_casos_por_ubicacion,
+    contar_edades,
+    graficar_distribucion_edad,
+    graficar_distribucion_sexo,
+    matriz_mapa_calor,
+    graficar_mapa_calor,
+    renderizar_figuras,
     estadisticas_descriptivas,
     generar_reporte_eda
 )
+from almacen_series import abrir_almacen_series
+from artefactos import (
+    REGENERADO,
+    REUTILIZADO,
+    artefacto_vigente,
+    generar_reporte_artefactos,
+    huella_entrada,
+    memoizar_artefactos,
+    registrar_artefacto
+)
+from calendario_epi import fecha_inicio_semana
+from cubo import cargar_cubo, construir_cubo, contar_casos
+from eda_lotes import (
+    NOMBRE_REPORTE_LOTES,
+    SUBNIVELES,
+    generar_paquetes,
+    generar_reporte_lotes,
+    huella_paquete,
+    preparar_paquetes,
+    rutas_paquete
+)
+from ingestion import leer_dataset_particionado, cargar_datos_procesados
+from perfiles_graficos import PERFILES, PERFIL_POR_DEFECTO, ruta_figura
+
+
+def ejecutar_lotes(args, df, df_serie, ruta_viz):
+    """Genera un paquete de EDA (figuras y reporte_eda.txt) por provincia o distrito"""
+    print(f"\n[2/3] Agrupando casos por {args.geografia}...")
+    paquetes = preparar_paquetes(df, df_serie, args.geografia, str(ruta_viz), args.perfil)
+    print(f"Paquetes preparados: {len(paquetes)}")
+    
+    # Solo se regeneran los paquetes cuyos datos agregados o parámetros cambiaron
+    pendientes = []
+    for paquete in paquetes:
+        huella = huella_paquete(paquete)
+        if args.forzar or not all(artefacto_vigente(ruta, huella) for ruta in rutas_paquete(paquete)):
+            pendientes.append((paquete, huella))
+    
+    # Una geografía por tarea; cada proceso reutiliza una sola figura
+    print(f"\n[3/3] Generando {len(pendientes)} de {len(paquetes)} paquetes...")
+    inicio = time.perf_counter()
+    resultados = generar_paquetes([paquete for paquete, _ in pendientes], procesos=args.procesos)
+    segundos = time.perf_counter() - inicio
+    for (paquete, huella), resultado in zip(pendientes, resultados):
+        if resultado['error'] is None:
+            for ruta in rutas_paquete(paquete):
+                registrar_artefacto(ruta, huella)
+    
+    reporte = generar_reporte_lotes(resultados, segundos, reutilizados=len(paquetes) - len(pendientes))
+    print("\n" + reporte)
+    
+    ruta_reporte = ruta_viz / args.geografia / NOMBRE_REPORTE_LOTES
+    ruta_reporte.parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta_reporte, 'w', encoding='utf-8') as f:
+        f.write(reporte)
+    print(f"\n[OK] Reporte del lote guardado en: {ruta_reporte}")
+    
+    print("\n" + "=" * 60)
+    print("PAQUETES DE EDA COMPLETADOS")
+    print("=" * 60)
+    print(f"\nPaquetes generados en: {ruta_viz / args.geografia}")
 
 
 def main():
     """Función principal de EDA"""
+    parser = argparse.ArgumentParser(description="Analisis exploratorio de datos de dengue")
+    parser.add_argument('--procesos', type=int, default=None,
+                        help='Procesos para renderizar las figuras o los paquetes (por defecto uno '
+                             'por tarea, hasta el numero de nucleos; 1 renderiza sin piscina)')
+    parser.add_argument('--perfil', choices=list(PERFILES), default=PERFIL_POR_DEFECTO,
+                        help='Perfil de renderizado: publicacion (PNG a 300 dpi) o borrador '
+                             '(WebP a baja resolucion, para ejecuciones rutinarias)')
+    parser.add_argument('--forzar', action='store_true',
+                        help='Regenerar todas las figuras aunque sus datos no hayan cambiado')
+    parser.add_argument('--geografia', choices=list(SUBNIVELES), default=None,
+                        help='Generar un paquete de EDA (figuras y reporte) por provincia o por '
+                             'distrito en visualizations/<geografia>/')
+    args = parser.parse_args()
     
     print("=" * 60)
     print("ANALISIS EXPLORATORIO DE DATOS - DENGUE LORETO")
@@ -37,88 +117,91 @@ def main():
     # Rutas
     base_path = Path(__file__).parent.parent
     ruta_limpio = base_path / 'data' / 'processed' / 'dengue_loreto_limpio.csv'
+    ruta_dataset = base_path / 'data' / 'processed' / 'dengue_loreto_limpio'
     ruta_serie = base_path / 'data' / 'processed' / 'dengue_loreto_serie_temporal.csv'
+    ruta_cubo = base_path / 'data' / 'processed' / 'dengue_loreto_cubo.parquet'
+    ruta_almacen = base_path / 'data' / 'processed' / 'dengue_loreto_series'
     
     # Crear carpeta de visualizaciones
     ruta_viz = base_path / 'visualizations'
     ruta_viz.mkdir(exist_ok=True)
     
     # Cargar datos
-    print("\n[1/10] Cargando datos...")
-    df = pd.read_csv(ruta_limpio)
+    print("\n[1/4] Cargando datos...")
+    # El dataset particionado es el que se mantiene al día en modo incremental
+    if ruta_dataset.exists():
+        df = leer_dataset_particionado(str(ruta_dataset))
+    else:
+        df = cargar_datos_procesados(str(ruta_limpio))
     df_serie = pd.read_csv(ruta_serie)
     print(f"Datos cargados: {len(df):,} registros")
     
-    # Análisis temporal anual
-    print("\n[2/10] Analisis temporal anual...")
-    casos_ano = analisis_temporal_anual(
-        df, 
-        guardar=True, 
-        ruta=str(ruta_viz / 'casos_por_ano.png')
-    )
-    
-    # Análisis temporal mensual
-    print("\n[3/10] Analisis temporal mensual...")
-    casos_mes = analisis_temporal_mensual(
-        df_serie.copy(), 
-        guardar=True, 
-        ruta=str(ruta_viz / 'casos_por_mes.png')
-    )
-    
-    # Serie temporal completa
-    print("\n[4/10] Generando serie temporal...")
-    analisis_serie_temporal(
-        df_serie.copy(), 
-        guardar=True, 
-        ruta=str(ruta_viz / 'serie_temporal.png')
-    )
-    
-    # Análisis geográfico - Provincias
-    print("\n[5/10] Analisis geografico - Provincias...")
-    casos_provincia = analisis_geografico(
-        df, 
-        nivel='provincia', 
-        top_n=8,
-        guardar=True, 
-        ruta=str(ruta_viz / 'casos_por_provincia.png')
-    )
-    
-    # Análisis geográfico - Distritos
-    print("\n[6/10] Analisis geografico - Distritos...")
-    casos_distrito = analisis_geografico(
-        df, 
-        nivel='distrito', 
-        top_n=15,
-        guardar=True, 
-        ruta=str(ruta_viz / 'casos_por_distrito.png')
-    )
-    
-    # Análisis demográfico - Edad
-    print("\n[7/10] Analisis demografico - Edad...")
-    analisis_demografico_edad(
-        df, 
-        guardar=True, 
-        ruta=str(ruta_viz / 'distribucion_edad.png')
-    )
-    
-    # Análisis demográfico - Sexo
-    print("\n[8/10] Analisis demografico - Sexo...")
-    casos_sexo = analisis_demografico_sexo(
-        df, 
-        guardar=True, 
-        ruta=str(ruta_viz / 'distribucion_sexo.png')
-    )
-    
-    # Mapa de calor
-    print("\n[9/10] Generando mapa de calor...")
-    mapa_calor_temporal(
-        df_serie.copy(), 
-        guardar=True, 
-        ruta=str(ruta_viz / 'mapa_calor_temporal.png')
-    )
+    if args.geografia:
+        ejecutar_lotes(args, df, df_serie, ruta_viz)
+        return
+    
+    # Los conteos geograficos y por sexo se obtienen del cubo preagregado
+    cubo = cargar_cubo(str(ruta_cubo))
+    if cubo is None:
+        cubo = construir_cubo(df)
+    
+    # Datos agregados de cada figura: solo estos se envían a los procesos de dibujo
+    print("\n[2/4] Agregando datos de las figuras...")
+    df_fechas = df_serie.assign(fecha=fecha_inicio_semana(df_serie['ano'], df_serie['semana']))
+    
+    tareas = [
+        (graficar_casos_por_ano,
+         {'casos_por_ano': df.groupby('ano').size().sort_index(),
+          'ruta': str(ruta_viz / 'casos_por_ano.png')}),
+        (graficar_casos_por_mes,
+         {'casos_por_mes': contar_casos_por_mes(df_serie),
+          'ruta': str(ruta_viz / 'casos_por_mes.png')}),
+        (graficar_serie_temporal,
+         {'df_serie': df_fechas[['fecha', 'casos']],
+          'ruta': str(ruta_viz / 'serie_temporal.png')}),
+        (graficar_casos_por_ubicacion,
+         {'casos_por_ubicacion': contar_casos(cubo, 'provincia').head(8), 'nivel': 'provincia',
+          'top_n': 8, 'ruta': str(ruta_viz / 'casos_por_provincia.png')}),
+        (graficar_casos_por_ubicacion,
+         {'casos_por_ubicacion': contar_casos(cubo, 'distrito').head(15), 'nivel': 'distrito',
+          'top_n': 15, 'ruta': str(ruta_viz / 'casos_por_distrito.png')}),
+        (graficar_distribucion_edad,
+         {'casos_por_edad': contar_edades(df),
+          'ruta': str(ruta_viz / 'distribucion_edad.png')}),
+        (graficar_distribucion_sexo,
+         {'casos_por_sexo': contar_casos(cubo, 'sexo'),
+          'ruta': str(ruta_viz / 'distribucion_sexo.png')}),
+        (graficar_mapa_calor,
+         {'pivot': matriz_mapa_calor(df_serie, abrir_almacen_series(str(ruta_almacen))),
+          'ruta': str(ruta_viz / 'mapa_calor_temporal.png')}),
+    ]
+    for _, argumentos in tareas:
+        argumentos['perfil'] = args.perfil
+    
+    # Solo se redibujan las figuras cuyos datos agregados o parámetros cambiaron
+    estado = {}
+    pendientes = []
+    for funcion, argumentos in tareas:
+        huella = huella_entrada(funcion.__name__, {k: v for k, v in argumentos.items() if k != 'ruta'})
+        ruta = ruta_figura(argumentos['ruta'], args.perfil)
+        if not args.forzar and artefacto_vigente(ruta, huella):
+            estado[ruta] = REUTILIZADO
+        else:
+            pendientes.append((funcion, argumentos, huella))
+    
+    # Renderizado en paralelo (una figura por proceso)
+    print(f"\n[3/4] Renderizando {len(pendientes)} de {len(tareas)} figuras...")
+    inicio = time.perf_counter()
+    tiempos = renderizar_figuras([(funcion, argumentos) for funcion, argumentos, _ in pendientes],
+                                 procesos=args.procesos)
+    for (ruta, _), (_, _, huella) in zip(tiempos, pendientes):
+        registrar_artefacto(ruta, huella)
+        estado[ruta] = REGENERADO
+    print(f"[GRAFICO] {len(tiempos)} figuras en {time.perf_counter() - inicio:.1f} s "
+          f"({sum(t for _, t in tiempos):.1f} s de dibujo acumulado)")
     
     # Estadísticas descriptivas
-    print("\n[10/10] Calculando estadisticas descriptivas...")
+    print("\n[4/4] Calculando estadisticas descriptivas...")
     stats = estadisticas_descriptivas(df)
     
     # Generar reporte
@@ -127,24 +210,25 @@ def main():
     
     # Guardar reporte
     ruta_reporte = base_path / 'visualizations' / 'reporte_eda.txt'
-    with open(ruta_reporte, 'w', encoding='utf-8') as f:
-        f.write(reporte)
-    print(f"\n[OK] Reporte guardado en: {ruta_reporte}")
+    
+    def guardar_reporte():
+        with open(ruta_reporte, 'w', encoding='utf-8') as f:
+            f.write(reporte)
+    
+    if memoizar_artefactos([str(ruta_reporte)], huella_entrada('reporte_eda', stats), guardar_reporte, estado,
+                           forzar=args.forzar):
+        print(f"\n[OK] Reporte guardado en: {ruta_reporte}")
+    
+    print("\n" + generar_reporte_artefactos(estado))
     
     print("\n" + "=" * 60)
     print("ANALISIS EXPLORATORIO COMPLETADO")
     print("=" * 60)
     print(f"\nVisualizaciones generadas en: {ruta_viz}")
     print("\nArchivos creados:")
-    print("  1. casos_por_ano.png")
-    print("  2. casos_por_mes.png")
-    print("  3. serie_temporal.png")
-    print("  4. casos_por_provincia.png")
-    print("  5. casos_por_distrito.png")
-    print("  6. distribucion_edad.png")
-    print("  7. distribucion_sexo.png")
-    print("  8. mapa_calor_temporal.png")
-    print("  9. reporte_eda.txt")
+    for i, (_, argumentos) in enumerate(tareas, 1):
+        print(f"  {i}. {Path(ruta_figura(argumentos['ruta'], args.perfil)).name}")
+    print(f"  {len(tareas) + 1}. reporte_eda.txt")
 
 
 if __name__ == "__main__":
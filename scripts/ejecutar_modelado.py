@@ -3,6 +3,7 @@ Script de ejecución de Modelado SARIMA
 Entrena y evalúa el modelo de predicción
 """
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -10,6 +11,24 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent / 'src'))
 
 import pandas as pd
+from almacen_series import abrir_almacen_series
+from artefactos import (
+    REGENERADO,
+    REUTILIZADO,
+    artefacto_vigente,
+    generar_reporte_artefactos,
+    huella_entrada,
+    leer_metadatos_artefacto,
+    memoizar_artefactos,
+    registrar_artefacto
+)
+from busqueda_sarima import (
+    CRITERIOS,
+    CRITERIO_POR_DEFECTO,
+    MAXITER_BUSQUEDA,
+    SEGUNDOS_POR_AJUSTE,
+    seleccionar_orden_sarima
+)
 from modeling import (
     preparar_serie_temporal,
     test_estacionariedad,
@@ -23,10 +42,30 @@ from modeling import (
     graficar_residuos,
     generar_reporte_modelo
 )
+from perfiles_graficos import PERFILES, PERFIL_POR_DEFECTO, ruta_figura
 
 
 def main():
     """Función principal de modelado"""
+    parser = argparse.ArgumentParser(description="Modelado SARIMA de casos de dengue")
+    parser.add_argument('--perfil', choices=list(PERFILES), default=PERFIL_POR_DEFECTO,
+                        help='Perfil de renderizado: publicacion (PNG a 300 dpi) o borrador '
+                             '(WebP a baja resolucion, para ejecuciones rutinarias)')
+    parser.add_argument('--forzar', action='store_true',
+                        help='Reentrenar y regenerar todos los artefactos aunque la serie no haya cambiado')
+    parser.add_argument('--buscar-ordenes', action='store_true',
+                        help='Elegir (p,d,q)(P,D,Q,s) con una busqueda en rejilla en lugar de los '
+                             'ordenes fijos; la tabla de posiciones se guarda en models/busqueda_sarima.csv')
+    parser.add_argument('--criterio', choices=list(CRITERIOS), default=CRITERIO_POR_DEFECTO,
+                        help='Criterio de la busqueda: aic, bic o error (mae, rmse) sobre las ultimas '
+                             'semanas de entrenamiento; la serie de prueba solo se usa en la evaluacion')
+    parser.add_argument('--procesos', type=int, default=None,
+                        help='Procesos de la busqueda (por defecto todos los nucleos)')
+    parser.add_argument('--maxiter-busqueda', type=int, default=MAXITER_BUSQUEDA,
+                        help='Iteraciones maximas de cada ajuste de la busqueda')
+    parser.add_argument('--segundos-por-ajuste', type=float, default=SEGUNDOS_POR_AJUSTE,
+                        help='Tiempo maximo de cada ajuste de la busqueda')
+    args = parser.parse_args()
     
     print("=" * 60)
     print("MODELADO SARIMA - DENGUE LORETO")
@@ -35,26 +74,40 @@ def main():
     # Rutas
     base_path = Path(__file__).parent.parent
     ruta_serie = base_path / 'data' / 'processed' / 'dengue_loreto_serie_temporal.csv'
+    ruta_almacen = base_path / 'data' / 'processed' / 'dengue_loreto_series'
     ruta_viz = base_path / 'visualizations'
     ruta_modelos = base_path / 'models'
     ruta_modelos.mkdir(exist_ok=True)
     
     # 1. Cargar y preparar datos
     print("\n[1/10] Cargando y preparando datos...")
-    df_serie = pd.read_csv(ruta_serie)
-    serie = preparar_serie_temporal(df_serie)
+    almacen = abrir_almacen_series(str(ruta_almacen))
+    if almacen is not None:
+        serie = preparar_serie_temporal(almacen=almacen)
+    else:
+        serie = preparar_serie_temporal(pd.read_csv(ruta_serie))
     
     # 2. Test de estacionariedad
     print("\n[2/10] Test de estacionariedad...")
     test_est = test_estacionariedad(serie)
     
+    # Cada artefacto se regenera solo si cambió la serie de la que depende o sus parámetros
+    estado = {}
+    
     # 3. Graficar ACF y PACF de la serie original
     print("\n[3/10] Graficando ACF y PACF...")
-    graficar_acf_pacf(
-        serie, 
-        lags=104,  # 2 años
-        guardar=True, 
-        ruta=str(ruta_viz / 'acf_pacf_original.png')
+    ruta_acf = ruta_viz / 'acf_pacf_original.png'
+    memoizar_artefactos(
+        [ruta_figura(ruta_acf, args.perfil)],
+        huella_entrada('graficar_acf_pacf', serie, {'lags': 104, 'perfil': args.perfil}),
+        lambda: graficar_acf_pacf(
+            serie, 
+            lags=104,  # 2 años
+            guardar=True, 
+            ruta=str(ruta_acf),
+            perfil=args.perfil
+        ),
+        estado, forzar=args.forzar
     )
     
     # 4. Aplicar diferenciación si es necesario
@@ -66,11 +119,18 @@ def main():
         test_est_diff = test_estacionariedad(serie_diff)
         
         # Graficar ACF y PACF de serie diferenciada
-        graficar_acf_pacf(
-            serie_diff, 
-            lags=104,
-            guardar=True, 
-            ruta=str(ruta_viz / 'acf_pacf_diferenciada.png')
+        ruta_acf_diff = ruta_viz / 'acf_pacf_diferenciada.png'
+        memoizar_artefactos(
+            [ruta_figura(ruta_acf_diff, args.perfil)],
+            huella_entrada('graficar_acf_pacf', serie_diff, {'lags': 104, 'perfil': args.perfil}),
+            lambda: graficar_acf_pacf(
+                serie_diff, 
+                lags=104,
+                guardar=True, 
+                ruta=str(ruta_acf_diff),
+                perfil=args.perfil
+            ),
+            estado, forzar=args.forzar
         )
     else:
         print("\n[4/10] Serie ya es estacionaria, no se requiere diferenciacion")
@@ -79,8 +139,6 @@ def main():
     print("\n[5/10] Dividiendo datos...")
     serie_train, serie_test = dividir_train_test(serie, test_size=52)  # 1 año de prueba
     
-    # 6. Entrenar modelo SARIMA
-    print("\n[6/10] Entrenando modelo SARIMA...")
     # Parámetros basados en el análisis EDA:
     # - Estacionalidad anual (s=52)
     # - Diferenciación regular y estacional
@@ -89,62 +147,98 @@ def main():
     order = (1, 1, 1)  # (p, d, q)
     seasonal_order = (1, 1, 1, 52)  # (P, D, Q, s)
     
-    modelo = entrenar_sarima(serie_train, order, seasonal_order)
-    
-    # 7. Realizar predicciones
-    print("\n[7/10] Realizando predicciones...")
-    predicciones = predecir(modelo, steps=len(serie_test))
-    
-    # 8. Evaluar modelo
-    print("\n[8/10] Evaluando modelo...")
-    metricas = evaluar_modelo(serie_test, predicciones)
-    
-    # 9. Graficar resultados
-    print("\n[9/10] Generando graficos...")
-    graficar_predicciones(
-        serie_train, 
-        serie_test, 
-        predicciones,
-        guardar=True, 
-        ruta=str(ruta_viz / 'predicciones_sarima.png')
-    )
-    
-    # Graficar residuos
-    graficar_residuos(
-        modelo,
-        guardar=True, 
-        ruta=str(ruta_viz / 'analisis_residuos.png')
-    )
-    
-    # 10. Generar reporte
-    print("\n[10/10] Generando reporte...")
-    reporte = generar_reporte_modelo(metricas, order, seasonal_order)
-    print("\n" + reporte)
+    if args.buscar_ordenes:
+        print("\n[5b/10] Buscando ordenes SARIMA...")
+        order, seasonal_order = seleccionar_orden_sarima(
+            serie_train, ruta_modelos / 'busqueda_sarima.csv', estado,
+            criterio=args.criterio, procesos=args.procesos, maxiter=args.maxiter_busqueda,
+            segundos_por_ajuste=args.segundos_por_ajuste, forzar=args.forzar,
+            por_defecto=(order, seasonal_order)
+        )
+        print(f"Orden seleccionado: {order}{seasonal_order}")
     
-    # Guardar reporte
     ruta_reporte = ruta_modelos / 'reporte_sarima.txt'
-    with open(ruta_reporte, 'w', encoding='utf-8') as f:
-        f.write(reporte)
-    print(f"\n[OK] Reporte guardado en: {ruta_reporte}")
-    
-    # Guardar predicciones
-    df_predicciones = pd.DataFrame({
-        'fecha': serie_test.index,
-        'casos_reales': serie_test.values,
-        'casos_predichos': predicciones.values
-    })
     ruta_pred = ruta_modelos / 'predicciones_sarima.csv'
-    df_predicciones.to_csv(ruta_pred, index=False)
-    print(f"[OK] Predicciones guardadas en: {ruta_pred}")
+    rutas_modelo = [ruta_figura(ruta_viz / 'predicciones_sarima.png', args.perfil),
+                    ruta_figura(ruta_viz / 'analisis_residuos.png', args.perfil),
+                    str(ruta_reporte), str(ruta_pred)]
+    huella_modelo = huella_entrada('sarima', serie_train, serie_test,
+                                   {'order': order, 'seasonal_order': seasonal_order, 'perfil': args.perfil})
+    
+    if not args.forzar and all(artefacto_vigente(ruta, huella_modelo) for ruta in rutas_modelo):
+        # Misma serie y mismos parámetros: no se reentrena
+        print("\n[6/10] Serie y parametros sin cambios, se reutiliza el modelo anterior")
+        modelo = None
+        metricas = leer_metadatos_artefacto(str(ruta_reporte))['metricas']
+        print("\n" + ruta_reporte.read_text(encoding='utf-8'))
+        estado.update({ruta: REUTILIZADO for ruta in rutas_modelo})
+    else:
+        # 6. Entrenar modelo SARIMA
+        print("\n[6/10] Entrenando modelo SARIMA...")
+        modelo = entrenar_sarima(serie_train, order, seasonal_order)
+        
+        # 7. Realizar predicciones
+        print("\n[7/10] Realizando predicciones...")
+        predicciones = predecir(modelo, steps=len(serie_test))
+        
+        # 8. Evaluar modelo
+        print("\n[8/10] Evaluando modelo...")
+        metricas = evaluar_modelo(serie_test, predicciones)
+        
+        # 9. Graficar resultados
+        print("\n[9/10] Generando graficos...")
+        graficar_predicciones(
+            serie_train, 
+            serie_test, 
+            predicciones,
+            guardar=True, 
+            ruta=str(ruta_viz / 'predicciones_sarima.png'),
+            perfil=args.perfil
+        )
+        
+        # Graficar residuos
+        graficar_residuos(
+            modelo,
+            guardar=True, 
+            ruta=str(ruta_viz / 'analisis_residuos.png'),
+            perfil=args.perfil
+        )
+        
+        # 10. Generar reporte
+        print("\n[10/10] Generando reporte...")
+        reporte = generar_reporte_modelo(metricas, order, seasonal_order)
+        print("\n" + reporte)
+        
+        # Guardar reporte
+        with open(ruta_reporte, 'w', encoding='utf-8') as f:
+            f.write(reporte)
+        print(f"\n[OK] Reporte guardado en: {ruta_reporte}")
+        
+        # Guardar predicciones
+        df_predicciones = pd.DataFrame({
+            'fecha': serie_test.index,
+            'casos_reales': serie_test.values,
+            'casos_predichos': predicciones.values
+        })
+        df_predicciones.to_csv(ruta_pred, index=False)
+        print(f"[OK] Predicciones guardadas en: {ruta_pred}")
+        
+        # Las métricas se guardan para informarlas cuando el modelo se reutilice
+        metadatos = {'metricas': {nombre: float(valor) for nombre, valor in metricas.items()}}
+        for ruta in rutas_modelo:
+            registrar_artefacto(ruta, huella_modelo, metadatos)
+            estado[ruta] = REGENERADO
+    
+    print("\n" + generar_reporte_artefactos(estado))
     
     print("\n" + "=" * 60)
     print("MODELADO SARIMA COMPLETADO")
     print("=" * 60)
     print(f"\nArchivos generados:")
-    print(f"  1. {ruta_viz / 'acf_pacf_original.png'}")
-    print(f"  2. {ruta_viz / 'acf_pacf_diferenciada.png'}")
-    print(f"  3. {ruta_viz / 'predicciones_sarima.png'}")
-    print(f"  4. {ruta_viz / 'analisis_residuos.png'}")
+    print(f"  1. {ruta_figura(ruta_viz / 'acf_pacf_original.png', args.perfil)}")
+    print(f"  2. {ruta_figura(ruta_viz / 'acf_pacf_diferenciada.png', args.perfil)}")
+    print(f"  3. {ruta_figura(ruta_viz / 'predicciones_sarima.png', args.perfil)}")
+    print(f"  4. {ruta_figura(ruta_viz / 'analisis_residuos.png', args.perfil)}")
     print(f"  5. {ruta_modelos / 'reporte_sarima.txt'}")
     print(f"  6. {ruta_modelos / 'predicciones_sarima.csv'}")
     
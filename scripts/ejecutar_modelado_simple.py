@@ -3,6 +3,7 @@ Script de modelado SARIMA optimizado
 Versión simplificada para entrenamiento más rápido
 """
 
+import argparse
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent / 'src'))
@@ -15,9 +16,48 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error
 import warnings
 warnings.filterwarnings('ignore')
 
+from almacen_series import abrir_almacen_series, serie_pandas
+from artefactos import (
+    REGENERADO,
+    REUTILIZADO,
+    artefacto_vigente,
+    generar_reporte_artefactos,
+    huella_entrada,
+    leer_metadatos_artefacto,
+    registrar_artefacto
+)
+from busqueda_sarima import (
+    CRITERIOS,
+    CRITERIO_POR_DEFECTO,
+    MAXITER_BUSQUEDA,
+    SEGUNDOS_POR_AJUSTE,
+    seleccionar_orden_sarima
+)
+from calendario_epi import fecha_inicio_semana
+from perfiles_graficos import PERFILES, PERFIL_POR_DEFECTO, ajustar_diseno, guardar_figura, ruta_figura
+
 
 def main():
     """Función principal de modelado optimizado"""
+    parser = argparse.ArgumentParser(description="Modelado SARIMA simplificado de casos de dengue")
+    parser.add_argument('--perfil', choices=list(PERFILES), default=PERFIL_POR_DEFECTO,
+                        help='Perfil de renderizado: publicacion (PNG a 300 dpi) o borrador '
+                             '(WebP a baja resolucion, para ejecuciones rutinarias)')
+    parser.add_argument('--forzar', action='store_true',
+                        help='Reentrenar y regenerar todos los artefactos aunque la serie no haya cambiado')
+    parser.add_argument('--buscar-ordenes', action='store_true',
+                        help='Elegir (p,d,q)(P,D,Q,s) con una busqueda en rejilla en lugar de los '
+                             'ordenes fijos; la tabla de posiciones se guarda en models/busqueda_sarima.csv')
+    parser.add_argument('--criterio', choices=list(CRITERIOS), default=CRITERIO_POR_DEFECTO,
+                        help='Criterio de la busqueda: aic, bic o error (mae, rmse) sobre las ultimas '
+                             'semanas de entrenamiento; la serie de prueba solo se usa en la evaluacion')
+    parser.add_argument('--procesos', type=int, default=None,
+                        help='Procesos de la busqueda (por defecto todos los nucleos)')
+    parser.add_argument('--maxiter-busqueda', type=int, default=MAXITER_BUSQUEDA,
+                        help='Iteraciones maximas de cada ajuste de la busqueda')
+    parser.add_argument('--segundos-por-ajuste', type=float, default=SEGUNDOS_POR_AJUSTE,
+                        help='Tiempo maximo de cada ajuste de la busqueda')
+    args = parser.parse_args()
     
     print("=" * 60)
     print("MODELADO SARIMA OPTIMIZADO - DENGUE LORETO")
@@ -26,22 +66,23 @@ def main():
     # Rutas
     base_path = Path(__file__).parent.parent
     ruta_serie = base_path / 'data' / 'processed' / 'dengue_loreto_serie_temporal.csv'
+    ruta_almacen = base_path / 'data' / 'processed' / 'dengue_loreto_series'
     ruta_viz = base_path / 'visualizations'
     ruta_modelos = base_path / 'models'
     ruta_modelos.mkdir(exist_ok=True)
     
     # 1. Cargar datos
     print("\n[1/6] Cargando datos...")
-    df_serie = pd.read_csv(ruta_serie)
-    
-    # Crear fecha
-    df_serie['fecha'] = pd.to_datetime(
-        df_serie['ano'].astype(str) + '-W' + df_serie['semana'].astype(str).str.zfill(2) + '-1',
-        format='%Y-W%W-%w',
-        errors='coerce'
-    )
-    df_serie = df_serie.dropna(subset=['fecha'])
-    serie = df_serie.set_index('fecha')['casos'].sort_index()
+    almacen = abrir_almacen_series(str(ruta_almacen))
+    if almacen is not None:
+        serie = serie_pandas(almacen)
+    else:
+        df_serie = pd.read_csv(ruta_serie)
+        
+        # Crear fecha
+        df_serie['fecha'] = fecha_inicio_semana(df_serie['ano'], df_serie['semana'])
+        df_serie = df_serie.dropna(subset=['fecha'])
+        serie = df_serie.set_index('fecha')['casos'].sort_index()
     
     print(f"Total de observaciones: {len(serie)}")
     print(f"Periodo: {serie.index.min()} a {serie.index.max()}")
@@ -57,75 +98,101 @@ def main():
     print(f"Entrenamiento: {len(serie_train)} observaciones")
     print(f"Prueba: {len(serie_test)} observaciones")
     
-    # 3. Entrenar modelo SARIMA simplificado
-    print("\n[3/6] Entrenando modelo SARIMA...")
-    print("Parametros: (1,1,1)(0,1,1,52)")
-    
-    modelo = SARIMAX(
-        serie_train,
-        order=(1, 1, 1),
-        seasonal_order=(0, 1, 1, 52),
-        enforce_stationarity=False,
-        enforce_invertibility=False
-    )
-    
-    resultado = modelo.fit(disp=False, maxiter=100)
-    
-    print(f"AIC: {resultado.aic:.2f}")
-    print(f"BIC: {resultado.bic:.2f}")
-    print("[OK] Modelo entrenado")
-    
-    # 4. Predicciones
-    print("\n[4/6] Realizando predicciones...")
-    predicciones = resultado.forecast(steps=len(serie_test))
-    
-    # 5. Evaluar
-    print("\n[5/6] Evaluando modelo...")
-    mae = mean_absolute_error(serie_test, predicciones)
-    rmse = np.sqrt(mean_squared_error(serie_test, predicciones))
-    mape = np.mean(np.abs((serie_test - predicciones) / serie_test)) * 100
-    
-    print(f"MAE: {mae:.2f} casos")
-    print(f"RMSE: {rmse:.2f} casos")
-    print(f"MAPE: {mape:.2f}%")
-    
-    # 6. Graficar
-    print("\n[6/6] Generando visualizaciones...")
-    
-    fig, ax = plt.subplots(figsize=(16, 6))
-    ax.plot(serie_train.index, serie_train.values, label='Entrenamiento', color='blue', alpha=0.7)
-    ax.plot(serie_test.index, serie_test.values, label='Valores Reales', color='green', linewidth=2)
-    ax.plot(serie_test.index, predicciones.values, label='Predicciones', 
-            color='red', linestyle='--', linewidth=2)
-    
-    ax.set_title('Modelo SARIMA: Predicciones vs Valores Reales', fontsize=16, fontweight='bold')
-    ax.set_xlabel('Fecha', fontsize=12)
-    ax.set_ylabel('Casos de Dengue', fontsize=12)
-    ax.legend(fontsize=11)
-    ax.grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig(str(ruta_viz / 'predicciones_sarima.png'), dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    print(f"[OK] Grafico guardado en: {ruta_viz / 'predicciones_sarima.png'}")
-    
-    # Guardar predicciones
-    df_pred = pd.DataFrame({
-        'fecha': serie_test.index,
-        'casos_reales': serie_test.values,
-        'casos_predichos': predicciones.values
-    })
-    df_pred.to_csv(ruta_modelos / 'predicciones_sarima.csv', index=False)
-    
-    # Guardar reporte
-    reporte = f"""============================================================
+    order = (1, 1, 1)
+    seasonal_order = (0, 1, 1, 52)
+    estado = {}
+    
+    if args.buscar_ordenes:
+        print("\n[2b/6] Buscando ordenes SARIMA...")
+        order, seasonal_order = seleccionar_orden_sarima(
+            serie_train, ruta_modelos / 'busqueda_sarima.csv', estado,
+            criterio=args.criterio, procesos=args.procesos, maxiter=args.maxiter_busqueda,
+            segundos_por_ajuste=args.segundos_por_ajuste, forzar=args.forzar,
+            por_defecto=(order, seasonal_order)
+        )
+    
+    # Solo se reentrena si cambió la serie o los parámetros del modelo
+    ruta_reporte = ruta_modelos / 'reporte_sarima.txt'
+    ruta_grafico = ruta_figura(ruta_viz / 'predicciones_sarima.png', args.perfil)
+    rutas_modelo = [ruta_grafico, str(ruta_modelos / 'predicciones_sarima.csv'), str(ruta_reporte)]
+    huella_modelo = huella_entrada('sarima', serie_train, serie_test,
+                                   {'order': order, 'seasonal_order': seasonal_order, 'maxiter': 100,
+                                    'perfil': args.perfil})
+    
+    if not args.forzar and all(artefacto_vigente(ruta, huella_modelo) for ruta in rutas_modelo):
+        print("\n[3/6] Serie y parametros sin cambios, se reutiliza el modelo anterior")
+        resultado = None
+        metricas = leer_metadatos_artefacto(str(ruta_reporte))['metricas']
+        print("\n" + ruta_reporte.read_text(encoding='utf-8'))
+        estado.update({ruta: REUTILIZADO for ruta in rutas_modelo})
+    else:
+        # 3. Entrenar modelo SARIMA simplificado
+        print("\n[3/6] Entrenando modelo SARIMA...")
+        print(f"Parametros: {order}{seasonal_order}")
+        
+        modelo = SARIMAX(
+            serie_train,
+            order=order,
+            seasonal_order=seasonal_order,
+            enforce_stationarity=False,
+            enforce_invertibility=False
+        )
+        
+        resultado = modelo.fit(disp=False, maxiter=100)
+        
+        print(f"AIC: {resultado.aic:.2f}")
+        print(f"BIC: {resultado.bic:.2f}")
+        print("[OK] Modelo entrenado")
+        
+        # 4. Predicciones
+        print("\n[4/6] Realizando predicciones...")
+        predicciones = resultado.forecast(steps=len(serie_test))
+        
+        # 5. Evaluar
+        print("\n[5/6] Evaluando modelo...")
+        mae = mean_absolute_error(serie_test, predicciones)
+        rmse = np.sqrt(mean_squared_error(serie_test, predicciones))
+        mape = np.mean(np.abs((serie_test - predicciones) / serie_test)) * 100
+        
+        print(f"MAE: {mae:.2f} casos")
+        print(f"RMSE: {rmse:.2f} casos")
+        print(f"MAPE: {mape:.2f}%")
+        
+        # 6. Graficar
+        print("\n[6/6] Generando visualizaciones...")
+        
+        fig, ax = plt.subplots(figsize=(16, 6))
+        ax.plot(serie_train.index, serie_train.values, label='Entrenamiento', color='blue', alpha=0.7)
+        ax.plot(serie_test.index, serie_test.values, label='Valores Reales', color='green', linewidth=2)
+        ax.plot(serie_test.index, predicciones.values, label='Predicciones', 
+                color='red', linestyle='--', linewidth=2)
+        
+        ax.set_title('Modelo SARIMA: Predicciones vs Valores Reales', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Fecha', fontsize=12)
+        ax.set_ylabel('Casos de Dengue', fontsize=12)
+        ax.legend(fontsize=11)
+        ax.grid(True, alpha=0.3)
+        
+        ajustar_diseno(args.perfil)
+        guardar_figura(str(ruta_viz / 'predicciones_sarima.png'), args.perfil, 'Predicciones')
+        plt.close()
+        
+        # Guardar predicciones
+        df_pred = pd.DataFrame({
+            'fecha': serie_test.index,
+            'casos_reales': serie_test.values,
+            'casos_predichos': predicciones.values
+        })
+        df_pred.to_csv(ruta_modelos / 'predicciones_sarima.csv', index=False)
+        
+        # Guardar reporte
+        reporte = f"""============================================================
 REPORTE DE MODELO SARIMA
 ============================================================
 
 Parametros del modelo:
-  - (p, d, q): (1, 1, 1)
-  - (P, D, Q, s): (0, 1, 1, 52)
+  - (p, d, q): {order}
+  - (P, D, Q, s): {seasonal_order}
 
 Metricas de evaluacion:
   - MAE: {mae:.2f} casos
@@ -138,17 +205,24 @@ Criterios de informacion:
 
 ============================================================
 """
-    
-    with open(ruta_modelos / 'reporte_sarima.txt', 'w') as f:
-        f.write(reporte)
-    
-    print("\n" + reporte)
+        
+        with open(ruta_modelos / 'reporte_sarima.txt', 'w') as f:
+            f.write(reporte)
+        
+        print("\n" + reporte)
+        
+        metricas = {'MAE': float(mae), 'RMSE': float(rmse), 'MAPE': float(mape)}
+        for ruta in rutas_modelo:
+            registrar_artefacto(ruta, huella_modelo, {'metricas': metricas})
+            estado[ruta] = REGENERADO
+    
+    print(generar_reporte_artefactos(estado))
     
     print("=" * 60)
     print("MODELADO COMPLETADO EXITOSAMENTE")
     print("=" * 60)
     
-    return resultado, {'MAE': mae, 'RMSE': rmse, 'MAPE': mape}
+    return resultado, metricas
 
 
 if __name__ == "__main__":
@@ -3,90 +3,381 @@ Script de limpieza de datos de dengue para Loreto
 Aplica todas las transformaciones necesarias
 """
 
+import argparse
 import sys
 from pathlib import Path
 
 # Agregar src al path
 sys.path.append(str(Path(__file__).parent.parent / 'src'))
 
-from ingestion import cargar_datos_dengue, filtrar_por_departamento, guardar_datos_procesados
+import pandas as pd
+from archivos_crudos import resolver_ruta_cruda
+from ingestion import (
+    cargar_datos_dengue,
+    guardar_datos_procesados,
+    guardar_dataset_particionado,
+    actualizar_dataset_particionado,
+    leer_dataset_particionado,
+    particionar_por_departamento,
+    cargar_particion_departamento,
+    iterar_bloques,
+    particionar_por_departamento_por_bloques,
+    iterar_particion_departamento
+)
+from esquema import concatenar_compacto
 from cleaning import (
     analizar_calidad_datos,
-    limpiar_valores_faltantes,
-    estandarizar_texto,
-    validar_rangos_temporales,
-    validar_edad,
-    crear_fecha_epidemiologica,
+    limpiar_datos_fusionado,
     agrupar_por_semana_epidemiologica,
     generar_reporte_limpieza
 )
+from incremental import (
+    calcular_huellas_semanales,
+    cargar_estado_semanas,
+    guardar_estado_semanas,
+    detectar_semanas_modificadas,
+    mascara_semanas,
+    actualizar_serie_temporal
+)
+from almacen_series import construir_almacen_series
+from cubo import construir_cubo, guardar_cubo, cargar_cubo, actualizar_cubo
+from huellas import calcular_huella_filas, cargar_huellas, guardar_huellas, comparar_versiones
+from fuera_de_memoria import calcular_tamano_bloque, limpiar_por_bloques
+from motores import MOTORES, MOTOR_POR_DEFECTO
+from perfil_calidad import perfilar
+from persistencia import ruta_base, ruta_formato
 
+# Filas por bloque en la lectura del CSV nacional
+TAMANO_CHUNK = 500_000
 
-def main():
-    """Función principal de limpieza"""
-    
-    print("=" * 60)
-    print("LIMPIEZA DE DATOS - DENGUE LORETO")
-    print("=" * 60)
-    
-    # Rutas
-    ruta_datos = Path(__file__).parent.parent / 'data' / 'raw' / 'datos_abiertos_vigilancia_dengue_2000_2024.csv'
-    ruta_salida_loreto = Path(__file__).parent.parent / 'data' / 'processed' / 'dengue_loreto_limpio.csv'
-    ruta_salida_serie = Path(__file__).parent.parent / 'data' / 'processed' / 'dengue_loreto_serie_temporal.csv'
+# Formatos de la tabla de casos limpia (Parquet para lectura rapida, CSV comprimido portable)
+FORMATOS_LIMPIO = ('parquet', 'csv.gz')
+
+# Techo de memoria por defecto del modo fuera de memoria (MB)
+MEMORIA_MAXIMA_MB = 512
+
+COLUMNAS_TEXTO = ['departamento', 'provincia', 'distrito', 'localidad', 'enfermedad']
+
+
+def nombre_archivo_departamento(departamento: str) -> str:
+    """Nombre base de los archivos procesados de un departamento (ej: 'dengue_loreto')"""
+    return 'dengue_' + departamento.strip().lower().replace(' ', '_')
+
+
+def aplicar_limpieza(df_dep, huellas=None, ruta_cuarentena=None):
+    """
+    Aplica los pasos de limpieza a los datos crudos de un departamento.
     
-    # 1. Cargar datos
-    print("\n[1/8] Cargando datos...")
-    df = cargar_datos_dengue(str(ruta_datos))
+    Args:
+        df_dep: Datos crudos del departamento
+        huellas: Huellas por fila de df_dep, si ya se calcularon
+        ruta_cuarentena: CSV donde guardar los registros rechazados y sus motivos
     
-    # 2. Filtrar para Loreto
-    print("\n[2/8] Filtrando para Loreto...")
-    df_loreto = filtrar_por_departamento(df, 'LORETO')
-    df_original = df_loreto.copy()
+    Returns:
+        Tupla (DataFrame limpio, reporte de limpieza)
+    """
+    # La limpieza fusionada no modifica df_dep, no hace falta copiarlo
+    df_original = df_dep
     
     # 3. Analizar calidad
-    print("\n[3/8] Analizando calidad de datos...")
-    calidad = analizar_calidad_datos(df_loreto)
+    print("\n[3/5] Analizando calidad de datos...")
+    perfil_original = perfilar(df_dep)
+    calidad = analizar_calidad_datos(df_dep, huellas, perfil_original)
     print(f"Registros duplicados: {calidad['registros_duplicados']:,} ({calidad['porcentaje_duplicados']:.2f}%)")
     print(f"Columnas con valores nulos: {len(calidad['columnas_con_nulos'])}")
     
-    # 4. Limpiar valores faltantes
-    print("\n[4/8] Limpiando valores faltantes...")
-    df_loreto = limpiar_valores_faltantes(df_loreto, estrategia='eliminar')
+    # 4. Limpiar nulos, estandarizar texto, validar rangos y edad, crear fecha (una pasada)
+    print("\n[4/5] Limpiando, estandarizando y validando datos...")
+    df_dep = limpiar_datos_fusionado(df_dep, COLUMNAS_TEXTO, estrategia='eliminar',
+                                     ruta_cuarentena=ruta_cuarentena)
     
-    # 5. Estandarizar texto
-    print("\n[5/8] Estandarizando texto...")
-    columnas_texto = ['departamento', 'provincia', 'distrito', 'localidad', 'enfermedad']
-    df_loreto = estandarizar_texto(df_loreto, columnas_texto)
-    
-    # 6. Validar rangos
-    print("\n[6/8] Validando rangos temporales y edad...")
-    df_loreto = validar_rangos_temporales(df_loreto)
-    df_loreto = validar_edad(df_loreto)
+    # 5. Generar reporte
+    print("\n[5/5] Generando reporte de limpieza...")
+    reporte = generar_reporte_limpieza(df_original, df_dep, perfil_original)
+    print("\n" + reporte)
     
-    # 7. Crear fecha epidemiológica
-    print("\n[7/8] Creando columna de fecha...")
-    df_loreto = crear_fecha_epidemiologica(df_loreto)
+    return df_dep, reporte
+
+
+def rutas_departamento(departamento: str, dir_salida: Path) -> dict:
+    """Rutas de los archivos procesados de un departamento"""
+    nombre = nombre_archivo_departamento(departamento)
+    return {
+        'limpio': dir_salida / f'{nombre}_limpio.csv',
+        'dataset': dir_salida / f'{nombre}_limpio',
+        'serie': dir_salida / f'{nombre}_serie_temporal.csv',
+        'estado': dir_salida / f'{nombre}_estado_semanas.csv',
+        'huellas': dir_salida / f'{nombre}_huellas.npy',
+        'cubo': dir_salida / f'{nombre}_cubo.parquet',
+        'series': dir_salida / f'{nombre}_series',
+        'cuarentena': dir_salida / f'{nombre}_cuarentena.csv',
+        'cuarentena_incremental': dir_salida / f'{nombre}_cuarentena_incremental.csv'
+    }
+
+
+def registrar_huellas(huellas_filas, ruta_huellas: Path, conteos=None):
+    """Compara las huellas por fila con las de la versión anterior y las guarda"""
+    huellas_previas = cargar_huellas(str(ruta_huellas))
+    if huellas_previas is not None:
+        comparar_versiones(huellas_filas, huellas_previas, conteos)
+    guardar_huellas(huellas_filas, str(ruta_huellas))
+
+
+def limpiar_departamento(df_dep, departamento: str, dir_salida: Path, huellas_filas=None,
+                         motor: str = MOTOR_POR_DEFECTO):
+    """
+    Aplica los pasos de limpieza y agregación a los datos de un departamento
+    y guarda la tabla de casos y la serie temporal.
+    """
+    rutas = rutas_departamento(departamento, dir_salida)
+    if huellas_filas is None:
+        huellas_filas = calcular_huella_filas(df_dep)
+    huellas = calcular_huellas_semanales(df_dep, huellas_filas)
     
-    # 8. Generar reporte
-    print("\n[8/8] Generando reporte de limpieza...")
-    reporte = generar_reporte_limpieza(df_original, df_loreto)
-    print("\n" + reporte)
+    df_dep, _ = aplicar_limpieza(df_dep, huellas_filas, str(rutas['cuarentena']))
     
     # Guardar datos limpios
     print(f"\nGuardando datos limpios...")
-    guardar_datos_procesados(df_loreto, str(ruta_salida_loreto))
+    archivos_limpio = guardar_datos_procesados(df_dep, str(rutas['limpio']), formatos=FORMATOS_LIMPIO)
+    guardar_dataset_particionado(df_dep, str(rutas['dataset']))
     
     # Crear y guardar serie temporal
     print(f"\nCreando serie temporal...")
-    df_serie = agrupar_por_semana_epidemiologica(df_loreto)
-    guardar_datos_procesados(df_serie, str(ruta_salida_serie))
+    df_serie = agrupar_por_semana_epidemiologica(df_dep, motor=motor)
+    guardar_datos_procesados(df_serie, str(rutas['serie']))
+    
+    # Crear y guardar el cubo de casos (semana x geografia x demografia)
+    print(f"\nCreando cubo de casos...")
+    cubo = construir_cubo(df_dep)
+    guardar_cubo(cubo, str(rutas['cubo']))
+    construir_almacen_series(cubo, str(rutas['series']), region=departamento)
+    
+    # Registrar las huellas semanales para la siguiente ejecución incremental
+    guardar_estado_semanas(huellas, str(rutas['estado']))
+    registrar_huellas(huellas_filas, rutas['huellas'])
+    
+    return df_dep, df_serie, archivos_limpio + [rutas['dataset'], rutas['serie'], rutas['cubo'],
+                                                rutas['series']]
+
+
+def limpiar_departamento_por_bloques(bloques, departamento: str, dir_salida: Path):
+    """
+    Limpia los datos de un departamento bloque a bloque (modo fuera de memoria)
+    y guarda los mismos archivos que `limpiar_departamento`.
+    """
+    rutas = rutas_departamento(departamento, dir_salida)
+    # La tabla limpia se escribe por bloques, como CSV comprimido
+    ruta_limpio = ruta_formato(rutas['limpio'], 'csv.gz')
+    
+    print("\n[3/5] Limpiando, estandarizando y validando por bloques...")
+    resultado = limpiar_por_bloques(bloques, COLUMNAS_TEXTO, estrategia='eliminar',
+                                    ruta_limpio=str(ruta_limpio),
+                                    dir_dataset=str(rutas['dataset']),
+                                    ruta_cuarentena=str(rutas['cuarentena']))
+    
+    print("\n[4/5] Calidad de los datos crudos...")
+    calidad = resultado['calidad']
+    print(f"Registros duplicados: {calidad['registros_duplicados']:,} ({calidad['porcentaje_duplicados']:.2f}%)")
+    print(f"Columnas con valores nulos: {len(calidad['columnas_con_nulos'])}")
+    
+    print("\n[5/5] Generando reporte de limpieza...")
+    print("\n" + resultado['reporte'])
+    print(f"[OK] Datos guardados en: {ruta_limpio}")
+    print(f"[OK] Dataset particionado guardado en: {rutas['dataset']}")
+    
+    # Guardar los agregados fusionados
+    print(f"\nGuardando serie temporal y cubo de casos...")
+    df_serie = resultado['serie']
+    guardar_datos_procesados(df_serie, str(rutas['serie']))
+    cubo = resultado['cubo']
+    guardar_cubo(cubo, str(rutas['cubo']))
+    construir_almacen_series(cubo, str(rutas['series']), region=departamento)
+    
+    guardar_estado_semanas(resultado['huellas_semanales'], str(rutas['estado']))
+    registrar_huellas(resultado['huellas_unicas'], rutas['huellas'], resultado['conteos_huellas'])
+    
+    return None, df_serie, [ruta_limpio, rutas['dataset'], rutas['serie'], rutas['cubo'],
+                            rutas['series']]
+
+
+def actualizar_departamento_incremental(df_dep, departamento: str, dir_salida: Path):
+    """
+    Limpia solo las semanas (ano, semana) nuevas o modificadas desde la última
+    ejecución y las fusiona en el dataset particionado y en la serie temporal.
+    """
+    rutas = rutas_departamento(departamento, dir_salida)
+    
+    huellas_filas = calcular_huella_filas(df_dep)
+    huellas = calcular_huellas_semanales(df_dep, huellas_filas)
+    huellas_previas = cargar_estado_semanas(str(rutas['estado']))
+    if huellas_previas is None or not all(rutas[r].exists() for r in ('dataset', 'serie', 'cubo', 'series')):
+        print("[INCREMENTAL] Sin estado previo, se ejecuta la limpieza completa")
+        return limpiar_departamento(df_dep, departamento, dir_salida, huellas_filas)
+    
+    semanas = detectar_semanas_modificadas(huellas, huellas_previas)
+    if semanas.empty:
+        print("[INCREMENTAL] Sin cambios desde la ultima ejecucion")
+        return None, None, []
+    
+    # Limpiar solo los registros de las semanas modificadas
+    en_semanas = mascara_semanas(df_dep, semanas)
+    df_semanas = df_dep[en_semanas]
+    print(f"[INCREMENTAL] Registros a procesar: {len(df_semanas):,} de {len(df_dep):,}")
+    if len(df_semanas):
+        df_limpio_semanas, _ = aplicar_limpieza(df_semanas, huellas_filas[en_semanas],
+                                                str(rutas['cuarentena_incremental']))
+    else:
+        # Todas las semanas modificadas fueron retiradas: solo se eliminan
+        print("[INCREMENTAL] Solo hay semanas retiradas, no se ejecuta la limpieza")
+        df_limpio_semanas = None
+    
+    # Fusionar en la tabla de casos reescribiendo solo los años afectados
+    print(f"\nFusionando semanas modificadas...")
+    anos = sorted(int(ano) for ano in semanas['ano'].unique())
+    df_existente = leer_dataset_particionado(str(rutas['dataset']), anos=anos)
+    if 'fecha' in df_existente.columns:
+        df_existente['fecha'] = pd.to_datetime(df_existente['fecha'])
+    df_existente = df_existente[~mascara_semanas(df_existente, semanas)]
+    if df_limpio_semanas is None:
+        df_limpio_semanas = df_existente.iloc[:0]
+    df_anos = concatenar_compacto([df_existente, df_limpio_semanas])
+    actualizar_dataset_particionado(df_anos, str(rutas['dataset']), anos)
+    
+    # Actualizar la serie temporal solo en las semanas modificadas
+    df_serie = pd.read_csv(rutas['serie'])
+    df_serie = actualizar_serie_temporal(df_serie, df_limpio_semanas, semanas)
+    guardar_datos_procesados(df_serie, str(rutas['serie']))
+    
+    # Reemplazar en el cubo solo las celdas de las semanas modificadas
+    cubo = actualizar_cubo(cargar_cubo(str(rutas['cubo'])), df_limpio_semanas, semanas)
+    guardar_cubo(cubo, str(rutas['cubo']))
+    construir_almacen_series(cubo, str(rutas['series']), region=departamento)
+    
+    guardar_estado_semanas(huellas, str(rutas['estado']))
+    registrar_huellas(huellas_filas, rutas['huellas'])
+    print(f"[AVISO] {ruta_base(rutas['limpio']).name} no se reescribe en modo incremental; "
+          f"la tabla de casos actualizada es {rutas['dataset'].name}/")
+    
+    return df_limpio_semanas, df_serie, [rutas['dataset'], rutas['serie'], rutas['cubo'], rutas['series']]
+
+
+def limpiar_todos_los_departamentos(ruta_datos: Path, dir_salida: Path, por_ano: bool = False,
+                                    tamano_bloque=None, motor: str = MOTOR_POR_DEFECTO):
+    """
+    Particiona el dataset nacional por departamento en una sola pasada y
+    ejecuta la limpieza sobre cada partición de forma independiente.
+    
+    Con `tamano_bloque` (modo fuera de memoria) el CSV nacional se particiona
+    por bloques y cada partición se limpia también por bloques.
+    """
+    dir_particiones = Path(__file__).parent.parent / 'data' / 'interim' / 'departamentos'
+    
+    if tamano_bloque is not None:
+        print("\n[1/5] Particionando por departamento por bloques...")
+        particiones = particionar_por_departamento_por_bloques(str(ruta_datos), str(dir_particiones),
+                                                               chunksize=tamano_bloque)
+        
+        archivos = []
+        for departamento in particiones:
+            print("\n" + "-" * 60)
+            print(f"DEPARTAMENTO: {departamento}")
+            print("-" * 60)
+            bloques = iterar_particion_departamento(str(dir_particiones), departamento, tamano_bloque)
+            _, _, rutas = limpiar_departamento_por_bloques(bloques, departamento, dir_salida)
+            archivos.extend(rutas)
+        
+        return archivos
+    
+    print("\n[1/5] Cargando datos...")
+    df = cargar_datos_dengue(str(ruta_datos), usar_cache=True, compacto=True, motor=motor)
+    
+    print("\n[2/5] Particionando por departamento...")
+    particiones = particionar_por_departamento(df, str(dir_particiones), por_ano=por_ano)
+    del df
+    
+    archivos = []
+    for departamento in particiones:
+        print("\n" + "-" * 60)
+        print(f"DEPARTAMENTO: {departamento}")
+        print("-" * 60)
+        df_dep = cargar_particion_departamento(str(dir_particiones), departamento)
+        _, _, rutas = limpiar_departamento(df_dep, departamento, dir_salida, motor=motor)
+        archivos.extend(rutas)
+    
+    return archivos
+
+
+def main():
+    """Función principal de limpieza"""
+    parser = argparse.ArgumentParser(description="Limpieza de datos de dengue")
+    parser.add_argument('--todos-departamentos', action='store_true',
+                        help='Procesa los 25 departamentos a partir de particiones en disco')
+    parser.add_argument('--por-ano', action='store_true',
+                        help='Con --todos-departamentos, particiona ademas por ano')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Procesa solo las semanas nuevas o modificadas desde la ultima ejecucion')
+    parser.add_argument('--fuera-de-memoria', action='store_true',
+                        help='Procesa el CSV por bloques sin cargar la tabla completa en memoria')
+    parser.add_argument('--memoria-maxima-mb', type=float, default=MEMORIA_MAXIMA_MB,
+                        help='Con --fuera-de-memoria, memoria maxima por bloque en MB')
+    parser.add_argument('--motor', choices=MOTORES, default=MOTOR_POR_DEFECTO,
+                        help='Motor de DataFrame para la lectura y la agrupacion semanal')
+    args = parser.parse_args()
+    if args.fuera_de_memoria and (args.incremental or args.por_ano):
+        parser.error('--fuera-de-memoria no se puede combinar con --incremental ni --por-ano')
+    
+    print("=" * 60)
+    print("LIMPIEZA DE DATOS - DENGUE " + ("PERU" if args.todos_departamentos else "LORETO"))
+    print("=" * 60)
+    
+    # Rutas
+    ruta_datos = resolver_ruta_cruda(
+        Path(__file__).parent.parent / 'data' / 'raw' / 'datos_abiertos_vigilancia_dengue_2000_2024.csv')
+    dir_salida = Path(__file__).parent.parent / 'data' / 'processed'
+    
+    tamano_bloque = None
+    if args.fuera_de_memoria:
+        tamano_bloque = calcular_tamano_bloque(str(ruta_datos), args.memoria_maxima_mb)
+    
+    if args.todos_departamentos:
+        archivos = limpiar_todos_los_departamentos(ruta_datos, dir_salida, por_ano=args.por_ano,
+                                                   tamano_bloque=tamano_bloque, motor=args.motor)
+        df_loreto = df_serie = None
+    elif args.fuera_de_memoria:
+        # 1-2. Leer por bloques filtrando Loreto; la limpieza consume los bloques conforme se leen
+        print("\n[1/5] Cargando datos por bloques...")
+        print("\n[2/5] Filtrando para Loreto (aplicado durante la lectura)...")
+        bloques = (bloque for bloque, _ in iterar_bloques(str(ruta_datos), chunksize=tamano_bloque,
+                                                           departamento='LORETO', compacto=True)
+                   if len(bloque))
+        df_loreto, df_serie, archivos = limpiar_departamento_por_bloques(bloques, 'LORETO', dir_salida)
+    else:
+        # 1. Cargar datos (cache Parquet o lectura por bloques, con filtro de departamento)
+        print("\n[1/5] Cargando datos...")
+        df_loreto = cargar_datos_dengue(str(ruta_datos), chunksize=TAMANO_CHUNK,
+                                        departamento='LORETO', usar_cache=True, compacto=True,
+                                        motor=args.motor)
+        
+        # 2. Filtrar para Loreto (aplicado durante la lectura)
+        print("\n[2/5] Filtrando para Loreto...")
+        print(f"[FILTRO] Departamento: LORETO")
+        print(f"Total de registros: {len(df_loreto):,}")
+        if 'registro_chunks' in df_loreto.attrs:
+            total_leidos = sum(r['filas_leidas'] for r in df_loreto.attrs['registro_chunks'])
+            print(f"Porcentaje del total: {(len(df_loreto)/total_leidos*100):.2f}%")
+        
+        if args.incremental:
+            df_loreto, df_serie, archivos = actualizar_departamento_incremental(df_loreto, 'LORETO', dir_salida)
+        else:
+            df_loreto, df_serie, archivos = limpiar_departamento(df_loreto, 'LORETO', dir_salida,
+                                                                 motor=args.motor)
     
     print("\n" + "=" * 60)
     print("LIMPIEZA COMPLETADA EXITOSAMENTE")
     print("=" * 60)
     print(f"\nArchivos generados:")
-    print(f"  1. {ruta_salida_loreto}")
-    print(f"  2. {ruta_salida_serie}")
+    for i, ruta in enumerate(archivos, 1):
+        print(f"  {i}. {ruta}")
     
     return df_loreto, df_serie
 
@@ -10,6 +10,7 @@ from pathlib import Path
 # Agregar src al path
 sys.path.append(str(Path(__file__).parent.parent / 'src'))
 
+from archivos_crudos import resolver_ruta_cruda
 from ingestion import (
     cargar_datos_dengue,
     validar_integridad,
@@ -18,6 +19,7 @@ from ingestion import (
     obtener_resumen_geografico,
     generar_reporte_validacion
 )
+from esquema import aplicar_esquema, generar_reporte_memoria
 
 
 def main():
@@ -28,11 +30,17 @@ def main():
     print("=" * 60)
     
     # Rutas
-    ruta_datos = Path(__file__).parent.parent / 'data' / 'raw' / 'datos_abiertos_vigilancia_dengue_2000_2024.csv'
+    ruta_datos = resolver_ruta_cruda(
+        Path(__file__).parent.parent / 'data' / 'raw' / 'datos_abiertos_vigilancia_dengue_2000_2024.csv')
     
     # 1. Cargar datos
     print("\n[1/5] Cargando datos...")
-    df = cargar_datos_dengue(str(ruta_datos))
+    df = cargar_datos_dengue(str(ruta_datos), usar_cache=True)
+    
+    # Compactar tipos y mostrar la memoria por columna
+    df_compacto = aplicar_esquema(df)
+    print("\n" + generar_reporte_memoria(df, df_compacto))
+    df = df_compacto
     
     # 2. Validar integridad
     print("\n[2/5] Validando integridad...")
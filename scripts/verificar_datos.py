@@ -3,9 +3,15 @@ Script de verificación de datos procesados
 Muestra estadísticas de los archivos generados
 """
 
+import sys
 import pandas as pd
 from pathlib import Path
 
+# Agregar src al path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from ingestion import leer_dataset_particionado, cargar_datos_procesados
+
 
 def main():
     """Función principal de verificación"""
@@ -16,13 +22,17 @@ def main():
     
     # Rutas
     ruta_limpio = Path(__file__).parent.parent / 'data' / 'processed' / 'dengue_loreto_limpio.csv'
+    ruta_dataset = Path(__file__).parent.parent / 'data' / 'processed' / 'dengue_loreto_limpio'
     ruta_serie = Path(__file__).parent.parent / 'data' / 'processed' / 'dengue_loreto_serie_temporal.csv'
     
     # Cargar datos limpios
     print("\n[1/2] Verificando datos limpios...")
-    df_limpio = pd.read_csv(ruta_limpio)
-    
-    print(f"\nArchivo: dengue_loreto_limpio.csv")
+    if ruta_dataset.exists():
+        df_limpio = leer_dataset_particionado(str(ruta_dataset))
+        print(f"\nDataset particionado: {ruta_dataset.name}/")
+    else:
+        df_limpio = cargar_datos_procesados(str(ruta_limpio))
+        print(f"\nTabla: dengue_loreto_limpio")
     print(f"  - Total de registros: {len(df_limpio):,}")
     print(f"  - Total de columnas: {len(df_limpio.columns)}")
     print(f"  - Periodo: {df_limpio['ano'].min()} - {df_limpio['ano'].max()}")
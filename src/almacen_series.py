@@ -0,0 +1,347 @@
+"""
+Módulo de almacén binario de series semanales por geografía
+Sistema de Análisis de Dengue en Perú
+"""
+
+import json
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from calendario_epi import fecha_inicio_semana
+
+
+# Cada geografía ocupa una fila de un arreglo int32 con 53 columnas por año:
+# la semana (ano, semana) está en la columna (ano - ano_inicio) * 53 + semana - 1.
+SEMANAS_POR_FILA = 53
+ARCHIVO_DATOS = 'series.npy'
+
+# Columnas que identifican una geografía en el almacén y en `matrices_semana_ano`:
+# hay distritos con el mismo nombre en provincias distintas, así que se
+# distinguen por ambas
+CLAVES_GEOGRAFIA = {'provincia': ['provincia'], 'distrito': ['provincia', 'distrito']}
+ARCHIVO_INDICE = 'indice.json'
+
+# Nombre de una provincia, o tupla (provincia, distrito)
+NombreGeografia = Optional[Union[str, Tuple[str, ...]]]
+
+
+def indice_semana(ano, semana, ano_inicio: int):
+    """Columna del almacén que corresponde a (ano, semana)"""
+    return (ano - ano_inicio) * SEMANAS_POR_FILA + semana - 1
+
+
+def construir_almacen_series(df: pd.DataFrame, dir_salida: str, region: str = 'LORETO') -> Path:
+    """
+    Construye el almacén de series semanales: una fila para la región, una
+    por provincia y una por distrito.
+    
+    Acepta registros individuales o el cubo de casos (si `df` tiene la columna
+    'casos' se usa como peso). Las semanas sin casos quedan con cero explícito.
+    Cada geografía se identifica por las columnas de `CLAVES_GEOGRAFIA`: el
+    nombre de un distrito es la tupla (provincia, distrito), que en
+    `indice.json` se guarda como lista.
+    
+    Args:
+        df: Registros limpios o cubo con 'ano', 'semana', 'provincia' y 'distrito'
+        dir_salida: Directorio del almacén
+        region: Nombre de la fila de la región
+    
+    Returns:
+        Ruta del directorio del almacén
+    """
+    ano = df['ano'].to_numpy(dtype=np.int64)
+    semana = df['semana'].to_numpy(dtype=np.int64)
+    pesos = df['casos'].to_numpy(dtype=np.int64) if 'casos' in df.columns else None
+    
+    ano_inicio, ano_fin = int(ano.min()), int(ano.max())
+    n_semanas = (ano_fin - ano_inicio + 1) * SEMANAS_POR_FILA
+    columna = indice_semana(ano, semana, ano_inicio)
+    
+    geografias = [{'nivel': 'region', 'nombre': region}]
+    filas = [np.bincount(columna, weights=pesos, minlength=n_semanas)]
+    
+    for nivel in ['provincia', 'distrito']:
+        codigos, nombres = _codificar_geografia(df, CLAVES_GEOGRAFIA[nivel])
+        conocidos = codigos >= 0
+        clave = codigos[conocidos] * n_semanas + columna[conocidos]
+        conteo = np.bincount(clave, weights=None if pesos is None else pesos[conocidos],
+                             minlength=len(nombres) * n_semanas)
+        filas.extend(conteo.reshape(len(nombres), n_semanas))
+        geografias.extend({'nivel': nivel, 'nombre': nombre} for nombre in nombres)
+    
+    dir_almacen = Path(dir_salida)
+    dir_almacen.mkdir(parents=True, exist_ok=True)
+    
+    ruta_tmp = dir_almacen / (ARCHIVO_DATOS + '.tmp')
+    datos = np.lib.format.open_memmap(ruta_tmp, mode='w+', dtype=np.int32,
+                                      shape=(len(filas), n_semanas))
+    datos[:] = np.vstack(filas)
+    datos.flush()
+    del datos
+    ruta_tmp.replace(dir_almacen / ARCHIVO_DATOS)
+    
+    con_casos = np.flatnonzero(filas[0])
+    indice = {
+        'ano_inicio': ano_inicio,
+        'ano_fin': ano_fin,
+        'primera_columna': int(con_casos[0]) if len(con_casos) else 0,
+        'ultima_columna': int(con_casos[-1]) if len(con_casos) else 0,
+        'geografias': geografias
+    }
+    with open(dir_almacen / ARCHIVO_INDICE, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False, indent=2)
+    
+    print(f"[SERIES] Almacen de {len(geografias):,} series semanales guardado en: {dir_almacen}")
+    
+    return dir_almacen
+
+
+def abrir_almacen_series(dir_almacen: str) -> Optional[Dict]:
+    """
+    Abre el almacén en modo memoria mapeada (no se lee el archivo completo).
+    
+    Args:
+        dir_almacen: Directorio del almacén
+    
+    Returns:
+        Diccionario con 'datos' (arreglo int32), 'indice' y 'filas'
+        ((nivel, nombre) -> fila), o None si no existe
+    """
+    dir_almacen = Path(dir_almacen)
+    if not (dir_almacen / ARCHIVO_INDICE).exists():
+        return None
+    
+    with open(dir_almacen / ARCHIVO_INDICE, 'r', encoding='utf-8') as f:
+        indice = json.load(f)
+    
+    return {
+        'datos': np.load(dir_almacen / ARCHIVO_DATOS, mmap_mode='r'),
+        'indice': indice,
+        'filas': {(g['nivel'], _nombre_geografia(g['nombre'])): i
+                  for i, g in enumerate(indice['geografias'])}
+    }
+
+
+def _nombre_geografia(nombre) -> NombreGeografia:
+    """Nombre como clave de `filas` (las listas de JSON pasan a tupla)"""
+    return tuple(nombre) if isinstance(nombre, list) else nombre
+
+
+def _fila(almacen: Dict, nivel: str, nombre: NombreGeografia) -> int:
+    if nivel == 'region':
+        return 0
+    try:
+        return almacen['filas'][(nivel, _nombre_geografia(nombre))]
+    except KeyError:
+        raise KeyError(f"[ERROR] Geografia no encontrada en el almacen: {nivel} '{nombre}'")
+
+
+def obtener_serie(almacen: Dict, nivel: str = 'region', nombre: NombreGeografia = None) -> np.ndarray:
+    """
+    Devuelve la serie semanal completa de una geografía, sin copiar.
+    
+    Args:
+        almacen: Almacén de `abrir_almacen_series`
+        nivel: 'region', 'provincia' o 'distrito'
+        nombre: Nombre de la provincia, o tupla (provincia, distrito); no se usa para la región
+    
+    Returns:
+        Vista int32 de largo (ano_fin - ano_inicio + 1) * 53
+    """
+    return almacen['datos'][_fila(almacen, nivel, nombre)]
+
+
+def casos_semana(almacen: Dict, ano: int, semana: int, nivel: str = 'region',
+                 nombre: NombreGeografia = None) -> int:
+    """
+    Casos de una geografía en una semana (acceso directo por posición).
+    
+    Args:
+        almacen: Almacén de `abrir_almacen_series`
+        ano: Año epidemiológico
+        semana: Semana epidemiológica (1-53)
+        nivel: 'region', 'provincia' o 'distrito'
+        nombre: Nombre de la provincia, o tupla (provincia, distrito)
+    
+    Returns:
+        Número de casos (0 si la semana no tuvo casos)
+    """
+    indice = almacen['indice']
+    if not indice['ano_inicio'] <= ano <= indice['ano_fin'] or not 1 <= semana <= SEMANAS_POR_FILA:
+        return 0
+    return int(obtener_serie(almacen, nivel, nombre)[indice_semana(ano, semana, indice['ano_inicio'])])
+
+
+def matriz_ano_semana(almacen: Dict, nivel: str = 'region', nombre: NombreGeografia = None,
+                      ano_min: Optional[int] = None, ano_max: Optional[int] = None) -> pd.DataFrame:
+    """
+    Devuelve la serie como matriz semana x año (vista sobre el almacén).
+    
+    Args:
+        almacen: Almacén de `abrir_almacen_series`
+        nivel: 'region', 'provincia' o 'distrito'
+        nombre: Nombre de la provincia, o tupla (provincia, distrito)
+        ano_min: Primer año a incluir
+        ano_max: Último año a incluir
+    
+    Returns:
+        DataFrame con índice 'semana' (1-53) y una columna por año
+    """
+    indice = almacen['indice']
+    ano_min = indice['ano_inicio'] if ano_min is None else max(ano_min, indice['ano_inicio'])
+    ano_max = indice['ano_fin'] if ano_max is None else min(ano_max, indice['ano_fin'])
+    
+    matriz = obtener_serie(almacen, nivel, nombre).reshape(-1, SEMANAS_POR_FILA)
+    matriz = matriz[ano_min - indice['ano_inicio']:ano_max - indice['ano_inicio'] + 1]
+    
+    return pd.DataFrame(matriz.T,
+                        index=pd.RangeIndex(1, SEMANAS_POR_FILA + 1, name='semana'),
+                        columns=pd.RangeIndex(ano_min, ano_max + 1, name='ano'))
+
+
+def _codificar_geografia(df: pd.DataFrame, columnas: List[str]):
+    """
+    Códigos enteros (-1 si falta alguna columna) y nombres ordenados de las
+    geografías observadas. Con una columna el nombre es el texto; con varias,
+    la tupla de textos.
+    """
+    codigos, valores = pd.factorize(df[columnas[0]].astype(object), sort=True)
+    if len(columnas) == 1:
+        return codigos, [str(valor) for valor in valores]
+    
+    codigos = codigos.astype(np.int64)
+    valores_columnas = [valores]
+    for col in columnas[1:]:
+        codigos_col, valores_col = pd.factorize(df[col].astype(object), sort=True)
+        codigos = np.where((codigos >= 0) & (codigos_col >= 0), codigos * len(valores_col) + codigos_col, -1)
+        valores_columnas.append(valores_col)
+    
+    # Solo las combinaciones observadas, en orden (primera columna, segunda, ...)
+    conocidos = codigos >= 0
+    presentes, posiciones = np.unique(codigos[conocidos], return_inverse=True)
+    codigos_geografia = np.full(len(codigos), -1, dtype=np.int64)
+    codigos_geografia[conocidos] = posiciones
+    
+    nombres = []
+    for combinado in presentes:
+        partes = []
+        for valores_col in reversed(valores_columnas):
+            combinado, codigo = divmod(int(combinado), len(valores_col))
+            partes.insert(0, str(valores_col[codigo]))
+        nombres.append(tuple(partes))
+    
+    return codigos_geografia, nombres
+
+
+def matrices_semana_ano(df: pd.DataFrame, niveles: Optional[List[str]] = None,
+                        ano_min: Optional[int] = None, ano_max: Optional[int] = None) -> Dict:
+    """
+    Construye en una pasada las matrices semana x año de la región y de cada
+    provincia o distrito, apiladas en un arreglo de 3 dimensiones.
+    
+    Cada registro aporta una clave (geografía, semana, año) y un único
+    `bincount` llena el arreglo (geografías, 53, años); los años van de forma
+    contigua de `ano_min` a `ano_max` y las semanas sin casos quedan en cero.
+    Acepta registros individuales, el cubo de casos o la serie temporal (si
+    `df` tiene la columna 'casos' se usa como peso). Los registros sin año o
+    semana válidos se descartan. Cada geografía se identifica por las columnas
+    de `CLAVES_GEOGRAFIA`: el nombre de un distrito es la tupla
+    (provincia, distrito).
+    
+    Args:
+        df: Datos con 'ano', 'semana' y las columnas de `niveles` (y 'provincia' para 'distrito')
+        niveles: Niveles a apilar tras la región (ej: ['provincia', 'distrito'])
+        ano_min: Primer año (None usa el primero de los datos)
+        ano_max: Último año (None usa el último de los datos)
+    
+    Returns:
+        Diccionario con 'matrices' (arreglo int64 geografías x 53 x años),
+        'anos', 'geografias' y 'filas' ((nivel, nombre) -> posición)
+    """
+    ano = df['ano'].to_numpy(dtype=np.float64)
+    semana = df['semana'].to_numpy(dtype=np.float64)
+    pesos = df['casos'].to_numpy(dtype=np.float64) if 'casos' in df.columns else None
+    
+    validos = np.isfinite(ano) & (semana >= 1) & (semana <= SEMANAS_POR_FILA)
+    if ano_min is None:
+        ano_min = int(ano[validos].min()) if validos.any() else 0
+    if ano_max is None:
+        ano_max = int(ano[validos].max()) if validos.any() else ano_min - 1
+    validos &= (ano >= ano_min) & (ano <= ano_max)
+    n_anos = max(ano_max - ano_min + 1, 0)
+    
+    # Posición dentro de la matriz de una geografía: (semana - 1) * años + (ano - ano_min)
+    celda = (semana[validos].astype(np.int64) - 1) * n_anos + (ano[validos].astype(np.int64) - ano_min)
+    tamano = SEMANAS_POR_FILA * n_anos
+    
+    geografias = [{'nivel': 'region', 'nombre': None}]
+    claves = [celda]
+    pesos_claves = None if pesos is None else [pesos[validos]]
+    for nivel in niveles or []:
+        codigos, nombres = _codificar_geografia(df, CLAVES_GEOGRAFIA.get(nivel, [nivel]))
+        codigos = codigos[validos]
+        conocidos = codigos >= 0
+        claves.append((len(geografias) + codigos[conocidos]) * tamano + celda[conocidos])
+        if pesos_claves is not None:
+            pesos_claves.append(pesos[validos][conocidos])
+        geografias.extend({'nivel': nivel, 'nombre': nombre} for nombre in nombres)
+    
+    conteo = np.bincount(np.concatenate(claves),
+                         weights=None if pesos_claves is None else np.concatenate(pesos_claves),
+                         minlength=len(geografias) * tamano)
+    
+    return {
+        'matrices': conteo.astype(np.int64).reshape(len(geografias), SEMANAS_POR_FILA, n_anos),
+        'anos': pd.RangeIndex(ano_min, ano_max + 1, name='ano'),
+        'geografias': geografias,
+        'filas': {(g['nivel'], g['nombre']): i for i, g in enumerate(geografias)}
+    }
+
+
+def matriz_semanas(matrices: Dict, nivel: str = 'region', nombre: NombreGeografia = None) -> pd.DataFrame:
+    """
+    Devuelve la matriz semana x año de una geografía (vista sobre `matrices_semana_ano`).
+    
+    Args:
+        matrices: Resultado de `matrices_semana_ano`
+        nivel: 'region', 'provincia' o 'distrito'
+        nombre: Nombre de la provincia, o tupla (provincia, distrito)
+    
+    Returns:
+        DataFrame con índice 'semana' (1-53) y una columna por año
+    """
+    clave = ('region', None) if nivel == 'region' else (nivel, nombre)
+    if clave not in matrices['filas']:
+        raise KeyError(f"[ERROR] Geografia no encontrada en las matrices: {nivel} '{nombre}'")
+    
+    return pd.DataFrame(matrices['matrices'][matrices['filas'][clave]],
+                        index=pd.RangeIndex(1, SEMANAS_POR_FILA + 1, name='semana'),
+                        columns=matrices['anos'])
+
+
+def serie_pandas(almacen: Dict, nivel: str = 'region', nombre: NombreGeografia = None) -> pd.Series:
+    """
+    Devuelve la serie como pandas.Series indexada por fecha de inicio de semana.
+    
+    La serie va de la primera a la última semana con casos de la región; las
+    semanas intermedias sin casos valen 0 y se omiten las posiciones que no
+    existen en el calendario (semana 53 de los años de 52 semanas).
+    
+    Args:
+        almacen: Almacén de `abrir_almacen_series`
+        nivel: 'region', 'provincia' o 'distrito'
+        nombre: Nombre de la provincia, o tupla (provincia, distrito)
+    
+    Returns:
+        Serie 'casos' indexada por 'fecha'
+    """
+    indice = almacen['indice']
+    columnas = np.arange(indice['primera_columna'], indice['ultima_columna'] + 1)
+    fechas = fecha_inicio_semana(indice['ano_inicio'] + columnas // SEMANAS_POR_FILA,
+                                 columnas % SEMANAS_POR_FILA + 1)
+    valores = obtener_serie(almacen, nivel, nombre)[columnas]
+    
+    validas = ~np.isnat(fechas)
+    return pd.Series(valores[validas], index=pd.DatetimeIndex(fechas[validas], name='fecha'), name='casos')
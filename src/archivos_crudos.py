@@ -0,0 +1,146 @@
+"""
+Módulo de apertura de archivos crudos (CSV plano o comprimido) con detección de codificación
+Sistema de Análisis de Dengue en Perú
+"""
+
+import codecs
+import gzip
+import io
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, TextIO
+
+
+# Extensiones de archivo comprimido que se leen directamente, sin descomprimir a disco
+EXTENSIONES_COMPRIMIDAS = ('.zip', '.gz', '.zst')
+EXTENSIONES_CRUDAS = ('.csv',) + tuple(f'.csv{ext}' for ext in EXTENSIONES_COMPRIMIDAS) + EXTENSIONES_COMPRIMIDAS
+
+# Bytes descomprimidos que se examinan para decidir la codificación
+TAMANO_MUESTRA_CODIFICACION = 1024 * 1024
+
+
+def es_comprimido(ruta_archivo: str) -> bool:
+    """Indica si el archivo es un .zip, .gz o .zst"""
+    return Path(ruta_archivo).suffix.lower() in EXTENSIONES_COMPRIMIDAS
+
+
+def _miembro_csv(archivo_zip: zipfile.ZipFile) -> str:
+    """Nombre del CSV dentro del .zip (el único, o el primero que termina en .csv)"""
+    nombres = [info.filename for info in archivo_zip.infolist() if not info.is_dir()]
+    candidatos = [nombre for nombre in nombres if nombre.lower().endswith('.csv')] or nombres
+    if not candidatos:
+        raise FileNotFoundError(f"[ERROR] El archivo zip no contiene un CSV: {archivo_zip.filename}")
+    return candidatos[0]
+
+
+@contextmanager
+def abrir_binario(ruta_archivo: str) -> Iterator[BinaryIO]:
+    """
+    Abre el archivo crudo como flujo binario, descomprimiendo al vuelo.
+    
+    Los .gz y .zip se leen con la biblioteca estándar; los .zst requieren
+    el paquete opcional `zstandard`.
+    
+    Args:
+        ruta_archivo: Ruta al CSV o al archivo comprimido
+    
+    Yields:
+        Flujo binario con el contenido del CSV
+    
+    Raises:
+        Exception: Si el archivo es .zst y `zstandard` no está instalado
+    """
+    ruta = Path(ruta_archivo)
+    if not ruta.exists():
+        raise FileNotFoundError(f"[ERROR] No se encontro el archivo: {ruta_archivo}")
+    extension = ruta.suffix.lower()
+    
+    if extension == '.gz':
+        with gzip.open(ruta, 'rb') as flujo:
+            yield flujo
+    elif extension == '.zip':
+        with zipfile.ZipFile(ruta) as archivo_zip, archivo_zip.open(_miembro_csv(archivo_zip)) as flujo:
+            yield flujo
+    elif extension == '.zst':
+        try:
+            import zstandard
+        except ImportError:
+            raise Exception(f"[ERROR] Leer {ruta.name} requiere el paquete opcional zstandard "
+                            f"(pip install zstandard) o descomprimir el archivo")
+        with open(ruta, 'rb') as comprimido, zstandard.ZstdDecompressor().stream_reader(comprimido) as flujo:
+            yield flujo
+    else:
+        with open(ruta, 'rb') as flujo:
+            yield flujo
+
+
+def detectar_codificacion(ruta_archivo: str, tamano_muestra: int = TAMANO_MUESTRA_CODIFICACION) -> str:
+    """
+    Detecta la codificación del CSV examinando solo el primer bloque descomprimido.
+    
+    Si el bloque es UTF-8 válido se usa 'utf-8' ('utf-8-sig' si empieza con
+    BOM); si no, 'latin-1', que es la alternativa habitual de los archivos del
+    portal. Un carácter multibyte cortado al final del bloque no cuenta como error.
+    
+    Args:
+        ruta_archivo: Ruta al CSV o al archivo comprimido
+        tamano_muestra: Bytes descomprimidos a examinar
+    
+    Returns:
+        Nombre de la codificación
+    """
+    with abrir_binario(ruta_archivo) as flujo:
+        muestra = flujo.read(tamano_muestra)
+    
+    if muestra.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(muestra, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+@contextmanager
+def abrir_texto(ruta_archivo: str, codificacion: Optional[str] = None) -> Iterator[TextIO]:
+    """
+    Abre el archivo crudo como flujo de texto decodificado, listo para `pd.read_csv`.
+    
+    Args:
+        ruta_archivo: Ruta al CSV o al archivo comprimido
+        codificacion: Codificación a usar (None la detecta con `detectar_codificacion`)
+    
+    Yields:
+        Flujo de texto
+    """
+    if codificacion is None:
+        codificacion = detectar_codificacion(ruta_archivo)
+    if codificacion != 'utf-8':
+        print(f"[INGESTA] Codificacion detectada: {codificacion}")
+    
+    with abrir_binario(ruta_archivo) as flujo:
+        texto = io.TextIOWrapper(flujo, encoding=codificacion, newline='')
+        try:
+            yield texto
+        finally:
+            texto.detach()
+
+
+def resolver_ruta_cruda(ruta_archivo: str) -> Path:
+    """
+    Devuelve el archivo crudo disponible: el CSV indicado o su versión comprimida.
+    
+    Para 'datos.csv' se buscan, en orden, 'datos.csv', 'datos.csv.zip',
+    'datos.csv.gz', 'datos.csv.zst', 'datos.zip', 'datos.gz' y 'datos.zst'.
+    
+    Args:
+        ruta_archivo: Ruta esperada del CSV
+    
+    Returns:
+        Ruta del archivo existente (la original si no hay ninguno)
+    """
+    ruta = Path(ruta_archivo)
+    base = ruta.with_suffix('') if ruta.suffix.lower() == '.csv' else ruta
+    candidatos = [ruta] + [base.with_name(base.name + ext) for ext in EXTENSIONES_CRUDAS]
+    return next((candidato for candidato in candidatos if candidato.exists()), ruta)
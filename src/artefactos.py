@@ -0,0 +1,175 @@
+"""
+Módulo de memoización de artefactos (gráficos, reportes y predicciones) por huella de entrada
+Sistema de Análisis de Dengue en Perú
+"""
+
+import hashlib
+import json
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from cache_datos import calcular_hash_archivo
+
+
+# Manifiesto de cada directorio de salida: nombre del artefacto -> huella de
+# entrada, suma del contenido y metadatos (ej: métricas del modelo)
+NOMBRE_MANIFIESTO = '.artefactos.json'
+
+REGENERADO = 'regenerado'
+REUTILIZADO = 'reutilizado'
+
+
+def _actualizar_huella(h, parte) -> None:
+    """Agrega una parte de la entrada (datos o parámetros) al hash"""
+    if isinstance(parte, (pd.DataFrame, pd.Series)):
+        h.update(type(parte).__name__.encode())
+        columnas = parte.columns if isinstance(parte, pd.DataFrame) else [parte.name]
+        h.update(json.dumps([str(c) for c in columnas]).encode())
+        h.update(pd.util.hash_pandas_object(parte, index=True).to_numpy().tobytes())
+    elif isinstance(parte, np.ndarray):
+        h.update(f"{parte.dtype}{parte.shape}".encode())
+        h.update(np.ascontiguousarray(parte).tobytes())
+    elif isinstance(parte, dict):
+        for clave in sorted(parte, key=str):
+            h.update(str(clave).encode())
+            _actualizar_huella(h, parte[clave])
+    elif isinstance(parte, (list, tuple)):
+        h.update(f"{type(parte).__name__}{len(parte)}".encode())
+        for elemento in parte:
+            _actualizar_huella(h, elemento)
+    else:
+        h.update(json.dumps(parte, default=str).encode())
+
+
+def huella_entrada(*partes) -> str:
+    """
+    Calcula la huella de la entrada de un artefacto.
+    
+    Las partes pueden ser DataFrames o Series (se incluyen el índice, los
+    nombres de columna y los valores), arreglos de NumPy, diccionarios,
+    listas o valores simples como parámetros de graficado o del modelo.
+    
+    Args:
+        *partes: Porción de datos y parámetros de los que depende el artefacto
+    
+    Returns:
+        Hash hexadecimal (BLAKE2b)
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        _actualizar_huella(h, parte)
+    return h.hexdigest()
+
+
+def _ruta_manifiesto(ruta_artefacto: Path) -> Path:
+    return ruta_artefacto.parent / NOMBRE_MANIFIESTO
+
+
+def _leer_manifiesto(ruta_manifiesto: Path) -> Dict:
+    try:
+        with open(ruta_manifiesto, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def artefacto_vigente(ruta_artefacto: str, huella: str) -> bool:
+    """
+    Indica si el artefacto existe, se generó con la misma entrada y no se modificó después.
+    
+    Args:
+        ruta_artefacto: Ruta del gráfico, reporte o tabla
+        huella: Huella de entrada actual (ver `huella_entrada`)
+    
+    Returns:
+        True si puede reutilizarse
+    """
+    ruta = Path(ruta_artefacto)
+    registro = _leer_manifiesto(_ruta_manifiesto(ruta)).get(ruta.name)
+    if registro is None or registro.get('entrada') != huella or not ruta.exists():
+        return False
+    return calcular_hash_archivo(str(ruta)) == registro.get('contenido')
+
+
+def registrar_artefacto(ruta_artefacto: str, huella: str, metadatos: Optional[Dict] = None) -> None:
+    """
+    Registra en el manifiesto del directorio la huella de entrada del artefacto recién escrito.
+    
+    Args:
+        ruta_artefacto: Ruta del artefacto
+        huella: Huella de entrada con la que se generó
+        metadatos: Valores a recuperar cuando se reutilice (deben ser serializables a JSON)
+    """
+    ruta = Path(ruta_artefacto)
+    ruta_manifiesto = _ruta_manifiesto(ruta)
+    manifiesto = _leer_manifiesto(ruta_manifiesto)
+    manifiesto[ruta.name] = {
+        'entrada': huella,
+        'contenido': calcular_hash_archivo(str(ruta)),
+        'metadatos': metadatos or {}
+    }
+    
+    ruta_tmp = ruta_manifiesto.with_name(ruta_manifiesto.name + '.tmp')
+    with open(ruta_tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2, sort_keys=True)
+    ruta_tmp.replace(ruta_manifiesto)
+
+
+def leer_metadatos_artefacto(ruta_artefacto: str) -> Dict:
+    """Metadatos registrados junto al artefacto (vacío si no hay registro)"""
+    ruta = Path(ruta_artefacto)
+    return _leer_manifiesto(_ruta_manifiesto(ruta)).get(ruta.name, {}).get('metadatos', {})
+
+
+def memoizar_artefactos(rutas: List[str], huella: str, generar: Callable[[], Optional[Dict]],
+                        estado: Dict[str, str], forzar: bool = False) -> bool:
+    """
+    Genera un grupo de artefactos solo si alguno no está vigente.
+    
+    Args:
+        rutas: Artefactos que escribe `generar`
+        huella: Huella de entrada del grupo
+        generar: Función que escribe los artefactos; puede devolver metadatos
+        estado: Diccionario ruta -> 'regenerado' o 'reutilizado', se actualiza
+        forzar: Si True, regenera aunque los artefactos estén vigentes
+    
+    Returns:
+        True si se regeneraron
+    """
+    if not forzar and all(artefacto_vigente(ruta, huella) for ruta in rutas):
+        estado.update({str(ruta): REUTILIZADO for ruta in rutas})
+        return False
+    
+    metadatos = generar()
+    for ruta in rutas:
+        registrar_artefacto(ruta, huella, metadatos)
+        estado[str(ruta)] = REGENERADO
+    return True
+
+
+def generar_reporte_artefactos(estado: Dict[str, str]) -> str:
+    """
+    Genera el resumen de artefactos regenerados y reutilizados.
+    
+    Args:
+        estado: Diccionario ruta -> 'regenerado' o 'reutilizado'
+    
+    Returns:
+        String con el reporte
+    """
+    reporte = []
+    reporte.append("=" * 60)
+    reporte.append("ARTEFACTOS")
+    reporte.append("=" * 60)
+    
+    for etiqueta in (REGENERADO, REUTILIZADO):
+        rutas = [ruta for ruta, valor in estado.items() if valor == etiqueta]
+        reporte.append(f"\n{etiqueta.capitalize()}s: {len(rutas)}")
+        for ruta in rutas:
+            reporte.append(f"  - {Path(ruta).name}")
+    
+    reporte.append("\n" + "=" * 60)
+    
+    return "\n".join(reporte)
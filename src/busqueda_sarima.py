@@ -0,0 +1,446 @@
+"""
+Módulo de búsqueda de órdenes SARIMA en paralelo con ranking por AIC/BIC o error de validación
+Sistema de Análisis de Dengue en Perú
+"""
+
+import ast
+import itertools
+import os
+import time
+import pandas as pd
+import numpy as np
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import warnings
+warnings.filterwarnings('ignore')
+
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+from artefactos import huella_entrada, memoizar_artefactos
+
+
+# Rejilla por defecto: diferenciación regular y estacional fijas (d = D = 1,
+# como en los modelos de los scripts) y órdenes AR/MA bajos
+REJILLA_POR_DEFECTO = {
+    'p': (0, 1, 2),
+    'd': (1,),
+    'q': (0, 1, 2),
+    'P': (0, 1),
+    'D': (1,),
+    'Q': (0, 1),
+    's': 52
+}
+
+# 'aic' y 'bic' usan el ajuste; 'mae' y 'rmse' el error de la predicción
+# sobre la validación. La serie de prueba no interviene en la búsqueda, queda
+# reservada para la evaluación final del modelo elegido
+CRITERIOS = ('aic', 'bic', 'mae', 'rmse')
+CRITERIO_POR_DEFECTO = 'aic'
+
+# Semanas finales de la serie de entrenamiento que se reservan como validación
+SEMANAS_VALIDACION = 52
+
+# Presupuesto de cada ajuste: iteraciones del optimizador y segundos de reloj
+MAXITER_BUSQUEDA = 50
+SEGUNDOS_POR_AJUSTE = 600
+
+CONVERGIO = 'convergio'
+NO_CONVERGIO = 'no_convergio'
+TIEMPO_AGOTADO = 'tiempo_agotado'
+ERROR = 'error'
+OMITIDO = 'omitido'
+
+COLUMNAS_TABLA = ['posicion', 'order', 'seasonal_order', 'estado', 'aic', 'bic', 'mae', 'rmse',
+                  'iteraciones', 'segundos', 'detalle']
+
+
+def generar_candidatos(rejilla: Optional[Dict] = None) -> List[Tuple[Tuple, Tuple]]:
+    """
+    Genera los candidatos (order, seasonal_order) de la rejilla.
+    
+    Los candidatos se ordenan de menor a mayor número de parámetros AR/MA, de
+    modo que cada modelo aparece después de los modelos anidados en él.
+    
+    Args:
+        rejilla: Valores de 'p', 'd', 'q', 'P', 'D', 'Q' y 's' (None usa `REJILLA_POR_DEFECTO`)
+    
+    Returns:
+        Lista de tuplas ((p, d, q), (P, D, Q, s))
+    """
+    rejilla = {**REJILLA_POR_DEFECTO, **(rejilla or {})}
+    candidatos = [
+        ((p, d, q), (P, D, Q, rejilla['s']))
+        for p, d, q, P, D, Q in itertools.product(rejilla['p'], rejilla['d'], rejilla['q'],
+                                                   rejilla['P'], rejilla['D'], rejilla['Q'])
+    ]
+    return sorted(candidatos, key=lambda c: (c[0][0] + c[0][2] + c[1][0] + c[1][2], c))
+
+
+def dividir_validacion(serie_train: pd.Series,
+                       semanas_validacion: int = SEMANAS_VALIDACION) -> Tuple[pd.Series, pd.Series]:
+    """
+    Separa las últimas semanas de la serie de entrenamiento como validación.
+    
+    Args:
+        serie_train: Serie de entrenamiento
+        semanas_validacion: Semanas finales reservadas para validación
+    
+    Returns:
+        Tupla (serie de ajuste, serie de validación)
+    """
+    if not 0 < semanas_validacion < len(serie_train):
+        raise ValueError(f"[ERROR] La validacion ({semanas_validacion} semanas) debe ser menor que "
+                         f"la serie de entrenamiento ({len(serie_train)} semanas)")
+    return serie_train.iloc[:-semanas_validacion], serie_train.iloc[-semanas_validacion:]
+
+
+def es_anidado(menor: Tuple[Tuple, Tuple], mayor: Tuple[Tuple, Tuple]) -> bool:
+    """
+    Indica si `menor` es un modelo anidado en `mayor`: misma diferenciación y
+    estacionalidad, y órdenes p, q, P, Q menores o iguales (sin ser el mismo modelo).
+    """
+    (p1, d1, q1), (P1, D1, Q1, s1) = menor
+    (p2, d2, q2), (P2, D2, Q2, s2) = mayor
+    return ((d1, D1, s1) == (d2, D2, s2) and menor != mayor
+            and p1 <= p2 and q1 <= q2 and P1 <= P2 and Q1 <= Q2)
+
+
+def ajustar_candidato(tarea: Dict) -> Dict:
+    """
+    Ajusta un candidato SARIMA con presupuesto de iteraciones y de tiempo.
+    
+    El modelo se ajusta sobre la serie de ajuste (AIC y BIC) y predice la de
+    validación (MAE y RMSE). El tiempo se controla en cada iteración del
+    optimizador: si se supera, el ajuste se interrumpe y el candidato queda
+    como 'tiempo_agotado'. Los errores no se propagan, se devuelven en el
+    resultado.
+    
+    Args:
+        tarea: Diccionario con 'serie_ajuste', 'serie_validacion', 'order', 'seasonal_order',
+            'maxiter' y 'segundos'
+    
+    Returns:
+        Diccionario con order, seasonal_order, estado, aic, bic, mae, rmse,
+        iteraciones, segundos y detalle
+    """
+    inicio = time.perf_counter()
+    resultado = {
+        'order': tarea['order'],
+        'seasonal_order': tarea['seasonal_order'],
+        'estado': ERROR,
+        'aic': np.nan,
+        'bic': np.nan,
+        'mae': np.nan,
+        'rmse': np.nan,
+        'iteraciones': 0,
+        'segundos': 0.0,
+        'detalle': ''
+    }
+    
+    def controlar_tiempo(_):
+        resultado['iteraciones'] += 1
+        if time.perf_counter() - inicio > tarea['segundos']:
+            raise TimeoutError(f"mas de {tarea['segundos']} s")
+    
+    try:
+        modelo = SARIMAX(
+            tarea['serie_ajuste'],
+            order=tarea['order'],
+            seasonal_order=tarea['seasonal_order'],
+            enforce_stationarity=False,
+            enforce_invertibility=False
+        )
+        ajuste = modelo.fit(disp=False, maxiter=tarea['maxiter'], callback=controlar_tiempo)
+    
+        predicciones = ajuste.forecast(steps=len(tarea['serie_validacion']))
+        errores = np.asarray(tarea['serie_validacion'], dtype=float) - np.asarray(predicciones, dtype=float)
+    
+        convergio = bool(ajuste.mle_retvals.get('converged', False)) and np.isfinite(ajuste.aic)
+        resultado.update({
+            'estado': CONVERGIO if convergio else NO_CONVERGIO,
+            'aic': float(ajuste.aic),
+            'bic': float(ajuste.bic),
+            'mae': float(np.mean(np.abs(errores))),
+            'rmse': float(np.sqrt(np.mean(errores ** 2))),
+            'iteraciones': int(ajuste.mle_retvals.get('iterations', resultado['iteraciones']))
+        })
+    except TimeoutError as e:
+        resultado.update({'estado': TIEMPO_AGOTADO, 'detalle': str(e)})
+    except Exception as e:
+        resultado.update({'estado': ERROR, 'detalle': f"{type(e).__name__}: {e}"})
+    
+    resultado['segundos'] = time.perf_counter() - inicio
+    return resultado
+
+
+def _resultado_omitido(candidato: Tuple[Tuple, Tuple], fallido: Tuple[Tuple, Tuple]) -> Dict:
+    return {
+        'order': candidato[0],
+        'seasonal_order': candidato[1],
+        'estado': OMITIDO,
+        'aic': np.nan,
+        'bic': np.nan,
+        'mae': np.nan,
+        'rmse': np.nan,
+        'iteraciones': 0,
+        'segundos': 0.0,
+        'detalle': f"anidado {fallido[0]}{fallido[1]} no convergio"
+    }
+
+
+def _informar_candidato(resultado: Dict, criterio: str) -> None:
+    nombre = f"{resultado['order']}{resultado['seasonal_order']}"
+    if resultado['estado'] == CONVERGIO:
+        print(f"[BUSQUEDA] {nombre}: {criterio.upper()} {resultado[criterio]:.2f} "
+              f"({resultado['iteraciones']} iteraciones, {resultado['segundos']:.1f} s)")
+    else:
+        detalle = f": {resultado['detalle']}" if resultado['detalle'] else ''
+        print(f"[AVISO] {nombre}: {resultado['estado']}{detalle}")
+
+
+def tabla_posiciones(resultados: List[Dict], criterio: str = CRITERIO_POR_DEFECTO) -> pd.DataFrame:
+    """
+    Ordena los resultados por el criterio; solo los candidatos que convergieron reciben posición.
+    
+    Args:
+        resultados: Resultados de `ajustar_candidato`
+        criterio: 'aic', 'bic', 'mae' o 'rmse' (menor es mejor)
+    
+    Returns:
+        DataFrame con una fila por candidato (órdenes como texto, ej: '(1, 1, 1)')
+    """
+    if criterio not in CRITERIOS:
+        raise ValueError(f"[ERROR] Criterio desconocido: '{criterio}' (opciones: {', '.join(CRITERIOS)})")
+    
+    tabla = pd.DataFrame(resultados, columns=COLUMNAS_TABLA[1:])
+    tabla['order'] = tabla['order'].astype(str)
+    tabla['seasonal_order'] = tabla['seasonal_order'].astype(str)
+    
+    convergidos = tabla['estado'] == CONVERGIO
+    tabla = pd.concat([
+        tabla[convergidos].sort_values(criterio, kind='stable'),
+        tabla[~convergidos]
+    ], ignore_index=True)
+    tabla.insert(0, 'posicion', pd.array(
+        list(range(1, int(convergidos.sum()) + 1)) + [None] * int((~convergidos).sum()), dtype='Int64'))
+    
+    return tabla
+
+
+def guardar_tabla_posiciones(tabla: pd.DataFrame, ruta_tabla: str) -> None:
+    """Escribe la tabla de posiciones de forma atómica (archivo temporal y reemplazo)"""
+    ruta = Path(ruta_tabla)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta_tmp = ruta.with_name(ruta.name + '.tmp')
+    tabla.to_csv(ruta_tmp, index=False)
+    ruta_tmp.replace(ruta)
+
+
+def buscar_ordenes_sarima(serie_train: pd.Series,
+                          candidatos: Optional[List[Tuple[Tuple, Tuple]]] = None,
+                          criterio: str = CRITERIO_POR_DEFECTO, procesos: Optional[int] = None,
+                          maxiter: int = MAXITER_BUSQUEDA, segundos_por_ajuste: float = SEGUNDOS_POR_AJUSTE,
+                          omitir_anidados: bool = True, ruta_tabla: Optional[str] = None,
+                          semanas_validacion: int = SEMANAS_VALIDACION) -> pd.DataFrame:
+    """
+    Ajusta los candidatos SARIMA en una piscina de procesos y los ordena por el criterio.
+    
+    Un candidato se lanza cuando terminaron los candidatos de la rejilla
+    anidados en él; si alguno de ellos no convergió (error, tiempo agotado o
+    iteraciones agotadas), el candidato se omite sin ajustarlo. Con
+    `ruta_tabla`, la tabla de posiciones se reescribe tras cada ajuste, de
+    modo que el progreso queda guardado aunque la búsqueda se interrumpa.
+    
+    Los candidatos se ajustan sin las últimas `semanas_validacion` semanas de
+    `serie_train`, que sirven para MAE y RMSE (ver `dividir_validacion`).
+    
+    Args:
+        serie_train: Serie de entrenamiento (la de prueba no se usa en la búsqueda)
+        candidatos: Tuplas (order, seasonal_order) (None usa `generar_candidatos()`)
+        criterio: 'aic', 'bic', 'mae' o 'rmse'
+        procesos: Procesos de la piscina (None usa todos los núcleos; 1 ajusta en el proceso actual)
+        maxiter: Iteraciones máximas del optimizador por ajuste
+        segundos_por_ajuste: Tiempo máximo de cada ajuste
+        omitir_anidados: Si False, se ajustan todos los candidatos
+        ruta_tabla: CSV donde guardar la tabla de posiciones (opcional)
+        semanas_validacion: Semanas finales de `serie_train` reservadas para validación
+    
+    Returns:
+        Tabla de posiciones (ver `tabla_posiciones`)
+    """
+    if criterio not in CRITERIOS:
+        raise ValueError(f"[ERROR] Criterio desconocido: '{criterio}' (opciones: {', '.join(CRITERIOS)})")
+    serie_ajuste, serie_validacion = dividir_validacion(serie_train, semanas_validacion)
+    
+    candidatos = generar_candidatos() if candidatos is None else list(candidatos)
+    anidados = {c: [m for m in candidatos if es_anidado(m, c)] if omitir_anidados else [] for c in candidatos}
+    if procesos is None:
+        procesos = min(len(candidatos), os.cpu_count() or 1)
+    
+    print(f"[BUSQUEDA] {len(candidatos)} candidatos, criterio {criterio.upper()}, "
+          f"{procesos} procesos, maximo {maxiter} iteraciones y {segundos_por_ajuste:.0f} s por ajuste")
+    print(f"[BUSQUEDA] Ajuste: {len(serie_ajuste)} semanas, validacion: {len(serie_validacion)} semanas")
+    
+    def tarea(candidato):
+        return {'serie_ajuste': serie_ajuste, 'serie_validacion': serie_validacion, 'order': candidato[0],
+                'seasonal_order': candidato[1], 'maxiter': maxiter, 'segundos': segundos_por_ajuste}
+    
+    resultados = {}
+    pendientes = list(candidatos)
+    
+    def registrar(candidato, resultado):
+        resultados[candidato] = resultado
+        _informar_candidato(resultado, criterio)
+        if ruta_tabla is not None:
+            guardar_tabla_posiciones(tabla_posiciones(list(resultados.values()), criterio), ruta_tabla)
+    
+    def listos():
+        """Candidatos cuyos anidados ya terminaron; omite los que tienen un anidado fallido"""
+        for candidato in list(pendientes):
+            fallidos = [m for m in anidados[candidato]
+                        if m in resultados and resultados[m]['estado'] != CONVERGIO]
+            if fallidos:
+                pendientes.remove(candidato)
+                registrar(candidato, _resultado_omitido(candidato, fallidos[0]))
+            elif all(m in resultados for m in anidados[candidato]):
+                pendientes.remove(candidato)
+                yield candidato
+    
+    inicio = time.perf_counter()
+    if procesos <= 1:
+        # Los anidados van antes en `candidatos`, de modo que siempre están resueltos
+        while pendientes:
+            for candidato in listos():
+                registrar(candidato, ajustar_candidato(tarea(candidato)))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as piscina:
+            en_curso = {}
+            while pendientes or en_curso:
+                for candidato in listos():
+                    en_curso[piscina.submit(ajustar_candidato, tarea(candidato))] = candidato
+                if not en_curso:
+                    continue
+                terminados, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    registrar(en_curso.pop(futuro), futuro.result())
+    
+    tabla = tabla_posiciones([resultados[c] for c in candidatos], criterio)
+    if ruta_tabla is not None:
+        guardar_tabla_posiciones(tabla, ruta_tabla)
+        print(f"[OK] Tabla de posiciones guardada en: {ruta_tabla}")
+    
+    print(f"[BUSQUEDA] {int((tabla['estado'] == CONVERGIO).sum())} de {len(tabla)} candidatos "
+          f"convergieron en {time.perf_counter() - inicio:.1f} s")
+    
+    return tabla
+
+
+def mejor_candidato(tabla: pd.DataFrame) -> Tuple[Tuple, Tuple]:
+    """
+    Devuelve el candidato en primera posición de la tabla.
+    
+    Args:
+        tabla: Tabla de posiciones (en memoria o leída del CSV)
+    
+    Returns:
+        Tupla (order, seasonal_order)
+    """
+    primeros = tabla[tabla['posicion'] == 1]
+    if primeros.empty:
+        raise Exception("[ERROR] Ningun candidato SARIMA convergio")
+    fila = primeros.iloc[0]
+    return tuple(ast.literal_eval(fila['order'])), tuple(ast.literal_eval(fila['seasonal_order']))
+
+
+def seleccionar_orden_sarima(serie_train: pd.Series, ruta_tabla: str,
+                             estado: Dict[str, str], candidatos: Optional[List[Tuple[Tuple, Tuple]]] = None,
+                             criterio: str = CRITERIO_POR_DEFECTO, procesos: Optional[int] = None,
+                             maxiter: int = MAXITER_BUSQUEDA, segundos_por_ajuste: float = SEGUNDOS_POR_AJUSTE,
+                             forzar: bool = False,
+                             por_defecto: Optional[Tuple[Tuple, Tuple]] = None,
+                             semanas_validacion: int = SEMANAS_VALIDACION) -> Tuple[Tuple, Tuple]:
+    """
+    Busca el mejor orden SARIMA, reutilizando la tabla de posiciones si la
+    serie, la rejilla y los presupuestos no cambiaron (ver `artefactos`).
+    
+    Solo recibe la serie de entrenamiento: el orden se elige sobre su tramo
+    final de validación, y la serie de prueba queda libre para evaluar el
+    modelo elegido sin sesgo.
+    
+    Args:
+        serie_train: Serie de entrenamiento
+        ruta_tabla: CSV de la tabla de posiciones
+        estado: Diccionario ruta -> 'regenerado' o 'reutilizado', se actualiza
+        candidatos: Tuplas (order, seasonal_order) (None usa `generar_candidatos()`)
+        criterio: 'aic', 'bic', 'mae' o 'rmse'
+        procesos: Procesos de la piscina
+        maxiter: Iteraciones máximas por ajuste
+        segundos_por_ajuste: Tiempo máximo por ajuste
+        forzar: Si True, repite la búsqueda aunque la tabla esté vigente
+        por_defecto: Orden a usar si ningún candidato converge (None lanza una excepción)
+        semanas_validacion: Semanas finales de `serie_train` reservadas para validación
+    
+    Returns:
+        Tupla (order, seasonal_order) del mejor candidato
+    """
+    candidatos = generar_candidatos() if candidatos is None else list(candidatos)
+    huella = huella_entrada('busqueda_sarima', serie_train,
+                            {'candidatos': candidatos, 'criterio': criterio, 'maxiter': maxiter,
+                             'segundos_por_ajuste': segundos_por_ajuste,
+                             'semanas_validacion': semanas_validacion})
+    
+    def buscar():
+        buscar_ordenes_sarima(serie_train, candidatos, criterio, procesos, maxiter, segundos_por_ajuste,
+                              ruta_tabla=str(ruta_tabla), semanas_validacion=semanas_validacion)
+    
+    if not memoizar_artefactos([str(ruta_tabla)], huella, buscar, estado, forzar=forzar):
+        print(f"[BUSQUEDA] Serie y rejilla sin cambios, se reutiliza la tabla: {ruta_tabla}")
+    
+    tabla = pd.read_csv(ruta_tabla, dtype={'posicion': 'Int64'})
+    print("\n" + generar_reporte_busqueda(tabla, criterio, semanas_validacion=semanas_validacion))
+    
+    if por_defecto is not None and not (tabla['posicion'] == 1).any():
+        print(f"[AVISO] Ningun candidato convergio, se usa el orden por defecto {por_defecto[0]}{por_defecto[1]}")
+        return por_defecto
+    
+    return mejor_candidato(tabla)
+
+
+def generar_reporte_busqueda(tabla: pd.DataFrame, criterio: str = CRITERIO_POR_DEFECTO, top_n: int = 10,
+                             semanas_validacion: Optional[int] = None) -> str:
+    """
+    Genera el reporte de la búsqueda: mejores candidatos y resumen por estado.
+    
+    Args:
+        tabla: Tabla de posiciones
+        criterio: Criterio de la tabla
+        top_n: Candidatos a listar
+        semanas_validacion: Semanas de validación de MAE y RMSE (se informan si se indican)
+    
+    Returns:
+        String con el reporte
+    """
+    reporte = []
+    reporte.append("=" * 60)
+    reporte.append("BUSQUEDA DE ORDENES SARIMA")
+    reporte.append("=" * 60)
+    
+    reporte.append(f"\nCriterio: {criterio.upper()}")
+    if semanas_validacion is not None:
+        reporte.append(f"Validacion (MAE, RMSE): ultimas {semanas_validacion} semanas de entrenamiento")
+    reporte.append(f"Candidatos: {len(tabla)}")
+    for estado_ajuste, cantidad in tabla['estado'].value_counts().items():
+        reporte.append(f"  - {estado_ajuste}: {cantidad}")
+    
+    mejores = tabla[tabla['posicion'].notna()].head(top_n)
+    if not mejores.empty:
+        reporte.append(f"\nMejores candidatos:")
+        for _, fila in mejores.iterrows():
+            reporte.append(f"  {int(fila['posicion'])}. {fila['order']}{fila['seasonal_order']}: "
+                           f"AIC {fila['aic']:.2f}, BIC {fila['bic']:.2f}, "
+                           f"MAE {fila['mae']:.2f}, RMSE {fila['rmse']:.2f} ({fila['segundos']:.1f} s)")
+    
+    reporte.append("\n" + "=" * 60)
+    
+    return "\n".join(reporte)
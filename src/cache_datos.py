@@ -0,0 +1,265 @@
+"""
+Módulo de caché columnar del dataset crudo
+Sistema de Análisis de Dengue en Perú
+"""
+
+import hashlib
+import json
+import re
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from archivos_crudos import abrir_texto
+
+
+TAMANO_BLOQUE_HASH = 8 * 1024 * 1024
+NOMBRE_DIR_CACHE = '.cache'
+
+# Filas por bloque al convertir el CSV a Parquet
+TAMANO_CHUNK_CACHE = 500_000
+
+
+def calcular_hash_archivo(ruta_archivo: str) -> str:
+    """
+    Calcula el hash de contenido (BLAKE2b) de un archivo leyéndolo por bloques.
+    
+    Args:
+        ruta_archivo: Ruta al archivo
+    
+    Returns:
+        Hash hexadecimal del contenido
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(ruta_archivo, 'rb') as f:
+        for bloque in iter(lambda: f.read(TAMANO_BLOQUE_HASH), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _ruta_metadatos(ruta_origen: Path, dir_cache: Path) -> Path:
+    return dir_cache / f"{ruta_origen.name}.json"
+
+
+def _leer_metadatos(ruta_meta: Path) -> Dict:
+    try:
+        with open(ruta_meta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def obtener_hash_origen(ruta_origen: Path, dir_cache: Path) -> str:
+    """
+    Devuelve el hash de contenido del archivo de origen.
+    
+    Si el tamaño y la fecha de modificación coinciden con los registrados en la
+    caché, se reutiliza el hash guardado y se evita releer el archivo.
+    
+    Args:
+        ruta_origen: Archivo CSV de origen
+        dir_cache: Directorio de la caché
+    
+    Returns:
+        Hash hexadecimal del contenido
+    """
+    estado = ruta_origen.stat()
+    meta = _leer_metadatos(_ruta_metadatos(ruta_origen, dir_cache))
+    if meta.get('tamano') == estado.st_size and meta.get('mtime_ns') == estado.st_mtime_ns:
+        return meta['hash']
+    return calcular_hash_archivo(str(ruta_origen))
+
+
+def esquema_cache(bloque: pd.DataFrame):
+    """
+    Esquema Arrow fijo de la caché, deducido del primer bloque del CSV.
+    
+    Los enteros se declaran int64 (admiten nulos en bloques posteriores y se
+    leen como float64 si los hay, igual que con una lectura completa del CSV)
+    y las columnas sin ningún valor en el primer bloque se declaran texto.
+    
+    Args:
+        bloque: Primer bloque leído del CSV
+    
+    Returns:
+        pyarrow.Schema
+    """
+    import pyarrow as pa
+    
+    campos = []
+    for campo in pa.Schema.from_pandas(bloque, preserve_index=False):
+        if bloque[campo.name].isnull().all():
+            campo = campo.with_type(pa.string())
+        elif pa.types.is_integer(campo.type):
+            campo = campo.with_type(pa.int64())
+        campos.append(campo)
+    return pa.schema(campos)
+
+
+def ampliar_esquema(esquema, tabla) -> Tuple[object, List[str]]:
+    """
+    Amplía las columnas del esquema a las que no se puede convertir un bloque.
+    
+    Un valor sucio en un bloque posterior (ej: edad 'S/D') cambia el tipo que
+    tendría la columna en una lectura completa del CSV: los números pasan a
+    float64 si el bloque también es numérico y a texto en otro caso.
+    
+    Args:
+        esquema: Esquema actual de la caché
+        tabla: Bloque como tabla Arrow (sin convertir)
+    
+    Returns:
+        Tupla (esquema ampliado, columnas ampliadas)
+    """
+    import pyarrow as pa
+    
+    def es_numerico(tipo):
+        return pa.types.is_integer(tipo) or pa.types.is_floating(tipo)
+    
+    campos, ampliadas = [], []
+    for campo in esquema:
+        columna = tabla.column(campo.name)
+        try:
+            columna.cast(campo.type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            numerico = es_numerico(campo.type) and es_numerico(columna.type)
+            campo = campo.with_type(pa.float64() if numerico else pa.string())
+            ampliadas.append(campo.name)
+        campos.append(campo)
+    return pa.schema(campos), ampliadas
+
+
+def _reescribir_parquet(ruta: Path, esquema):
+    """
+    Reescribe los grupos de filas ya escritos con el esquema ampliado (uno a
+    la vez) y devuelve el escritor abierto para seguir agregando bloques.
+    """
+    import pyarrow.parquet as pq
+    
+    ruta_previa = ruta.with_name(ruta.name + '.previo')
+    ruta.replace(ruta_previa)
+    escritor = pq.ParquetWriter(ruta, esquema)
+    with pq.ParquetFile(ruta_previa) as previo:
+        for i in range(previo.num_row_groups):
+            escritor.write_table(previo.read_row_group(i).cast(esquema))
+    ruta_previa.unlink()
+    return escritor
+
+
+def construir_cache(ruta_origen: Path, dir_cache: Path, hash_origen: str, sep: str = ';',
+                    chunksize: int = TAMANO_CHUNK_CACHE) -> Path:
+    """
+    Convierte el CSV crudo a Parquet y registra sus metadatos en la caché.
+    
+    El CSV se lee por bloques y cada bloque se escribe como un grupo de filas
+    con el esquema de `esquema_cache`, de modo que la memoria pico depende de
+    `chunksize` y no del tamaño del archivo nacional. Si un bloque posterior
+    no encaja en el esquema (ej: un texto en una columna numérica), las
+    columnas afectadas se amplían (`ampliar_esquema`) y los bloques ya
+    escritos se reescriben con el nuevo esquema. Las versiones anteriores del
+    mismo archivo de origen se eliminan.
+    
+    Args:
+        ruta_origen: Archivo CSV de origen
+        dir_cache: Directorio de la caché
+        hash_origen: Hash de contenido del CSV
+        sep: Separador del CSV
+        chunksize: Filas por bloque
+    
+    Returns:
+        Ruta al archivo Parquet generado
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    dir_cache.mkdir(parents=True, exist_ok=True)
+    ruta_parquet = dir_cache / f"{ruta_origen.stem}-{hash_origen}.parquet"
+    ruta_tmp = ruta_parquet.with_suffix('.parquet.tmp')
+    
+    escritor = None
+    try:
+        with abrir_texto(str(ruta_origen)) as texto, \
+                pd.read_csv(texto, sep=sep, chunksize=chunksize, low_memory=False) as lector:
+            for numero, bloque in enumerate(lector, 1):
+                if escritor is None:
+                    esquema = esquema_cache(bloque)
+                    escritor = pq.ParquetWriter(ruta_tmp, esquema)
+                tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+                try:
+                    tabla = tabla.cast(esquema)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    esquema, ampliadas = ampliar_esquema(esquema, tabla)
+                    print(f"[CACHE] Bloque {numero}: columnas ampliadas {ampliadas}, "
+                          f"se reescriben los bloques anteriores")
+                    escritor.close()
+                    escritor = _reescribir_parquet(ruta_tmp, esquema)
+                    tabla = tabla.cast(esquema)
+                escritor.write_table(tabla)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    
+    if escritor is None:
+        raise Exception(f"[ERROR] El archivo no contiene registros: {ruta_origen}")
+    ruta_tmp.replace(ruta_parquet)
+    
+    # Eliminar versiones anteriores del mismo origen (mismo nombre, otro hash)
+    patron_version = re.compile(re.escape(ruta_origen.stem) + r'-[0-9a-f]{32}')
+    for anterior in dir_cache.glob(f"{ruta_origen.stem}-*.parquet"):
+        if anterior != ruta_parquet and patron_version.fullmatch(anterior.stem):
+            anterior.unlink()
+    
+    estado = ruta_origen.stat()
+    with open(_ruta_metadatos(ruta_origen, dir_cache), 'w', encoding='utf-8') as f:
+        json.dump({
+            'origen': ruta_origen.name,
+            'tamano': estado.st_size,
+            'mtime_ns': estado.st_mtime_ns,
+            'hash': hash_origen,
+            'archivo_cache': ruta_parquet.name
+        }, f, indent=2)
+    
+    print(f"[CACHE] Cache creada: {ruta_parquet.name}")
+    
+    return ruta_parquet
+
+
+def cargar_con_cache(ruta_archivo: str, sep: str = ';', columnas: Optional[List[str]] = None,
+                     filtros: Optional[List[Tuple]] = None,
+                     dir_cache: Optional[str] = None,
+                     chunksize: int = TAMANO_CHUNK_CACHE) -> pd.DataFrame:
+    """
+    Carga el dataset desde la caché Parquet, creándola si no existe o si el
+    CSV de origen cambió.
+    
+    Args:
+        ruta_archivo: Ruta al CSV crudo
+        sep: Separador del CSV
+        columnas: Columnas a leer (proyección); None lee todas
+        filtros: Filtros de filas en formato pyarrow, ej: [('departamento', '==', 'LORETO')]
+        dir_cache: Directorio de la caché (por defecto `.cache` junto al CSV)
+        chunksize: Filas por bloque al construir la caché
+    
+    Returns:
+        DataFrame con los datos cargados
+    
+    Raises:
+        ImportError: Si pyarrow no está instalado
+    """
+    import pyarrow  # noqa: F401  (requerido para leer y escribir Parquet)
+    
+    ruta_origen = Path(ruta_archivo)
+    if not ruta_origen.exists():
+        raise FileNotFoundError(f"[ERROR] No se encontro el archivo: {ruta_archivo}")
+    dir_cache = Path(dir_cache) if dir_cache else ruta_origen.parent / NOMBRE_DIR_CACHE
+    
+    hash_origen = obtener_hash_origen(ruta_origen, dir_cache)
+    ruta_parquet = dir_cache / f"{ruta_origen.stem}-{hash_origen}.parquet"
+    
+    if ruta_parquet.exists():
+        print(f"[CACHE] Usando cache: {ruta_parquet.name}")
+    else:
+        print(f"[CACHE] Cache inexistente o desactualizada, convirtiendo CSV a Parquet...")
+        ruta_parquet = construir_cache(ruta_origen, dir_cache, hash_origen, sep=sep, chunksize=chunksize)
+    
+    return pd.read_parquet(ruta_parquet, columns=columnas, filters=filtros)
@@ -0,0 +1,120 @@
+"""
+Módulo de calendario de semanas epidemiológicas
+Sistema de Análisis de Dengue en Perú
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Union
+
+
+# Calendario epidemiológico del MINSA (igual al de los CDC): las semanas van de
+# domingo a sábado y la semana 1 es la que contiene el 4 de enero, por lo que
+# un año epidemiológico tiene 52 o 53 semanas.
+ANO_MINIMO = 1990
+ANO_MAXIMO = 2100
+SEMANAS_MAXIMAS = 53
+
+_DIA_NULO = np.iinfo(np.int64).min
+
+
+def _inicio_ano_epidemiologico(anos: np.ndarray) -> np.ndarray:
+    """Día (desde 1970-01-01) del domingo que inicia la semana 1 de cada año"""
+    cuatro_enero = (anos - 1970).astype('datetime64[Y]').astype('datetime64[D]').astype(np.int64) + 3
+    # 1970-01-01 fue jueves: (dia + 4) % 7 es 0 en domingo
+    return cuatro_enero - (cuatro_enero + 4) % 7
+
+
+def _construir_calendario():
+    """Precalcula los inicios de año y la tabla (ano, semana) -> día de inicio"""
+    anos = np.arange(ANO_MINIMO, ANO_MAXIMO + 2)
+    inicios_ano = _inicio_ano_epidemiologico(anos)
+    semanas_por_ano = (np.diff(inicios_ano) // 7)
+    
+    # Una fila por año y una columna por semana; la semana 53 de los años de
+    # 52 semanas queda nula
+    semana = np.arange(SEMANAS_MAXIMAS)
+    tabla = inicios_ano[:-1, None] + 7 * semana[None, :]
+    tabla[semana[None, :] >= semanas_por_ano[:, None]] = _DIA_NULO
+    
+    return inicios_ano, semanas_por_ano, tabla.ravel().view('datetime64[D]').astype('datetime64[ns]')
+
+
+_INICIOS_ANO, _SEMANAS_POR_ANO, _TABLA_INICIOS = _construir_calendario()
+
+
+def semanas_en_ano(ano: int) -> int:
+    """
+    Número de semanas epidemiológicas del año (52 o 53).
+    
+    Args:
+        ano: Año epidemiológico
+    
+    Returns:
+        Cantidad de semanas
+    """
+    if not ANO_MINIMO <= ano <= ANO_MAXIMO:
+        raise ValueError(f"Año fuera del calendario ({ANO_MINIMO}-{ANO_MAXIMO}): {ano}")
+    return int(_SEMANAS_POR_ANO[ano - ANO_MINIMO])
+
+
+def fecha_inicio_semana(ano: Union[pd.Series, np.ndarray],
+                        semana: Union[pd.Series, np.ndarray]) -> Union[pd.Series, np.ndarray]:
+    """
+    Convierte (año, semana epidemiológica) en la fecha del domingo que la inicia.
+    
+    La conversión es aritmética entera sobre la tabla precalculada: índice
+    (ano - ANO_MINIMO) * 53 + semana - 1 y una sola lectura de la tabla. Las
+    combinaciones inválidas (nulos, semana 53 en años de 52 semanas, años
+    fuera del calendario) dan NaT.
+    
+    Args:
+        ano: Años epidemiológicos
+        semana: Semanas epidemiológicas (1-53)
+    
+    Returns:
+        Fechas de inicio (Serie con el mismo índice si `ano` es una Serie)
+    """
+    anos = np.asarray(ano, dtype='float64')
+    semanas = np.asarray(semana, dtype='float64')
+    
+    validas = ((anos >= ANO_MINIMO) & (anos <= ANO_MAXIMO)
+               & (semanas >= 1) & (semanas <= SEMANAS_MAXIMAS)
+               & (anos % 1 == 0) & (semanas % 1 == 0))
+    
+    fechas = np.full(anos.shape, np.datetime64('NaT'), dtype='datetime64[ns]')
+    indices = (anos[validas].astype(np.int64) - ANO_MINIMO) * SEMANAS_MAXIMAS \
+        + semanas[validas].astype(np.int64) - 1
+    fechas[validas] = _TABLA_INICIOS[indices]
+    
+    if isinstance(ano, pd.Series):
+        return pd.Series(fechas, index=ano.index, name='fecha')
+    return fechas
+
+
+def semana_desde_fecha(fechas: Union[pd.Series, np.ndarray]) -> pd.DataFrame:
+    """
+    Convierte fechas en su (año, semana epidemiológica).
+    
+    Args:
+        fechas: Fechas a convertir
+    
+    Returns:
+        DataFrame con columnas 'ano' y 'semana' (nulas para NaT o fechas fuera
+        del calendario)
+    """
+    valores = np.asarray(fechas, dtype='datetime64[ns]')
+    dias = valores.astype('datetime64[D]').astype(np.int64)
+    validas = ~np.isnat(valores)
+    
+    posicion = np.searchsorted(_INICIOS_ANO, dias, side='right') - 1
+    validas &= (posicion >= 0) & (posicion < len(_SEMANAS_POR_ANO))
+    posicion = np.clip(posicion, 0, len(_SEMANAS_POR_ANO) - 1)
+    
+    anos = pd.array(np.where(validas, ANO_MINIMO + posicion, 0), dtype='Int16')
+    semanas = pd.array(np.where(validas, (dias - _INICIOS_ANO[posicion]) // 7 + 1, 0), dtype='Int8')
+    anos[~validas] = pd.NA
+    semanas[~validas] = pd.NA
+    
+    indice = fechas.index if isinstance(fechas, pd.Series) else None
+    return pd.DataFrame({'ano': anos, 'semana': semanas}, index=indice)
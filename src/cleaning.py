@@ -5,26 +5,82 @@ Sistema de Análisis de Dengue en Perú
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
+from calendario_epi import fecha_inicio_semana
+from esquema import ESQUEMA_CASOS, aplicar_esquema
+from huellas import calcular_huella_filas, contar_duplicados
+from motores import MOTOR_POR_DEFECTO, agrupar_semanas_polars, validar_motor
+from perfil_calidad import nulos_por_columna, perfilar, total_nulos
+from reglas import (
+    REGLAS_POR_DEFECTO,
+    aplicar_reglas,
+    evaluar_reglas,
+    guardar_cuarentena,
+    reportar_motivos,
+    resumir_motivos,
+    seleccionar_reglas
+)
 
-def analizar_calidad_datos(df: pd.DataFrame) -> Dict:
+
+# Valor de relleno y mensaje de cada estrategia de nulos que no elimina filas
+VALORES_RELLENO = {
+    'rellenar_vacio': '',
+    'rellenar_desconocido': 'DESCONOCIDO'
+}
+MENSAJES_RELLENO = {
+    'rellenar_vacio': "[LIMPIEZA] Valores nulos rellenados con cadena vacia",
+    'rellenar_desconocido': "[LIMPIEZA] Valores nulos rellenados con 'DESCONOCIDO'"
+}
+
+
+def analizar_calidad_datos(df: pd.DataFrame, huellas: Optional[pd.Series] = None,
+                           perfil: Optional[Dict] = None) -> Dict:
     """
     Analiza la calidad de los datos del dataset.
     
+    Los duplicados se cuentan sobre la huella de 64 bits de cada fila, que se
+    calcula una sola vez (o se recibe ya calculada). Los nulos se toman del
+    perfil de calidad, que puede reutilizarse en `generar_reporte_limpieza`.
+    
     Args:
         df: DataFrame a analizar
+        huellas: Huellas por fila de `calcular_huella_filas` (opcional)
+        perfil: Perfil de `perfil_calidad.perfilar` sobre `df` (opcional)
+    
+    Returns:
+        Diccionario con métricas de calidad
+    """
+    if huellas is None:
+        huellas = calcular_huella_filas(df)
+    if perfil is None:
+        perfil = perfilar(df)
+    
+    return resumir_calidad(len(df), contar_duplicados(huellas), nulos_por_columna(perfil))
+
+
+def resumir_calidad(total_registros: int, duplicados: int, nulos: pd.Series) -> Dict:
+    """
+    Arma el diccionario de calidad a partir de los conteos.
+    
+    Permite combinar conteos calculados por bloques (ver `fuera_de_memoria`).
+    
+    Args:
+        total_registros: Número de registros analizados
+        duplicados: Número de registros duplicados
+        nulos: Nulos por columna
     
     Returns:
         Diccionario con métricas de calidad
     """
     calidad = {
-        'total_registros': len(df),
-        'registros_duplicados': df.duplicated().sum(),
-        'porcentaje_duplicados': (df.duplicated().sum() / len(df)) * 100,
-        'valores_nulos_por_columna': df.isnull().sum().to_dict(),
-        'porcentaje_nulos_por_columna': ((df.isnull().sum() / len(df)) * 100).to_dict(),
-        'columnas_con_nulos': df.columns[df.isnull().any()].tolist()
+        'total_registros': total_registros,
+        'registros_duplicados': duplicados,
+        'porcentaje_duplicados': (duplicados / total_registros * 100) if total_registros else 0.0,
+        'valores_nulos_por_columna': nulos.to_dict(),
+        'porcentaje_nulos_por_columna': ((nulos / total_registros * 100) if total_registros
+                                         else nulos * 0.0).to_dict(),
+        'columnas_con_nulos': nulos.index[nulos > 0].tolist()
     }
     
     return calidad
@@ -51,91 +107,177 @@ def limpiar_valores_faltantes(df: pd.DataFrame, estrategia: str = 'eliminar') ->
     
     elif estrategia == 'rellenar_vacio':
         # Rellenar valores nulos con cadena vacía
-        df_limpio = df_limpio.fillna('')
+        df_limpio = _rellenar_nulos(df_limpio, '')
         print(f"[LIMPIEZA] Valores nulos rellenados con cadena vacia")
     
     elif estrategia == 'rellenar_desconocido':
         # Rellenar valores nulos con 'DESCONOCIDO'
-        df_limpio = df_limpio.fillna('DESCONOCIDO')
+        df_limpio = _rellenar_nulos(df_limpio, 'DESCONOCIDO')
         print(f"[LIMPIEZA] Valores nulos rellenados con 'DESCONOCIDO'")
     
     return df_limpio
 
 
-def estandarizar_texto(df: pd.DataFrame, columnas: List[str]) -> pd.DataFrame:
+def _rellenar_nulos(df: pd.DataFrame, valor: str) -> pd.DataFrame:
+    """Rellena nulos agregando el valor como categoría en las columnas categóricas"""
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype) and valor not in serie.cat.categories \
+                and serie.isnull().any():
+            df[col] = serie.cat.add_categories([valor])
+    return df.fillna(valor)
+
+
+def cargar_mapeo_canonico(ruta_archivo: str) -> Dict[str, Dict[str, str]]:
+    """
+    Carga una tabla de nombres canónicos (variantes de tildes u ortografía).
+    
+    El archivo debe tener las columnas 'columna', 'variante' y 'canonico',
+    por ejemplo: distrito;DATEM DEL MARANON;DATEM DEL MARAÑON
+    
+    Args:
+        ruta_archivo: Ruta al CSV de la tabla (separador ';')
+    
+    Returns:
+        Diccionario columna -> {variante: canonico}
+    """
+    tabla = pd.read_csv(ruta_archivo, sep=';', dtype=str, encoding='utf-8')
+    
+    mapeo = {}
+    for col, grupo in tabla.groupby('columna'):
+        mapeo[col] = dict(zip(grupo['variante'], grupo['canonico']))
+    
+    print(f"[ESTANDARIZACION] Tabla canonica cargada: {len(tabla):,} variantes")
+    
+    return mapeo
+
+
+def _normalizar_texto(valores: pd.Index) -> pd.Index:
+    """Mayúsculas y sin espacios extremos, aplicado a un índice de valores únicos"""
+    return valores.astype(str).str.upper().str.strip()
+
+
+def _estandarizar_columna(serie: pd.Series, categorica: bool = True,
+                          mapeo: Optional[Dict[str, str]] = None,
+                          valor_relleno: Optional[str] = None) -> pd.Series:
+    """
+    Estandariza una columna de texto trabajando solo sobre sus valores únicos.
+    
+    La columna se codifica como diccionario (códigos + valores únicos), la
+    normalización y el mapeo canónico se aplican a los valores únicos, y los
+    códigos se reasignan a las categorías resultantes. El costo del texto
+    depende de la cardinalidad y no del número de filas.
+    
+    Args:
+        serie: Columna a estandarizar (texto o categórica)
+        categorica: Si True devuelve una columna categórica
+        mapeo: Diccionario opcional variante -> nombre canónico
+        valor_relleno: Valor para los nulos; si es None se conservan como 'NAN'
+            (igual que `astype(str)`)
+    
+    Returns:
+        Columna estandarizada con el mismo índice
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy().astype(np.intp)
+        unicos = serie.cat.categories
+    else:
+        codigos, unicos = pd.factorize(serie)
+    
+    # Los nulos (código -1) pasan a ser un valor único más
+    nulos = codigos < 0
+    if nulos.any():
+        codigos = np.where(nulos, len(unicos), codigos)
+        representacion_nulo = 'nan' if valor_relleno is None else valor_relleno
+        unicos = pd.Index(list(unicos) + [representacion_nulo], dtype=object)
+    
+    normalizados = _normalizar_texto(pd.Index(unicos))
+    if mapeo:
+        mapeo_normalizado = dict(zip(_normalizar_texto(pd.Index(list(mapeo.keys()))), mapeo.values()))
+        normalizados = pd.Index([mapeo_normalizado.get(v, v) for v in normalizados], dtype=object)
+    
+    # Valores únicos que quedan iguales tras normalizar comparten categoría
+    codigos_unicos, categorias = pd.factorize(normalizados, sort=True)
+    codigos_finales = codigos_unicos[codigos]
+    
+    if categorica:
+        valores = pd.Categorical.from_codes(codigos_finales, categories=categorias)
+    else:
+        valores = np.asarray(categorias, dtype=object)[codigos_finales]
+    
+    return pd.Series(valores, index=serie.index, name=serie.name)
+
+
+def estandarizar_texto(df: pd.DataFrame, columnas: List[str],
+                       esquema: Optional[Dict[str, str]] = None,
+                       mapeo_canonico: Optional[Dict[str, Dict[str, str]]] = None) -> pd.DataFrame:
     """
     Estandariza el texto de las columnas especificadas.
     
+    La normalización se aplica a los valores únicos de cada columna y no fila
+    por fila. Las columnas declaradas como 'category' en el esquema se devuelven
+    como categóricas.
+    
     Args:
         df: DataFrame a estandarizar
         columnas: Lista de columnas a estandarizar
+        esquema: Diccionario columna -> tipo (por defecto ESQUEMA_CASOS)
+        mapeo_canonico: Diccionario opcional columna -> {variante: canonico}
+            (ver `cargar_mapeo_canonico`)
     
     Returns:
         DataFrame con texto estandarizado
     """
+    esquema = ESQUEMA_CASOS if esquema is None else esquema
+    mapeo_canonico = mapeo_canonico or {}
     df_estandarizado = df.copy()
     
     for col in columnas:
         if col in df_estandarizado.columns:
-            # Convertir a mayúsculas y eliminar espacios extras
-            df_estandarizado[col] = df_estandarizado[col].astype(str).str.upper().str.strip()
+            # Convertir a mayúsculas y eliminar espacios extras sobre los valores únicos
+            df_estandarizado[col] = _estandarizar_columna(
+                df_estandarizado[col],
+                categorica=esquema.get(col) == 'category',
+                mapeo=mapeo_canonico.get(col)
+            )
             print(f"[ESTANDARIZACION] Columna '{col}' estandarizada")
     
     return df_estandarizado
 
 
-def validar_rangos_temporales(df: pd.DataFrame) -> pd.DataFrame:
+def validar_rangos_temporales(df: pd.DataFrame, ruta_cuarentena: Optional[str] = None) -> pd.DataFrame:
     """
     Valida que los rangos temporales sean correctos.
     
+    Aplica las reglas 'ANO_FUERA_RANGO', 'SEMANA_FUERA_RANGO' y
+    'SEMANA_INEXISTENTE' de `reglas.REGLAS_POR_DEFECTO`.
+    
     Args:
         df: DataFrame a validar
+        ruta_cuarentena: Si se indica, guarda ahí las filas rechazadas
     
     Returns:
         DataFrame con datos válidos
     """
-    df_valido = df.copy()
-    
-    # Validar año (debe estar entre 2000 y 2024)
-    if 'ano' in df_valido.columns:
-        antes = len(df_valido)
-        df_valido = df_valido[(df_valido['ano'] >= 2000) & (df_valido['ano'] <= 2024)]
-        eliminados = antes - len(df_valido)
-        if eliminados > 0:
-            print(f"[VALIDACION] Eliminados {eliminados:,} registros con anos fuera de rango")
-    
-    # Validar semana epidemiológica (debe estar entre 1 y 53)
-    if 'semana' in df_valido.columns:
-        antes = len(df_valido)
-        df_valido = df_valido[(df_valido['semana'] >= 1) & (df_valido['semana'] <= 53)]
-        eliminados = antes - len(df_valido)
-        if eliminados > 0:
-            print(f"[VALIDACION] Eliminados {eliminados:,} registros con semanas fuera de rango")
-    
-    return df_valido
+    return aplicar_reglas(df, seleccionar_reglas(['ANO_FUERA_RANGO', 'SEMANA_FUERA_RANGO',
+                                                  'SEMANA_INEXISTENTE']),
+                          ruta_cuarentena)
 
 
-def validar_edad(df: pd.DataFrame) -> pd.DataFrame:
+def validar_edad(df: pd.DataFrame, ruta_cuarentena: Optional[str] = None) -> pd.DataFrame:
     """
     Valida que los valores de edad sean razonables.
     
+    Aplica la regla 'EDAD_INVALIDA' de `reglas.REGLAS_POR_DEFECTO`.
+    
     Args:
         df: DataFrame a validar
+        ruta_cuarentena: Si se indica, guarda ahí las filas rechazadas
     
     Returns:
         DataFrame con edades válidas
     """
-    df_valido = df.copy()
-    
-    if 'edad' in df_valido.columns:
-        antes = len(df_valido)
-        # Eliminar edades negativas o mayores a 120 años
-        df_valido = df_valido[(df_valido['edad'] >= 0) & (df_valido['edad'] <= 120)]
-        eliminados = antes - len(df_valido)
-        if eliminados > 0:
-            print(f"[VALIDACION] Eliminados {eliminados:,} registros con edades invalidas")
-    
-    return df_valido
+    return aplicar_reglas(df, seleccionar_reglas(['EDAD_INVALIDA']), ruta_cuarentena)
 
 
 def crear_fecha_epidemiologica(df: pd.DataFrame) -> pd.DataFrame:
@@ -151,23 +293,139 @@ def crear_fecha_epidemiologica(df: pd.DataFrame) -> pd.DataFrame:
     df_con_fecha = df.copy()
     
     if 'ano' in df_con_fecha.columns and 'semana' in df_con_fecha.columns:
-        # Crear fecha aproximada (primer día de la semana epidemiológica)
-        df_con_fecha['fecha'] = pd.to_datetime(
-            df_con_fecha['ano'].astype(str) + '-W' + df_con_fecha['semana'].astype(str).str.zfill(2) + '-1',
-            format='%Y-W%W-%w',
-            errors='coerce'
-        )
+        df_con_fecha['fecha'] = fecha_inicio_semana(df_con_fecha['ano'], df_con_fecha['semana'])
         print(f"[TRANSFORMACION] Columna 'fecha' creada exitosamente")
     
     return df_con_fecha
 
 
-def agrupar_por_semana_epidemiologica(df: pd.DataFrame) -> pd.DataFrame:
+def limpiar_datos_fusionado(df: pd.DataFrame, columnas_texto: List[str],
+                            estrategia: str = 'eliminar',
+                            esquema: Optional[Dict[str, str]] = None,
+                            mapeo_canonico: Optional[Dict[str, Dict[str, str]]] = None,
+                            reglas: Optional[List[Dict]] = None,
+                            ruta_cuarentena: Optional[str] = None) -> pd.DataFrame:
+    """
+    Aplica en una sola pasada la limpieza de nulos, la estandarización de texto,
+    la validación de rangos y edad, el esquema compacto y la columna 'fecha'.
+    
+    Equivale a encadenar `limpiar_valores_faltantes`, `estandarizar_texto`,
+    `validar_rangos_temporales`, `validar_edad`, `aplicar_esquema` y
+    `crear_fecha_epidemiologica`, pero sin copias intermedias: primero se
+    evalúan todas las reglas de validación (ver `reglas`), y luego se
+    seleccionan una sola vez las filas válidas mientras se transforman las
+    columnas. Los conteos de eliminados por regla son los mismos que imprime
+    la cadena secuencial (cada fila se atribuye a la primera regla que incumple).
+    
+    Args:
+        df: DataFrame crudo (no se modifica)
+        columnas_texto: Columnas de texto a estandarizar
+        estrategia: 'eliminar', 'rellenar_vacio', 'rellenar_desconocido'
+        esquema: Diccionario columna -> tipo (por defecto ESQUEMA_CASOS)
+        mapeo_canonico: Diccionario opcional columna -> {variante: canonico}
+        reglas: Reglas de validación (por defecto REGLAS_POR_DEFECTO)
+        ruta_cuarentena: Si se indica, guarda ahí las filas rechazadas con sus motivos
+    
+    Returns:
+        DataFrame limpio
+    """
+    reglas = reglas_para_estrategia(reglas, estrategia)
+    
+    # Todas las reglas en una evaluación; los conteos son por primera regla fallida
+    motivos = evaluar_reglas(df, reglas)
+    reportar_motivos(resumir_motivos(motivos, reglas))
+    if ruta_cuarentena:
+        guardar_cuarentena(df, motivos, ruta_cuarentena, reglas)
+    
+    df_limpio = transformar_filas_validas(df, motivos == 0, columnas_texto, estrategia,
+                                          esquema, mapeo_canonico)
+    
+    for col in columnas_texto:
+        if col in df_limpio.columns:
+            print(f"[ESTANDARIZACION] Columna '{col}' estandarizada")
+    if estrategia in MENSAJES_RELLENO:
+        print(MENSAJES_RELLENO[estrategia])
+    if 'ano' in df_limpio.columns and 'semana' in df_limpio.columns:
+        print(f"[TRANSFORMACION] Columna 'fecha' creada exitosamente")
+    
+    return df_limpio
+
+
+def reglas_para_estrategia(reglas: Optional[List[Dict]], estrategia: str) -> List[Dict]:
+    """
+    Reglas que aplica la limpieza fusionada según la estrategia de nulos.
+    
+    Con las estrategias de relleno los nulos se completan en lugar de
+    rechazarse, por lo que se omiten las reglas 'no_nulo'.
+    
+    Args:
+        reglas: Reglas de validación (por defecto REGLAS_POR_DEFECTO)
+        estrategia: 'eliminar', 'rellenar_vacio', 'rellenar_desconocido'
+    
+    Returns:
+        Lista de reglas
+    """
+    reglas = REGLAS_POR_DEFECTO if reglas is None else reglas
+    if estrategia != 'eliminar':
+        reglas = [regla for regla in reglas if regla['tipo'] != 'no_nulo']
+    return reglas
+
+
+def transformar_filas_validas(df: pd.DataFrame, validas: np.ndarray, columnas_texto: List[str],
+                              estrategia: str = 'eliminar',
+                              esquema: Optional[Dict[str, str]] = None,
+                              mapeo_canonico: Optional[Dict[str, Dict[str, str]]] = None) -> pd.DataFrame:
+    """
+    Selecciona las filas válidas y les aplica las transformaciones de la
+    limpieza fusionada (texto, relleno de nulos, esquema compacto y 'fecha').
+    
+    No imprime mensajes, por lo que puede aplicarse bloque a bloque.
+    
+    Args:
+        df: DataFrame crudo (no se modifica)
+        validas: Máscara de filas que superan la validación
+        columnas_texto: Columnas de texto a estandarizar
+        estrategia: 'eliminar', 'rellenar_vacio', 'rellenar_desconocido'
+        esquema: Diccionario columna -> tipo (por defecto ESQUEMA_CASOS)
+        mapeo_canonico: Diccionario opcional columna -> {variante: canonico}
+    
+    Returns:
+        DataFrame limpio
+    """
+    esquema = ESQUEMA_CASOS if esquema is None else esquema
+    mapeo_canonico = mapeo_canonico or {}
+    valor_relleno = VALORES_RELLENO.get(estrategia)
+    
+    # Única selección de filas: cada columna se toma una vez, ya transformada si corresponde
+    posiciones = np.flatnonzero(validas)
+    columnas = {}
+    for col in df.columns:
+        serie = df[col].take(posiciones)
+        if col in columnas_texto:
+            serie = _estandarizar_columna(serie, categorica=esquema.get(col) == 'category',
+                                          mapeo=mapeo_canonico.get(col),
+                                          valor_relleno=valor_relleno)
+        columnas[col] = serie
+    df_limpio = pd.DataFrame(columnas, index=df.index[posiciones])
+    
+    if valor_relleno is not None:
+        df_limpio = _rellenar_nulos(df_limpio, valor_relleno)
+    
+    df_limpio = aplicar_esquema(df_limpio, esquema)
+    
+    if 'ano' in df_limpio.columns and 'semana' in df_limpio.columns:
+        df_limpio['fecha'] = fecha_inicio_semana(df_limpio['ano'], df_limpio['semana'])
+    
+    return df_limpio
+
+
+def agrupar_por_semana_epidemiologica(df: pd.DataFrame, motor: str = MOTOR_POR_DEFECTO) -> pd.DataFrame:
     """
     Agrupa los casos por año y semana epidemiológica.
     
     Args:
         df: DataFrame con datos de dengue
+        motor: 'pandas' o 'polars' (agrupación multihilo, ver `motores`)
     
     Returns:
         DataFrame agrupado con conteo de casos
@@ -175,8 +433,11 @@ def agrupar_por_semana_epidemiologica(df: pd.DataFrame) -> pd.DataFrame:
     if 'ano' not in df.columns or 'semana' not in df.columns:
         raise ValueError("El DataFrame debe contener columnas 'ano' y 'semana'")
     
-    df_agrupado = df.groupby(['ano', 'semana']).size().reset_index(name='casos')
-    df_agrupado = df_agrupado.sort_values(['ano', 'semana'])
+    if validar_motor(motor) == 'polars':
+        df_agrupado = agrupar_semanas_polars(df)
+    else:
+        df_agrupado = df.groupby(['ano', 'semana']).size().reset_index(name='casos')
+        df_agrupado = df_agrupado.sort_values(['ano', 'semana'])
     
     print(f"[AGRUPACION] Datos agrupados por semana epidemiologica")
     print(f"Total de semanas: {len(df_agrupado):,}")
@@ -184,13 +445,44 @@ def agrupar_por_semana_epidemiologica(df: pd.DataFrame) -> pd.DataFrame:
     return df_agrupado
 
 
-def generar_reporte_limpieza(df_original: pd.DataFrame, df_limpio: pd.DataFrame) -> str:
+def generar_reporte_limpieza(df_original: pd.DataFrame, df_limpio: pd.DataFrame,
+                             perfil_original: Optional[Dict] = None,
+                             perfil_limpio: Optional[Dict] = None) -> str:
     """
     Genera un reporte de las operaciones de limpieza realizadas.
     
+    Solo se necesitan los totales de nulos: se toman de los perfiles si ya se
+    calcularon y, si no, de un conteo directo de nulos, sin perfilar el
+    DataFrame solo para el reporte.
+    
     Args:
         df_original: DataFrame original
         df_limpio: DataFrame después de la limpieza
+        perfil_original: Perfil de calidad de `df_original`, si ya se calculó
+        perfil_limpio: Perfil de calidad de `df_limpio`, si ya se calculó
+    
+    Returns:
+        String con el reporte
+    """
+    # Comparar valores nulos
+    nulos_antes = (total_nulos(perfil_original) if perfil_original is not None
+                   else int(df_original.isnull().sum().sum()))
+    nulos_despues = (total_nulos(perfil_limpio) if perfil_limpio is not None
+                     else int(df_limpio.isnull().sum().sum()))
+    
+    return formatear_reporte_limpieza(len(df_original), len(df_limpio), nulos_antes, nulos_despues)
+
+
+def formatear_reporte_limpieza(registros_originales: int, registros_finales: int,
+                               nulos_antes: int, nulos_despues: int) -> str:
+    """
+    Genera el reporte de limpieza a partir de los conteos.
+    
+    Args:
+        registros_originales: Registros antes de la limpieza
+        registros_finales: Registros después de la limpieza
+        nulos_antes: Valores nulos antes de la limpieza
+        nulos_despues: Valores nulos después de la limpieza
     
     Returns:
         String con el reporte
@@ -200,14 +492,11 @@ def generar_reporte_limpieza(df_original: pd.DataFrame, df_limpio: pd.DataFrame)
     reporte.append("REPORTE DE LIMPIEZA DE DATOS")
     reporte.append("=" * 60)
     
-    reporte.append(f"\nRegistros originales: {len(df_original):,}")
-    reporte.append(f"Registros finales: {len(df_limpio):,}")
-    reporte.append(f"Registros eliminados: {len(df_original) - len(df_limpio):,}")
-    reporte.append(f"Porcentaje retenido: {(len(df_limpio)/len(df_original)*100):.2f}%")
-    
-    # Comparar valores nulos
-    nulos_antes = df_original.isnull().sum().sum()
-    nulos_despues = df_limpio.isnull().sum().sum()
+    reporte.append(f"\nRegistros originales: {registros_originales:,}")
+    reporte.append(f"Registros finales: {registros_finales:,}")
+    reporte.append(f"Registros eliminados: {registros_originales - registros_finales:,}")
+    retenido = (registros_finales / registros_originales * 100) if registros_originales else 0.0
+    reporte.append(f"Porcentaje retenido: {retenido:.2f}%")
     
     reporte.append(f"\nValores nulos antes: {nulos_antes:,}")
     reporte.append(f"Valores nulos despues: {nulos_despues:,}")
@@ -0,0 +1,219 @@
+"""
+Módulo del cubo de casos preagregado (semana x geografía x demografía)
+Sistema de Análisis de Dengue en Perú
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import List, Optional
+
+from esquema import concatenar_compacto
+from incremental import mascara_semanas
+
+
+# Grupos de edad del cubo: límites inferiores (inclusivos) y etiquetas
+LIMITES_GRUPO_EDAD = [0, 12, 18, 30, 60, np.inf]
+ETIQUETAS_GRUPO_EDAD = ['0-11', '12-17', '18-29', '30-59', '60+']
+
+DIMENSIONES_CUBO = ['ano', 'semana', 'provincia', 'distrito', 'sexo', 'grupo_edad']
+
+
+def asignar_grupo_edad(edad: pd.Series) -> pd.Series:
+    """
+    Clasifica las edades en los grupos del cubo (0-11, 12-17, 18-29, 30-59, 60+).
+    
+    Args:
+        edad: Serie de edades en años
+    
+    Returns:
+        Serie categórica ordenada con el grupo de edad
+    """
+    return pd.cut(edad, bins=LIMITES_GRUPO_EDAD, labels=ETIQUETAS_GRUPO_EDAD, right=False)
+
+
+def construir_cubo(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega los casos por ano x semana x provincia x distrito x sexo x grupo de edad.
+    
+    Solo se guardan las celdas con casos. Los valores nulos de una dimensión
+    forman su propia celda, de modo que la suma del cubo es siempre el total
+    de registros.
+    
+    Args:
+        df: DataFrame limpio con las columnas de las dimensiones y 'edad'
+    
+    Returns:
+        DataFrame con una fila por celda y la columna 'casos'
+    """
+    cubo = agregar_cubo(df)
+    
+    print(f"[CUBO] Cubo construido: {len(cubo):,} celdas para {len(df):,} registros")
+    
+    return cubo
+
+
+def agregar_cubo(df: pd.DataFrame) -> pd.DataFrame:
+    """Agrega los registros en celdas del cubo, sin imprimir mensajes (ver `construir_cubo`)"""
+    dimensiones = {col: df[col] for col in DIMENSIONES_CUBO if col in df.columns}
+    if 'edad' in df.columns:
+        dimensiones['grupo_edad'] = asignar_grupo_edad(df['edad'])
+    
+    cubo = (
+        pd.DataFrame(dimensiones)
+        .groupby(list(dimensiones), observed=True, dropna=False, sort=True)
+        .size()
+        .reset_index(name='casos')
+    )
+    cubo['casos'] = cubo['casos'].astype('int32')
+    
+    return cubo
+
+
+def fusionar_cubos(cubos: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Suma cubos parciales (por ejemplo, uno por bloque de registros).
+    
+    El resultado es el cubo que `construir_cubo` daría sobre la unión de los
+    registros: mismas celdas, mismo orden y mismos conteos.
+    
+    Args:
+        cubos: Cubos de `agregar_cubo` o `construir_cubo`
+    
+    Returns:
+        Cubo combinado
+    """
+    unidos = concatenar_compacto(cubos)
+    dimensiones = [col for col in unidos.columns if col != 'casos']
+    
+    cubo = (
+        unidos
+        .groupby(dimensiones, observed=True, dropna=False, sort=True)['casos']
+        .sum()
+        .reset_index()
+    )
+    cubo['casos'] = cubo['casos'].astype('int32')
+    
+    return cubo
+
+
+def guardar_cubo(cubo: pd.DataFrame, ruta_salida: str) -> None:
+    """
+    Guarda el cubo en Parquet (columnar y comprimido).
+    
+    Args:
+        cubo: Cubo de `construir_cubo`
+        ruta_salida: Ruta del archivo .parquet
+    """
+    ruta = Path(ruta_salida)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    
+    ruta_tmp = ruta.with_name(ruta.name + '.tmp')
+    cubo.to_parquet(ruta_tmp, index=False)
+    ruta_tmp.replace(ruta)
+    
+    print(f"[CUBO] Cubo guardado en: {ruta_salida}")
+
+
+def cargar_cubo(ruta_archivo: str) -> Optional[pd.DataFrame]:
+    """
+    Carga el cubo de casos.
+    
+    Args:
+        ruta_archivo: Ruta del archivo .parquet
+    
+    Returns:
+        DataFrame del cubo, o None si no existe
+    """
+    if not Path(ruta_archivo).exists():
+        return None
+    return pd.read_parquet(ruta_archivo)
+
+
+def actualizar_cubo(cubo: pd.DataFrame, df_limpio_semanas: pd.DataFrame,
+                    semanas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reemplaza en el cubo las celdas de las semanas modificadas.
+    
+    Args:
+        cubo: Cubo existente
+        df_limpio_semanas: Registros limpios de las semanas modificadas
+        semanas: Semanas modificadas ('ano', 'semana')
+    
+    Returns:
+        Cubo actualizado
+    """
+    conservadas = cubo[~mascara_semanas(cubo, semanas)]
+    nuevas = construir_cubo(df_limpio_semanas)
+    
+    # Las columnas categóricas no se convierten a las categorías del cubo
+    # guardado: `concatenar_compacto` las une, de modo que una provincia o un
+    # distrito que aparece por primera vez en las semanas nuevas se conserva
+    tipos = {}
+    for col, dtype in conservadas.dtypes.items():
+        if col not in nuevas.columns:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            if not isinstance(nuevas[col].dtype, pd.CategoricalDtype):
+                tipos[col] = 'category'
+        elif nuevas[col].dtype != dtype:
+            tipos[col] = dtype
+    nuevas = nuevas.astype(tipos)
+    
+    cubo_actualizado = concatenar_compacto([conservadas, nuevas])
+    cubo_actualizado = cubo_actualizado.sort_values(['ano', 'semana']).reset_index(drop=True)
+    
+    # Ninguna celda debe perder el valor de una dimensión al unir los cubos
+    nulos_esperados = conservadas.isnull().sum().add(nuevas.isnull().sum(), fill_value=0)
+    nulos = cubo_actualizado.isnull().sum().reindex(nulos_esperados.index, fill_value=0)
+    if (nulos != nulos_esperados).any():
+        columnas = ', '.join(nulos.index[nulos != nulos_esperados])
+        raise Exception(f"[ERROR] La actualizacion del cubo perdio valores en: {columnas}")
+    
+    return cubo_actualizado
+
+
+def filtrar_cubo(cubo: pd.DataFrame, ano_min: Optional[int] = None, ano_max: Optional[int] = None,
+                 provincias: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Selecciona las celdas del cubo de un rango de años y provincias.
+    
+    Args:
+        cubo: Cubo de casos
+        ano_min: Primer año (inclusivo)
+        ano_max: Último año (inclusivo)
+        provincias: Provincias a conservar; None conserva todas
+    
+    Returns:
+        Cubo filtrado
+    """
+    mascara = np.ones(len(cubo), dtype=bool)
+    if ano_min is not None:
+        mascara &= (cubo['ano'] >= ano_min).to_numpy()
+    if ano_max is not None:
+        mascara &= (cubo['ano'] <= ano_max).to_numpy()
+    if provincias is not None:
+        mascara &= cubo['provincia'].isin(provincias).to_numpy()
+    return cubo[mascara]
+
+
+def contar_casos(df: pd.DataFrame, columna: str) -> pd.Series:
+    """
+    Cuenta casos por una columna, de mayor a menor.
+    
+    Acepta tanto registros individuales como el cubo: si `df` tiene la
+    columna 'casos' se suman las celdas, si no se cuentan las filas.
+    
+    Args:
+        df: Registros o cubo de casos
+        columna: Columna por la que agrupar (ej: 'provincia', 'sexo')
+    
+    Returns:
+        Serie con casos por valor, ordenada de forma descendente
+    """
+    if 'casos' not in df.columns:
+        return df[columna].value_counts()
+    
+    conteo = df.groupby(columna, observed=True)['casos'].sum()
+    conteo = conteo.sort_values(ascending=False, kind='stable').rename('count')
+    return conteo
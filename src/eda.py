@@ -3,11 +3,36 @@ Módulo de Análisis Exploratorio de Datos (EDA)
 Sistema de Análisis de Dengue en Perú
 """
 
+import os
+import time
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from typing import Tuple, Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Tuple, Dict, List, Optional
+
+from almacen_series import matrices_semana_ano, matriz_ano_semana, matriz_semanas
+from calendario_epi import fecha_inicio_semana
+from cubo import contar_casos
+from estadisticas import acumular_estadisticas, finalizar_estadisticas
+from perfiles_graficos import (
+    PERFIL_POR_DEFECTO,
+    ajustar_diseno,
+    cerrar_figura,
+    crear_figura,
+    guardar_figura,
+    ruta_figura,
+    validar_perfil
+)
+
+
+# Plural de cada nivel geográfico para los títulos
+PLURAL_NIVEL = {'provincia': 'Provincias', 'distrito': 'Distritos', 'localidad': 'Localidades'}
+
+# Etiqueta y color del pastel de casos por sexo
+ETIQUETAS_SEXO = {'F': 'Femenino', 'M': 'Masculino'}
+COLORES_SEXO = {'F': '#ff9999', 'M': '#66b3ff'}
 
 
 def configurar_estilo_graficos():
@@ -20,7 +45,8 @@ def configurar_estilo_graficos():
     plt.rcParams['axes.labelsize'] = 12
 
 
-def analisis_temporal_anual(df: pd.DataFrame, guardar: bool = False, ruta: str = None) -> pd.Series:
+def analisis_temporal_anual(df: pd.DataFrame, guardar: bool = False, ruta: str = None,
+                            perfil: str = PERFIL_POR_DEFECTO) -> pd.Series:
     """
     Analiza la distribución temporal anual de casos.
     
@@ -28,17 +54,34 @@ def analisis_temporal_anual(df: pd.DataFrame, guardar: bool = False, ruta: str =
         df: DataFrame con datos de dengue
         guardar: Si True, guarda el gráfico
         ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
     
     Returns:
         Serie con casos por año
     """
     casos_por_ano = df.groupby('ano').size().sort_index()
     
-    # Crear gráfico
-    fig, ax = plt.subplots(figsize=(14, 6))
+    graficar_casos_por_ano(casos_por_ano, guardar, ruta, perfil)
+    
+    return casos_por_ano
+
+
+def graficar_casos_por_ano(casos_por_ano: pd.Series, guardar: bool = False, ruta: str = None,
+                           perfil: str = PERFIL_POR_DEFECTO, ambito: str = 'Loreto'):
+    """
+    Grafica los casos por año con su línea de tendencia.
+    
+    Args:
+        casos_por_ano: Serie con casos por año
+        guardar: Si True, guarda el gráfico
+        ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
+        ambito: Ámbito geográfico del título (ej: una provincia en los paquetes por lotes)
+    """
+    fig, ax = crear_figura(figsize=(14, 6))
     casos_por_ano.plot(kind='bar', color='steelblue', edgecolor='black', ax=ax)
     
-    ax.set_title('Casos de Dengue por Año en Loreto (2000-2024)', fontsize=16, fontweight='bold')
+    ax.set_title(f'Casos de Dengue por Año en {ambito} (2000-2024)', fontsize=16, fontweight='bold')
     ax.set_xlabel('Año', fontsize=12)
     ax.set_ylabel('Número de Casos', fontsize=12)
     ax.grid(axis='y', alpha=0.3)
@@ -51,18 +94,16 @@ def analisis_temporal_anual(df: pd.DataFrame, guardar: bool = False, ruta: str =
     ax.legend()
     
     plt.xticks(rotation=45)
-    plt.tight_layout()
+    ajustar_diseno(perfil)
     
     if guardar and ruta:
-        plt.savefig(ruta, dpi=300, bbox_inches='tight')
-        print(f"[GRAFICO] Guardado en: {ruta}")
+        guardar_figura(ruta, perfil)
     
-    plt.close()
-    
-    return casos_por_ano
+    cerrar_figura()
 
 
-def analisis_temporal_mensual(df_serie: pd.DataFrame, guardar: bool = False, ruta: str = None) -> pd.DataFrame:
+def analisis_temporal_mensual(df_serie: pd.DataFrame, guardar: bool = False, ruta: str = None,
+                              perfil: str = PERFIL_POR_DEFECTO) -> pd.DataFrame:
     """
     Analiza la distribución temporal por mes (aproximado desde semana).
     
@@ -70,6 +111,7 @@ def analisis_temporal_mensual(df_serie: pd.DataFrame, guardar: bool = False, rut
         df_serie: DataFrame con serie temporal
         guardar: Si True, guarda el gráfico
         ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
     
     Returns:
         DataFrame con casos por mes
@@ -78,31 +120,59 @@ def analisis_temporal_mensual(df_serie: pd.DataFrame, guardar: bool = False, rut
     df_serie['mes'] = ((df_serie['semana'] - 1) // 4) + 1
     df_serie['mes'] = df_serie['mes'].clip(upper=12)
     
-    casos_por_mes = df_serie.groupby('mes')['casos'].sum().sort_index()
+    casos_por_mes = contar_casos_por_mes(df_serie)
     
-    # Crear gráfico
-    fig, ax = plt.subplots(figsize=(12, 6))
+    graficar_casos_por_mes(casos_por_mes, guardar, ruta, perfil)
+    
+    return casos_por_mes
+
+
+def contar_casos_por_mes(df_serie: pd.DataFrame) -> pd.Series:
+    """
+    Suma los casos por mes, aproximando el mes desde la semana epidemiológica.
+    
+    Args:
+        df_serie: DataFrame con serie temporal
+    
+    Returns:
+        Serie con casos por mes (1-12)
+    """
+    mes = (((df_serie['semana'] - 1) // 4) + 1).clip(upper=12).rename('mes')
+    return df_serie['casos'].groupby(mes).sum().sort_index()
+
+
+def graficar_casos_por_mes(casos_por_mes: pd.Series, guardar: bool = False, ruta: str = None,
+                           perfil: str = PERFIL_POR_DEFECTO, ambito: str = 'Loreto'):
+    """
+    Grafica los casos por mes.
+    
+    Args:
+        casos_por_mes: Serie con casos por mes (1-12)
+        guardar: Si True, guarda el gráfico
+        ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
+        ambito: Ámbito geográfico del título (ej: una provincia en los paquetes por lotes)
+    """
+    fig, ax = crear_figura(figsize=(12, 6))
     casos_por_mes.plot(kind='bar', color='coral', edgecolor='black', ax=ax)
     
-    ax.set_title('Casos de Dengue por Mes en Loreto (2000-2024)', fontsize=16, fontweight='bold')
+    ax.set_title(f'Casos de Dengue por Mes en {ambito} (2000-2024)', fontsize=16, fontweight='bold')
     ax.set_xlabel('Mes', fontsize=12)
     ax.set_ylabel('Total de Casos', fontsize=12)
     ax.set_xticklabels(['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 
                         'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic'], rotation=45)
     ax.grid(axis='y', alpha=0.3)
     
-    plt.tight_layout()
+    ajustar_diseno(perfil)
     
     if guardar and ruta:
-        plt.savefig(ruta, dpi=300, bbox_inches='tight')
-        print(f"[GRAFICO] Guardado en: {ruta}")
-    
-    plt.close()
+        guardar_figura(ruta, perfil)
     
-    return casos_por_mes
+    cerrar_figura()
 
 
-def analisis_serie_temporal(df_serie: pd.DataFrame, guardar: bool = False, ruta: str = None):
+def analisis_serie_temporal(df_serie: pd.DataFrame, guardar: bool = False, ruta: str = None,
+                            perfil: str = PERFIL_POR_DEFECTO):
     """
     Visualiza la serie temporal completa de casos.
     
@@ -110,71 +180,114 @@ def analisis_serie_temporal(df_serie: pd.DataFrame, guardar: bool = False, ruta:
         df_serie: DataFrame con serie temporal
         guardar: Si True, guarda el gráfico
         ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
     """
     # Crear fecha para el eje X
-    df_serie['fecha'] = pd.to_datetime(
-        df_serie['ano'].astype(str) + '-W' + df_serie['semana'].astype(str).str.zfill(2) + '-1',
-        format='%Y-W%W-%w',
-        errors='coerce'
-    )
+    df_serie['fecha'] = fecha_inicio_semana(df_serie['ano'], df_serie['semana'])
+    
+    graficar_serie_temporal(df_serie[['fecha', 'casos']], guardar, ruta, perfil)
+
+
+def graficar_serie_temporal(df_serie: pd.DataFrame, guardar: bool = False, ruta: str = None,
+                            perfil: str = PERFIL_POR_DEFECTO, ambito: str = 'Loreto'):
+    """
+    Grafica la serie semanal de casos.
     
-    fig, ax = plt.subplots(figsize=(16, 6))
+    Args:
+        df_serie: DataFrame con columnas 'fecha' y 'casos'
+        guardar: Si True, guarda el gráfico
+        ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
+        ambito: Ámbito geográfico del título (ej: una provincia en los paquetes por lotes)
+    """
+    fig, ax = crear_figura(figsize=(16, 6))
     ax.plot(df_serie['fecha'], df_serie['casos'], linewidth=1.5, color='darkblue', alpha=0.7)
     
-    ax.set_title('Serie Temporal de Casos de Dengue en Loreto (2000-2024)', 
+    ax.set_title(f'Serie Temporal de Casos de Dengue en {ambito} (2000-2024)', 
                  fontsize=16, fontweight='bold')
     ax.set_xlabel('Fecha', fontsize=12)
     ax.set_ylabel('Casos por Semana', fontsize=12)
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    ajustar_diseno(perfil)
     
     if guardar and ruta:
-        plt.savefig(ruta, dpi=300, bbox_inches='tight')
-        print(f"[GRAFICO] Guardado en: {ruta}")
+        guardar_figura(ruta, perfil)
     
-    plt.close()
+    cerrar_figura()
 
 
 def analisis_geografico(df: pd.DataFrame, nivel: str = 'provincia', 
-                        top_n: int = 10, guardar: bool = False, ruta: str = None) -> pd.Series:
+                        top_n: int = 10, guardar: bool = False, ruta: str = None,
+                        perfil: str = PERFIL_POR_DEFECTO) -> pd.Series:
     """
     Analiza la distribución geográfica de casos.
     
     Args:
-        df: DataFrame con datos de dengue
+        df: DataFrame con datos de dengue o cubo de casos (ver `cubo.construir_cubo`)
         nivel: Nivel geográfico ('provincia', 'distrito')
         top_n: Número de ubicaciones a mostrar
         guardar: Si True, guarda el gráfico
         ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
     
     Returns:
         Serie con casos por ubicación
     """
-    casos_por_ubicacion = df[nivel].value_counts().head(top_n)
+    casos_por_ubicacion = contar_casos(df, nivel).head(top_n)
     
-    # Crear gráfico
-    fig, ax = plt.subplots(figsize=(12, 8))
+    graficar_casos_por_ubicacion(casos_por_ubicacion, nivel, top_n, guardar, ruta, perfil)
+    
+    return casos_por_ubicacion
+
+
+def graficar_casos_por_ubicacion(casos_por_ubicacion: pd.Series, nivel: str = 'provincia',
+                                 top_n: int = 10, guardar: bool = False, ruta: str = None,
+                                 perfil: str = PERFIL_POR_DEFECTO, ambito: str = 'Loreto'):
+    """
+    Grafica las ubicaciones con más casos.
+    
+    Args:
+        casos_por_ubicacion: Serie con casos por ubicación, de mayor a menor
+        nivel: Nivel geográfico ('provincia', 'distrito', 'localidad')
+        top_n: Número de ubicaciones mostradas (para el título)
+        guardar: Si True, guarda el gráfico
+        ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
+        ambito: Ámbito geográfico del título (ej: una provincia en los paquetes por lotes)
+    """
+    fig, ax = crear_figura(figsize=(12, 8))
     casos_por_ubicacion.plot(kind='barh', color='teal', edgecolor='black', ax=ax)
     
-    titulo = f'Top {top_n} {nivel.capitalize()}s con Más Casos de Dengue en Loreto'
+    titulo = f'Top {top_n} {PLURAL_NIVEL.get(nivel, nivel.capitalize() + "s")} con Más Casos de Dengue en {ambito}'
     ax.set_title(titulo, fontsize=16, fontweight='bold')
     ax.set_xlabel('Número de Casos', fontsize=12)
     ax.set_ylabel(nivel.capitalize(), fontsize=12)
     ax.grid(axis='x', alpha=0.3)
     
-    plt.tight_layout()
+    ajustar_diseno(perfil)
     
     if guardar and ruta:
-        plt.savefig(ruta, dpi=300, bbox_inches='tight')
-        print(f"[GRAFICO] Guardado en: {ruta}")
+        guardar_figura(ruta, perfil)
     
-    plt.close()
+    cerrar_figura()
+
+
+def contar_edades(df: pd.DataFrame) -> pd.Series:
+    """
+    Cuenta los casos por edad (solo edades válidas, hasta 100 años).
     
-    return casos_por_ubicacion
+    Args:
+        df: DataFrame con datos de dengue
+    
+    Returns:
+        Serie edad -> casos, ordenada por edad
+    """
+    return df.loc[df['edad'] <= 100, 'edad'].value_counts().sort_index()
 
 
-def analisis_demografico_edad(df: pd.DataFrame, guardar: bool = False, ruta: str = None):
+def analisis_demografico_edad(df: pd.DataFrame, guardar: bool = False, ruta: str = None,
+                              perfil: str = PERFIL_POR_DEFECTO):
     """
     Analiza la distribución de casos por edad.
     
@@ -182,139 +295,249 @@ def analisis_demografico_edad(df: pd.DataFrame, guardar: bool = False, ruta: str
         df: DataFrame con datos de dengue
         guardar: Si True, guarda el gráfico
         ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
+    """
+    graficar_distribucion_edad(contar_edades(df), guardar, ruta, perfil)
+
+
+def graficar_distribucion_edad(casos_por_edad: pd.Series, guardar: bool = False, ruta: str = None,
+                               perfil: str = PERFIL_POR_DEFECTO):
+    """
+    Grafica el histograma y el boxplot de edades.
+    
+    Las edades se reconstruyen a partir de sus conteos, de modo que los
+    gráficos son los mismos que con una fila por caso.
+    
+    Args:
+        casos_por_edad: Serie edad -> casos (ver `contar_edades`)
+        guardar: Si True, guarda el gráfico
+        ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
     """
-    # Filtrar edades válidas
-    df_edad = df[df['edad'] <= 100].copy()
+    edades = np.repeat(casos_por_edad.index.to_numpy(), casos_por_edad.to_numpy())
     
-    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    fig, axes = crear_figura(1, 2, figsize=(16, 6))
     
     # Histograma
-    axes[0].hist(df_edad['edad'], bins=30, color='skyblue', edgecolor='black', alpha=0.7)
+    axes[0].hist(edades, bins=30, color='skyblue', edgecolor='black', alpha=0.7)
     axes[0].set_title('Distribución de Casos por Edad', fontsize=14, fontweight='bold')
     axes[0].set_xlabel('Edad (años)', fontsize=12)
     axes[0].set_ylabel('Frecuencia', fontsize=12)
     axes[0].grid(axis='y', alpha=0.3)
     
     # Boxplot
-    axes[1].boxplot(df_edad['edad'], vert=True, patch_artist=True,
+    axes[1].boxplot(edades, vert=True, patch_artist=True,
                     boxprops=dict(facecolor='lightgreen', alpha=0.7))
     axes[1].set_title('Boxplot de Edad', fontsize=14, fontweight='bold')
     axes[1].set_ylabel('Edad (años)', fontsize=12)
     axes[1].grid(axis='y', alpha=0.3)
     
-    plt.tight_layout()
+    ajustar_diseno(perfil)
     
     if guardar and ruta:
-        plt.savefig(ruta, dpi=300, bbox_inches='tight')
-        print(f"[GRAFICO] Guardado en: {ruta}")
+        guardar_figura(ruta, perfil)
     
-    plt.close()
+    cerrar_figura()
 
 
-def analisis_demografico_sexo(df: pd.DataFrame, guardar: bool = False, ruta: str = None) -> pd.Series:
+def analisis_demografico_sexo(df: pd.DataFrame, guardar: bool = False, ruta: str = None,
+                              perfil: str = PERFIL_POR_DEFECTO) -> pd.Series:
     """
     Analiza la distribución de casos por sexo.
     
     Args:
-        df: DataFrame con datos de dengue
+        df: DataFrame con datos de dengue o cubo de casos (ver `cubo.construir_cubo`)
         guardar: Si True, guarda el gráfico
         ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
     
     Returns:
         Serie con casos por sexo
     """
-    casos_por_sexo = df['sexo'].value_counts()
+    casos_por_sexo = contar_casos(df, 'sexo')
     
-    # Crear gráfico de pastel
-    fig, ax = plt.subplots(figsize=(10, 8))
+    graficar_distribucion_sexo(casos_por_sexo, guardar, ruta, perfil)
     
-    colores = ['#ff9999', '#66b3ff']
-    explode = (0.05, 0.05)
+    return casos_por_sexo
+
+
+def graficar_distribucion_sexo(casos_por_sexo: pd.Series, guardar: bool = False, ruta: str = None,
+                               perfil: str = PERFIL_POR_DEFECTO):
+    """
+    Grafica el pastel de casos por sexo.
     
-    ax.pie(casos_por_sexo.values, labels=['Femenino', 'Masculino'], 
+    Args:
+        casos_por_sexo: Serie con casos por sexo
+        guardar: Si True, guarda el gráfico
+        ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
+    """
+    # Las etiquetas y colores salen del índice (el orden es por número de
+    # casos) y se omiten las categorías sin casos
+    casos_por_sexo = casos_por_sexo[casos_por_sexo > 0]
+    etiquetas = [ETIQUETAS_SEXO.get(sexo, str(sexo)) for sexo in casos_por_sexo.index]
+    colores = [COLORES_SEXO.get(sexo, '#cccccc') for sexo in casos_por_sexo.index]
+    explode = [0.05] * len(casos_por_sexo)
+    
+    fig, ax = crear_figura(figsize=(10, 8))
+    
+    ax.pie(casos_por_sexo.values, labels=etiquetas, 
            autopct='%1.1f%%', startangle=90, colors=colores, explode=explode,
            textprops={'fontsize': 12, 'fontweight': 'bold'})
     
     ax.set_title('Distribución de Casos por Sexo', fontsize=16, fontweight='bold')
     
-    plt.tight_layout()
+    ajustar_diseno(perfil)
     
     if guardar and ruta:
-        plt.savefig(ruta, dpi=300, bbox_inches='tight')
-        print(f"[GRAFICO] Guardado en: {ruta}")
+        guardar_figura(ruta, perfil)
     
-    plt.close()
+    cerrar_figura()
+
+
+def matriz_mapa_calor(df_serie: pd.DataFrame, almacen: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Matriz semana x año de casos para el mapa de calor.
     
-    return casos_por_sexo
+    Args:
+        df_serie: DataFrame con serie temporal (no se usa si se indica `almacen`)
+        almacen: Almacén de series semanales; la matriz se lee directamente de él
+    
+    Returns:
+        DataFrame con semanas como filas y años como columnas
+    """
+    if almacen is not None:
+        return matriz_ano_semana(almacen)
+    return matriz_semanas(matrices_semana_ano(df_serie))
 
 
-def mapa_calor_temporal(df_serie: pd.DataFrame, guardar: bool = False, ruta: str = None):
+def mapa_calor_temporal(df_serie: pd.DataFrame, guardar: bool = False, ruta: str = None,
+                        almacen: Optional[Dict] = None, perfil: str = PERFIL_POR_DEFECTO):
     """
     Crea un mapa de calor de casos por año y semana.
     
     Args:
-        df_serie: DataFrame con serie temporal
+        df_serie: DataFrame con serie temporal (no se usa si se indica `almacen`)
         guardar: Si True, guarda el gráfico
         ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
+        almacen: Almacén de series semanales; la matriz semana x año se lee
+            directamente de él
     """
-    # Crear pivot table
-    pivot = df_serie.pivot_table(values='casos', index='semana', columns='ano', aggfunc='sum', fill_value=0)
-    
-    fig, ax = plt.subplots(figsize=(18, 10))
+    graficar_mapa_calor(matriz_mapa_calor(df_serie, almacen), guardar, ruta, perfil)
+
+
+def graficar_mapa_calor(pivot: pd.DataFrame, guardar: bool = False, ruta: str = None,
+                        perfil: str = PERFIL_POR_DEFECTO):
+    """
+    Grafica el mapa de calor semana x año.
     
-    sns.heatmap(pivot, cmap='YlOrRd', cbar_kws={'label': 'Casos'}, 
-                linewidths=0.5, ax=ax, fmt='d')
+    Args:
+        pivot: Matriz semana x año (ver `matriz_mapa_calor`)
+        guardar: Si True, guarda el gráfico
+        ruta: Ruta donde guardar el gráfico
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
+    """
+    fig, ax = crear_figura(figsize=(18, 10))
+    
+    if validar_perfil(perfil)['mapa_calor_rapido']:
+        # Una sola malla sin bordes de celda, con la misma orientación que sns.heatmap
+        malla = ax.pcolormesh(pivot.to_numpy(), cmap='YlOrRd', edgecolors='none')
+        fig.colorbar(malla, ax=ax, label='Casos')
+        ax.set_xticks(np.arange(len(pivot.columns)) + 0.5, pivot.columns, rotation=90)
+        paso = max(1, len(pivot.index) // 26)
+        ax.set_yticks(np.arange(0, len(pivot.index), paso) + 0.5, pivot.index[::paso])
+        ax.invert_yaxis()
+    else:
+        sns.heatmap(pivot, cmap='YlOrRd', cbar_kws={'label': 'Casos'}, 
+                    linewidths=0.5, ax=ax, fmt='d')
     
     ax.set_title('Mapa de Calor: Casos de Dengue por Año y Semana Epidemiológica', 
                  fontsize=16, fontweight='bold')
     ax.set_xlabel('Año', fontsize=12)
     ax.set_ylabel('Semana Epidemiológica', fontsize=12)
     
-    plt.tight_layout()
+    ajustar_diseno(perfil)
     
     if guardar and ruta:
-        plt.savefig(ruta, dpi=300, bbox_inches='tight')
-        print(f"[GRAFICO] Guardado en: {ruta}")
+        guardar_figura(ruta, perfil)
     
-    plt.close()
+    cerrar_figura()
+
+
+def _inicializar_proceso_grafico():
+    """Prepara un proceso de la piscina: backend sin pantalla y estilo del proyecto"""
+    plt.switch_backend('Agg')
+    configurar_estilo_graficos()
+
+
+def renderizar_figura(tarea: Tuple[Callable, Dict]) -> Tuple[str, float]:
+    """
+    Dibuja y guarda una figura a partir de su tarea.
+    
+    Args:
+        tarea: Tupla (función `graficar_*`, argumentos con los datos agregados y 'ruta')
+    
+    Returns:
+        Tupla (ruta del archivo escrito, segundos de renderizado)
+    """
+    funcion, argumentos = tarea
+    inicio = time.perf_counter()
+    funcion(guardar=True, **argumentos)
+    ruta = ruta_figura(argumentos['ruta'], argumentos.get('perfil', PERFIL_POR_DEFECTO))
+    return ruta, time.perf_counter() - inicio
+
+
+def renderizar_figuras(tareas: List[Tuple[Callable, Dict]],
+                       procesos: Optional[int] = None) -> List[Tuple[str, float]]:
+    """
+    Renderiza las figuras en paralelo, una figura por proceso.
+    
+    Cada tarea lleva solo los datos agregados de su figura (conteos, serie
+    semanal o matriz semana x año), no la tabla de casos, de modo que
+    enviarla al proceso es barato. Los procesos usan el backend Agg.
+    
+    Args:
+        tareas: Tuplas (función `graficar_*`, argumentos con los datos agregados y 'ruta')
+        procesos: Procesos de la piscina (None usa un núcleo por figura hasta
+            el total de núcleos; 1 renderiza en el proceso actual)
+    
+    Returns:
+        Lista de tuplas (ruta del archivo escrito, segundos de renderizado), en el orden de las tareas
+    """
+    if procesos is None:
+        procesos = min(len(tareas), os.cpu_count() or 1)
+    
+    if procesos <= 1:
+        return [renderizar_figura(tarea) for tarea in tareas]
+    
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso_grafico) as piscina:
+        return list(piscina.map(renderizar_figura, tareas))
 
 
 def estadisticas_descriptivas(df: pd.DataFrame) -> Dict:
     """
     Calcula estadísticas descriptivas del dataset.
     
+    Todas las cifras salen de una sola pasada (ver `estadisticas`); para
+    datos leídos por bloques o particiones usar `estadisticas_por_bloques`.
+    
     Args:
         df: DataFrame con datos de dengue
     
     Returns:
         Diccionario con estadísticas
     """
-    stats = {
-        'total_casos': len(df),
-        'periodo': f"{df['ano'].min()} - {df['ano'].max()}",
-        'anos_totales': df['ano'].nunique(),
-        'provincias': df['provincia'].nunique(),
-        'distritos': df['distrito'].nunique(),
-        'edad_promedio': df['edad'].mean(),
-        'edad_mediana': df['edad'].median(),
-        'edad_min': df['edad'].min(),
-        'edad_max': df['edad'].max(),
-        'casos_por_ano_promedio': len(df) / df['ano'].nunique(),
-        'ano_max_casos': df['ano'].value_counts().idxmax(),
-        'casos_ano_max': df['ano'].value_counts().max(),
-        'provincia_max_casos': df['provincia'].value_counts().idxmax(),
-        'casos_provincia_max': df['provincia'].value_counts().max()
-    }
-    
-    return stats
+    return finalizar_estadisticas(acumular_estadisticas(df))
 
 
-def generar_reporte_eda(stats: Dict) -> str:
+def generar_reporte_eda(stats: Dict, ambito: Optional[str] = None) -> str:
     """
     Genera un reporte de texto con las estadísticas del EDA.
     
     Args:
         stats: Diccionario con estadísticas
+        ambito: Provincia o distrito del reporte (None para todo el departamento)
     
     Returns:
         String con el reporte
@@ -322,6 +545,8 @@ def generar_reporte_eda(stats: Dict) -> str:
     reporte = []
     reporte.append("=" * 60)
     reporte.append("REPORTE DE ANALISIS EXPLORATORIO DE DATOS")
+    if ambito is not None:
+        reporte.append(f"Ambito: {ambito}")
     reporte.append("=" * 60)
     
     reporte.append(f"\nTotal de casos: {stats['total_casos']:,}")
@@ -0,0 +1,286 @@
+"""
+Módulo de generación por lotes de paquetes de EDA por provincia o distrito
+Sistema de Análisis de Dengue en Perú
+"""
+
+import os
+import time
+import unicodedata
+import pandas as pd
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from almacen_series import CLAVES_GEOGRAFIA, matrices_semana_ano, matriz_semanas
+from artefactos import huella_entrada
+from calendario_epi import fecha_inicio_semana
+from cubo import contar_casos
+from eda import (
+    configurar_estilo_graficos,
+    contar_casos_por_mes,
+    contar_edades,
+    generar_reporte_eda,
+    graficar_casos_por_ano,
+    graficar_casos_por_mes,
+    graficar_casos_por_ubicacion,
+    graficar_distribucion_edad,
+    graficar_distribucion_sexo,
+    graficar_mapa_calor,
+    graficar_serie_temporal,
+    renderizar_figura
+)
+from estadisticas import acumular_estadisticas, finalizar_estadisticas
+from perfiles_graficos import PERFIL_POR_DEFECTO, activar_figura_reutilizable, ruta_figura
+
+
+# Nivel de los paquetes -> nivel del gráfico de ubicaciones dentro de cada paquete
+SUBNIVELES = {'provincia': 'distrito', 'distrito': 'localidad'}
+
+TOP_UBICACIONES = 15
+
+NOMBRE_REPORTE = 'reporte_eda.txt'
+NOMBRE_REPORTE_LOTES = 'reporte_lotes.txt'
+
+
+def nombre_carpeta_geografia(geografia: str) -> str:
+    """Carpeta del paquete de una provincia o distrito (ej: 'DATEM DEL MARAÑON' -> 'datem_del_maranon')"""
+    texto = unicodedata.normalize('NFKD', str(geografia)).encode('ascii', 'ignore').decode('ascii')
+    return '_'.join(texto.lower().replace('/', ' ').split())
+
+
+def preparar_paquetes(df: pd.DataFrame, df_serie: pd.DataFrame, nivel: str, ruta_salida: str,
+                      perfil: str = PERFIL_POR_DEFECTO) -> List[Dict]:
+    """
+    Agrupa los casos una sola vez por provincia o distrito y prepara el
+    paquete de EDA de cada uno.
+    
+    Cada paquete lleva solo los datos agregados de sus figuras y las
+    estadísticas de su reporte, no los registros, de modo que enviarlo a un
+    proceso es barato. Las series semanales se completan con el calendario de
+    `df_serie`, de modo que las semanas sin casos aparecen con cero.
+    
+    Los distritos se agrupan por (provincia, distrito), ya que hay distritos
+    con el mismo nombre en provincias distintas, y sus paquetes se escriben en
+    ruta_salida/distrito/<provincia>/<distrito>.
+    
+    Args:
+        df: DataFrame limpio con datos de dengue
+        df_serie: Serie temporal del departamento (define el calendario de semanas)
+        nivel: 'provincia' o 'distrito'
+        ruta_salida: Carpeta base; cada paquete se escribe en ruta_salida/nivel/geografia
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
+    
+    Returns:
+        Lista de paquetes, uno por geografía con casos
+    """
+    if nivel not in SUBNIVELES:
+        raise ValueError(f"[ERROR] Nivel desconocido: '{nivel}' (opciones: {', '.join(SUBNIVELES)})")
+    subnivel = SUBNIVELES[nivel]
+    
+    calendario = pd.MultiIndex.from_frame(df_serie[['ano', 'semana']].drop_duplicates().sort_values(['ano', 'semana']))
+    fechas = fecha_inicio_semana(calendario.get_level_values('ano'), calendario.get_level_values('semana'))
+    
+    # Matrices semana x año de todas las geografías en una pasada
+    matrices = matrices_semana_ano(df, [nivel], ano_min=int(df_serie['ano'].min()), ano_max=int(df_serie['ano'].max()))
+    
+    paquetes = []
+    for clave, df_geo in df.groupby(CLAVES_GEOGRAFIA[nivel], observed=True, sort=True):
+        nombres = tuple(str(valor) for valor in clave)
+        carpeta = Path(ruta_salida).joinpath(nivel, *[nombre_carpeta_geografia(nombre) for nombre in nombres])
+        # Un distrito se muestra con su provincia: 'YURIMAGUAS (ALTO AMAZONAS)'
+        geografia = nombres[-1] if len(nombres) == 1 else f"{nombres[-1]} ({nombres[0]})"
+        ambito = geografia.title()
+    
+        casos = df_geo.groupby(['ano', 'semana'], observed=True).size().reindex(calendario, fill_value=0)
+        serie_geo = casos.rename('casos').reset_index()
+    
+        figuras = [
+            (graficar_casos_por_ano,
+             {'casos_por_ano': serie_geo.groupby('ano')['casos'].sum(), 'ruta': carpeta / 'casos_por_ano.png'}),
+            (graficar_casos_por_mes,
+             {'casos_por_mes': contar_casos_por_mes(serie_geo), 'ruta': carpeta / 'casos_por_mes.png'}),
+            (graficar_serie_temporal,
+             {'df_serie': pd.DataFrame({'fecha': fechas, 'casos': casos.to_numpy()}),
+              'ruta': carpeta / 'serie_temporal.png'}),
+            (graficar_distribucion_edad,
+             {'casos_por_edad': contar_edades(df_geo), 'ruta': carpeta / 'distribucion_edad.png'}),
+            (graficar_distribucion_sexo,
+             {'casos_por_sexo': contar_casos(df_geo, 'sexo'), 'ruta': carpeta / 'distribucion_sexo.png'}),
+            (graficar_mapa_calor,
+             {'pivot': matriz_semanas(matrices, nivel, nombres[0] if len(nombres) == 1 else nombres),
+              'ruta': carpeta / 'mapa_calor_temporal.png'}),
+        ]
+    
+        if subnivel in df_geo.columns:
+            ubicaciones = contar_casos(df_geo, subnivel)
+            ubicaciones = ubicaciones[ubicaciones > 0].head(TOP_UBICACIONES)
+            if len(ubicaciones):
+                figuras.insert(3, (graficar_casos_por_ubicacion,
+                                   {'casos_por_ubicacion': ubicaciones, 'nivel': subnivel, 'top_n': TOP_UBICACIONES,
+                                    'ruta': carpeta / f'casos_por_{subnivel}.png'}))
+    
+        for funcion, argumentos in figuras:
+            argumentos['ruta'] = str(argumentos['ruta'])
+            argumentos['perfil'] = perfil
+            if funcion in (graficar_casos_por_ano, graficar_casos_por_mes,
+                           graficar_serie_temporal, graficar_casos_por_ubicacion):
+                argumentos['ambito'] = ambito
+    
+        paquetes.append({
+            'geografia': geografia,
+            'nivel': nivel,
+            'carpeta': str(carpeta),
+            'figuras': figuras,
+            'stats': finalizar_estadisticas(acumular_estadisticas(df_geo))
+        })
+    
+    return paquetes
+
+
+def rutas_paquete(paquete: Dict) -> List[str]:
+    """Archivos que escribe el paquete: sus figuras y su reporte"""
+    rutas = [ruta_figura(argumentos['ruta'], argumentos['perfil']) for _, argumentos in paquete['figuras']]
+    return rutas + [str(Path(paquete['carpeta']) / NOMBRE_REPORTE)]
+
+
+def huella_paquete(paquete: Dict) -> str:
+    """Huella de entrada del paquete: datos agregados y parámetros de sus figuras (sin rutas) y estadísticas"""
+    figuras = [(funcion.__name__, {k: v for k, v in argumentos.items() if k != 'ruta'})
+               for funcion, argumentos in paquete['figuras']]
+    return huella_entrada('paquete_eda', paquete['geografia'], figuras, paquete['stats'])
+
+
+def generar_paquete(paquete: Dict) -> Dict:
+    """
+    Dibuja las figuras y escribe el reporte de una geografía.
+    
+    Los errores no se propagan: se devuelven en el resultado para que un
+    paquete fallido no detenga el lote.
+    
+    Args:
+        paquete: Paquete de `preparar_paquetes`
+    
+    Returns:
+        Diccionario con 'geografia', 'archivos' escritos, 'segundos' y 'error' (None si terminó)
+    """
+    inicio = time.perf_counter()
+    archivos = []
+    error = None
+    
+    try:
+        Path(paquete['carpeta']).mkdir(parents=True, exist_ok=True)
+        for tarea in paquete['figuras']:
+            ruta, _ = renderizar_figura(tarea)
+            archivos.append(ruta)
+    
+        ruta_reporte = Path(paquete['carpeta']) / NOMBRE_REPORTE
+        with open(ruta_reporte, 'w', encoding='utf-8') as f:
+            f.write(generar_reporte_eda(paquete['stats'], ambito=f"{paquete['nivel']} {paquete['geografia']}"))
+        archivos.append(str(ruta_reporte))
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    
+    return {
+        'geografia': paquete['geografia'],
+        'archivos': archivos,
+        'segundos': time.perf_counter() - inicio,
+        'error': error
+    }
+
+
+def _inicializar_proceso_lotes():
+    """Prepara un proceso de lotes: backend sin pantalla, estilo del proyecto y una sola figura"""
+    plt.switch_backend('Agg')
+    configurar_estilo_graficos()
+    activar_figura_reutilizable()
+
+
+def _informar_paquete(resultado: Dict) -> None:
+    if resultado['error'] is None:
+        print(f"[LOTE] {resultado['geografia']}: {len(resultado['archivos'])} archivos "
+              f"en {resultado['segundos']:.1f} s")
+    else:
+        print(f"[ERROR] {resultado['geografia']}: {resultado['error']}")
+
+
+def generar_paquetes(paquetes: List[Dict], procesos: Optional[int] = None) -> List[Dict]:
+    """
+    Genera los paquetes en una piscina de procesos, una geografía por tarea.
+    
+    Cada proceso dibuja todas sus figuras sobre una misma figura de
+    matplotlib (ver `perfiles_graficos.activar_figura_reutilizable`).
+    
+    Args:
+        paquetes: Paquetes de `preparar_paquetes`
+        procesos: Procesos de la piscina (None usa todos los núcleos; 1 genera en el proceso actual)
+    
+    Returns:
+        Resultados de `generar_paquete`, en el orden de los paquetes
+    """
+    if procesos is None:
+        procesos = min(len(paquetes), os.cpu_count() or 1)
+    
+    if procesos <= 1:
+        _inicializar_proceso_lotes()
+        resultados = []
+        for paquete in paquetes:
+            resultados.append(generar_paquete(paquete))
+            _informar_paquete(resultados[-1])
+        return resultados
+    
+    resultados = [None] * len(paquetes)
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso_lotes) as piscina:
+        futuros = {piscina.submit(generar_paquete, paquete): i for i, paquete in enumerate(paquetes)}
+        for futuro in as_completed(futuros):
+            resultados[futuros[futuro]] = futuro.result()
+            _informar_paquete(resultados[futuros[futuro]])
+    
+    return resultados
+
+
+def generar_reporte_lotes(resultados: List[Dict], segundos: float, reutilizados: int = 0) -> str:
+    """
+    Genera el reporte del lote: rendimiento global y por geografía, y paquetes fallidos.
+    
+    Args:
+        resultados: Resultados de `generar_paquetes`
+        segundos: Duración total del lote (reloj)
+        reutilizados: Paquetes vigentes que no se regeneraron
+    
+    Returns:
+        String con el reporte
+    """
+    correctos = [r for r in resultados if r['error'] is None]
+    fallidos = [r for r in resultados if r['error'] is not None]
+    archivos = sum(len(r['archivos']) for r in correctos)
+    
+    reporte = []
+    reporte.append("=" * 60)
+    reporte.append("REPORTE DE PAQUETES DE EDA POR GEOGRAFIA")
+    reporte.append("=" * 60)
+    
+    reporte.append(f"\nPaquetes generados: {len(correctos)}")
+    reporte.append(f"Paquetes fallidos: {len(fallidos)}")
+    reporte.append(f"Paquetes reutilizados: {reutilizados}")
+    
+    reporte.append(f"\nRendimiento:")
+    reporte.append(f"  - Tiempo total: {segundos:.1f} s")
+    if segundos > 0:
+        reporte.append(f"  - Paquetes por minuto: {len(resultados) / segundos * 60:.1f}")
+        reporte.append(f"  - Archivos por segundo: {archivos / segundos:.1f}")
+    
+    if correctos:
+        reporte.append(f"\nPor geografia:")
+        for r in correctos:
+            reporte.append(f"  - {r['geografia']}: {len(r['archivos'])} archivos en {r['segundos']:.1f} s "
+                           f"({len(r['archivos']) / max(r['segundos'], 1e-9):.1f} archivos/s)")
+    
+    if fallidos:
+        reporte.append(f"\nFallidos:")
+        for r in fallidos:
+            reporte.append(f"  - {r['geografia']}: {r['error']} ({len(r['archivos'])} archivos escritos)")
+    
+    reporte.append("\n" + "=" * 60)
+    
+    return "\n".join(reporte)
@@ -0,0 +1,176 @@
+"""
+Módulo de esquema de tipos compactos de la tabla de casos
+Sistema de Análisis de Dengue en Perú
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+
+
+# Tipos declarados de la tabla de casos. Las columnas de texto de baja
+# cardinalidad se guardan como categóricas y las numéricas con el entero más
+# pequeño que cubre su rango válido (año 2000-2024, semana 1-53, edad 0-120).
+ESQUEMA_CASOS = {
+    'departamento': 'category',
+    'provincia': 'category',
+    'distrito': 'category',
+    'localidad': 'category',
+    'enfermedad': 'category',
+    'sexo': 'category',
+    'diagnostic': 'category',
+    'tipo_edad': 'category',
+    'ano': 'int16',
+    'semana': 'int8',
+    'edad': 'uint8'
+}
+
+
+def _cabe_en_entero(serie: pd.Series, dtype: str) -> bool:
+    """Indica si la serie puede convertirse al tipo entero sin pérdida"""
+    if not pd.api.types.is_numeric_dtype(serie) or serie.isnull().any():
+        return False
+    if len(serie) == 0:
+        return True
+    valores = serie.to_numpy()
+    if pd.api.types.is_float_dtype(serie) and not np.all(np.mod(valores, 1) == 0):
+        return False
+    limites = np.iinfo(dtype)
+    return limites.min <= valores.min() and valores.max() <= limites.max
+
+
+def aplicar_esquema(df: pd.DataFrame, esquema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Convierte las columnas del DataFrame a los tipos compactos del esquema.
+    
+    Las columnas de texto pasan a categóricas. Las numéricas solo se reducen
+    cuando no tienen nulos y todos sus valores caben en el tipo declarado; en
+    caso contrario se conservan (por ejemplo, datos crudos antes de validar) y
+    pueden compactarse de nuevo tras la limpieza.
+    
+    Args:
+        df: DataFrame a convertir
+        esquema: Diccionario columna -> tipo (por defecto ESQUEMA_CASOS)
+    
+    Returns:
+        DataFrame con tipos compactos (las columnas no convertidas se comparten)
+    """
+    esquema = ESQUEMA_CASOS if esquema is None else esquema
+    df_compacto = df.copy(deep=False)
+    
+    for col, dtype in esquema.items():
+        if col not in df_compacto.columns or str(df_compacto[col].dtype) == dtype:
+            continue
+        if dtype == 'category':
+            df_compacto[col] = df_compacto[col].astype('category')
+        elif _cabe_en_entero(df_compacto[col], dtype):
+            df_compacto[col] = df_compacto[col].astype(dtype)
+    
+    return df_compacto
+
+
+def concatenar_compacto(partes: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatena DataFrames compactos conservando las columnas categóricas.
+    
+    Cada parte puede tener categorías distintas (por ejemplo, bloques leídos por
+    separado); se unifican antes de concatenar para que el resultado siga
+    siendo categórico en lugar de volver a texto.
+    
+    Args:
+        partes: Lista de DataFrames con las mismas columnas
+    
+    Returns:
+        DataFrame concatenado
+    """
+    if len(partes) == 1:
+        return partes[0].copy()
+    
+    columnas_cat = [col for col in partes[0].columns
+                    if all(isinstance(p[col].dtype, pd.CategoricalDtype) for p in partes)]
+    
+    if columnas_cat:
+        partes = [p.copy(deep=False) for p in partes]
+        for col in columnas_cat:
+            categorias = pd.Index([])
+            for p in partes:
+                categorias = categorias.union(p[col].cat.categories)
+            for p in partes:
+                p[col] = p[col].cat.set_categories(categorias)
+    
+    return pd.concat(partes)
+
+
+def leer_csv_compacto(ruta_archivo: str, esquema: Optional[Dict[str, str]] = None, **kwargs) -> pd.DataFrame:
+    """
+    Lee un CSV procesado directamente con los tipos compactos del esquema.
+    
+    Las columnas categóricas se construyen durante la lectura, sin pasar por una
+    columna intermedia de texto.
+    
+    Args:
+        ruta_archivo: Ruta al CSV
+        esquema: Diccionario columna -> tipo (por defecto ESQUEMA_CASOS)
+        **kwargs: Argumentos adicionales para pd.read_csv
+    
+    Returns:
+        DataFrame con tipos compactos
+    """
+    esquema = ESQUEMA_CASOS if esquema is None else esquema
+    columnas = pd.read_csv(ruta_archivo, **{**kwargs, 'nrows': 0}).columns
+    tipos = {col: 'category' for col, dtype in esquema.items()
+             if dtype == 'category' and col in columnas}
+    
+    df = pd.read_csv(ruta_archivo, dtype=tipos, **kwargs)
+    
+    return aplicar_esquema(df, esquema)
+
+
+def uso_memoria(df: pd.DataFrame) -> pd.Series:
+    """
+    Calcula la memoria ocupada por cada columna (incluye el contenido de los textos).
+    
+    Args:
+        df: DataFrame a medir
+    
+    Returns:
+        Serie con bytes por columna
+    """
+    return df.memory_usage(deep=True, index=False)
+
+
+def generar_reporte_memoria(df_antes: pd.DataFrame, df_despues: pd.DataFrame) -> str:
+    """
+    Genera un reporte de memoria por columna antes y después de compactar.
+    
+    Args:
+        df_antes: DataFrame original
+        df_despues: DataFrame con tipos compactos
+    
+    Returns:
+        String con el reporte
+    """
+    antes = uso_memoria(df_antes)
+    despues = uso_memoria(df_despues)
+    
+    reporte = []
+    reporte.append("=" * 60)
+    reporte.append("REPORTE DE MEMORIA POR COLUMNA")
+    reporte.append("=" * 60)
+    reporte.append(f"\n{'Columna':<16}{'Tipo':>10}{'Antes (MB)':>12}{'Despues (MB)':>14}{'Factor':>8}")
+    
+    for col in antes.index:
+        mb_antes = antes[col] / 1e6
+        mb_despues = despues.get(col, 0) / 1e6
+        factor = mb_antes / mb_despues if mb_despues > 0 else float('nan')
+        tipo = str(df_despues[col].dtype) if col in df_despues.columns else '-'
+        reporte.append(f"{col:<16}{tipo:>10}{mb_antes:>12.2f}{mb_despues:>14.2f}{factor:>7.1f}x")
+    
+    total_antes = antes.sum() / 1e6
+    total_despues = despues.sum() / 1e6
+    reporte.append(f"\n{'TOTAL':<26}{total_antes:>12.2f}{total_despues:>14.2f}"
+                   f"{total_antes / total_despues:>7.1f}x")
+    
+    reporte.append("\n" + "=" * 60)
+    
+    return "\n".join(reporte)
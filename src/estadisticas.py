@@ -0,0 +1,210 @@
+"""
+Módulo de estadísticas descriptivas en una pasada, fusionables por bloques o particiones
+Sistema de Análisis de Dengue en Perú
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Iterable, Optional
+
+
+# Boceto de cuantiles de la edad: histograma de un año de ancho en [0, 256).
+# Es exacto para edades enteras (las del esquema compacto, uint8) y se
+# aproxima con un error menor a un año para edades con decimales.
+LIMITE_EDAD_BOCETO = 256
+
+DIMENSIONES_ESTADISTICAS = ['ano', 'provincia', 'distrito']
+
+
+def _codificar(serie: pd.Series):
+    """Códigos enteros (-1 para nulos) y valores distintos de una columna"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), serie.cat.categories
+    return pd.factorize(serie, use_na_sentinel=True)
+
+
+def _contar_grupos(df: pd.DataFrame) -> pd.Series:
+    """
+    Casos por combinación observada de las dimensiones, como
+    `df.groupby(DIMENSIONES_ESTADISTICAS, observed=True, dropna=False).size()`,
+    con un único `bincount` sobre una clave combinada de los códigos.
+    """
+    codigos, niveles = zip(*(_codificar(df[col]) for col in DIMENSIONES_ESTADISTICAS))
+    
+    clave = np.zeros(len(df), dtype=np.int64)
+    for codigo, nivel in zip(codigos, niveles):
+        clave = clave * (len(nivel) + 1) + (codigo.astype(np.int64) + 1)
+    
+    conteos = np.bincount(clave)
+    presentes = np.flatnonzero(conteos)
+    
+    codigos_grupos = []
+    resto = presentes
+    for nivel in reversed(niveles):
+        base = len(nivel) + 1
+        codigos_grupos.insert(0, resto % base - 1)
+        resto = resto // base
+    
+    indice = pd.MultiIndex(levels=list(niveles), codes=codigos_grupos,
+                           names=DIMENSIONES_ESTADISTICAS, verify_integrity=False)
+    return pd.Series(conteos[presentes], index=indice, dtype=np.int64)
+
+
+def acumular_estadisticas(df: pd.DataFrame) -> Dict:
+    """
+    Calcula los acumulados de las estadísticas descriptivas en una pasada.
+    
+    Los casos se cuentan una sola vez por (ano, provincia, distrito), de donde
+    salen los casos por año y por provincia y los distritos distintos; la
+    edad se resume con su conteo, suma, extremos e histograma. Los acumulados
+    de varios bloques o particiones se combinan con `fusionar_estadisticas`.
+    
+    Args:
+        df: DataFrame con datos de dengue
+    
+    Returns:
+        Diccionario con 'total', 'grupos' (casos por ano, provincia y distrito) y 'edad'
+    """
+    grupos = _contar_grupos(df)
+    
+    edades = df['edad'].dropna().to_numpy()
+    indices = np.clip(np.floor(edades), 0, LIMITE_EDAD_BOCETO - 1).astype(np.intp)
+    
+    return {
+        'total': len(df),
+        'grupos': grupos,
+        'edad': {
+            'n': len(edades),
+            'suma': float(edades.sum(dtype=np.float64)),
+            'min': edades.min() if len(edades) else None,
+            'max': edades.max() if len(edades) else None,
+            'histograma': np.bincount(indices, minlength=LIMITE_EDAD_BOCETO).astype(np.int64)
+        }
+    }
+
+
+def fusionar_estadisticas(acumulados: Iterable[Optional[Dict]]) -> Dict:
+    """
+    Combina acumulados de bloques o particiones en los de la tabla completa.
+    
+    Los conteos, la suma y los extremos se combinan de forma exacta; los
+    histogramas de edad se suman. Los elementos None se ignoran, de modo que
+    puede acumularse con `acumulado = fusionar_estadisticas([acumulado, acumular_estadisticas(bloque)])`.
+    
+    Args:
+        acumulados: Acumulados de `acumular_estadisticas`
+    
+    Returns:
+        Acumulado combinado
+    """
+    acumulados = [acumulado for acumulado in acumulados if acumulado is not None]
+    if not acumulados:
+        raise Exception("[ERROR] No se recibieron estadisticas para fusionar")
+    if len(acumulados) == 1:
+        return acumulados[0]
+    
+    grupos = pd.concat([acumulado['grupos'] for acumulado in acumulados])
+    grupos = grupos.groupby(level=list(range(len(DIMENSIONES_ESTADISTICAS))), dropna=False, sort=False).sum()
+    
+    edades = [acumulado['edad'] for acumulado in acumulados]
+    minimos = [edad['min'] for edad in edades if edad['min'] is not None]
+    maximos = [edad['max'] for edad in edades if edad['max'] is not None]
+    
+    return {
+        'total': sum(acumulado['total'] for acumulado in acumulados),
+        'grupos': grupos,
+        'edad': {
+            'n': sum(edad['n'] for edad in edades),
+            'suma': sum(edad['suma'] for edad in edades),
+            'min': min(minimos) if minimos else None,
+            'max': max(maximos) if maximos else None,
+            'histograma': np.sum([edad['histograma'] for edad in edades], axis=0)
+        }
+    }
+
+
+def cuantil_histograma(histograma: np.ndarray, q: float) -> float:
+    """
+    Cuantil de los valores resumidos en el histograma de un año de ancho.
+    
+    Interpola linealmente entre estadísticos de orden, como `Series.quantile`,
+    de modo que con edades enteras el resultado es exacto.
+    
+    Args:
+        histograma: Conteos por año de edad
+        q: Cuantil entre 0 y 1
+    
+    Returns:
+        Valor del cuantil (NaN si el histograma está vacío)
+    """
+    n = int(histograma.sum())
+    if n == 0:
+        return np.nan
+    
+    acumulado = np.cumsum(histograma)
+    posicion = (n - 1) * q
+    inferior, superior = int(np.floor(posicion)), int(np.ceil(posicion))
+    valor_inferior, valor_superior = np.searchsorted(acumulado, [inferior, superior], side='right')
+    
+    return float(valor_inferior + (posicion - inferior) * (valor_superior - valor_inferior))
+
+
+def finalizar_estadisticas(acumulado: Dict) -> Dict:
+    """
+    Calcula las estadísticas del reporte de EDA a partir de los acumulados.
+    
+    Args:
+        acumulado: Acumulado de `acumular_estadisticas` o `fusionar_estadisticas`
+    
+    Returns:
+        Diccionario con estadísticas (mismas claves que `eda.estadisticas_descriptivas`)
+    """
+    grupos = acumulado['grupos']
+    casos_por_ano = grupos.groupby(level='ano').sum()
+    casos_por_provincia = grupos.groupby(level='provincia', observed=True).sum()
+    casos_por_provincia = casos_por_provincia[casos_por_provincia > 0]
+    distritos = grupos.index.get_level_values('distrito').dropna().unique()
+    
+    edad = acumulado['edad']
+    anos_totales = len(casos_por_ano)
+    
+    stats = {
+        'total_casos': acumulado['total'],
+        'periodo': f"{casos_por_ano.index.min()} - {casos_por_ano.index.max()}",
+        'anos_totales': anos_totales,
+        'provincias': len(casos_por_provincia),
+        'distritos': len(distritos),
+        'edad_promedio': edad['suma'] / edad['n'] if edad['n'] else np.nan,
+        'edad_mediana': cuantil_histograma(edad['histograma'], 0.5),
+        'edad_min': edad['min'],
+        'edad_max': edad['max'],
+        'casos_por_ano_promedio': acumulado['total'] / anos_totales,
+        'ano_max_casos': casos_por_ano.idxmax(),
+        'casos_ano_max': casos_por_ano.max(),
+        'provincia_max_casos': casos_por_provincia.idxmax(),
+        'casos_provincia_max': casos_por_provincia.max()
+    }
+    
+    return stats
+
+
+def estadisticas_por_bloques(bloques: Iterable[pd.DataFrame]) -> Dict:
+    """
+    Estadísticas descriptivas de una tabla leída por bloques o particiones.
+    
+    Solo se mantienen los acumulados, de modo que la memoria no depende del
+    número total de registros (ej: `ingestion.iterar_bloques` sobre el CSV
+    nacional, o las particiones del dataset por año).
+    
+    Args:
+        bloques: DataFrames con datos de dengue
+    
+    Returns:
+        Diccionario con estadísticas (mismas claves que `eda.estadisticas_descriptivas`)
+    """
+    acumulado = None
+    for bloque in bloques:
+        acumulado = fusionar_estadisticas([acumulado, acumular_estadisticas(bloque)])
+    if acumulado is None:
+        raise Exception("[ERROR] No se recibieron bloques para las estadisticas")
+    return finalizar_estadisticas(acumulado)
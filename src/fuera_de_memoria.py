@@ -0,0 +1,285 @@
+"""
+Módulo de limpieza fuera de memoria (por bloques) para datasets mayores que la RAM
+Sistema de Análisis de Dengue en Perú
+"""
+
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from archivos_crudos import abrir_texto
+from cleaning import (
+    formatear_reporte_limpieza,
+    reglas_para_estrategia,
+    resumir_calidad,
+    transformar_filas_validas
+)
+from cubo import agregar_cubo, fusionar_cubos
+from huellas import calcular_huella_filas
+from incremental import calcular_huellas_semanales
+from ingestion import anexar_dataset_particionado
+from perfil_calidad import fusionar_perfiles, nulos_por_columna, perfilar, total_nulos
+from persistencia import COMPRESION_CSV, eliminar_variantes, formato_de, registrar_suma
+from reglas import evaluar_reglas, reportar_motivos, resumir_motivos, tabla_cuarentena
+
+
+# Memoria de trabajo por fila cruda: el bloque leído, su versión compacta,
+# las columnas limpias y los temporales de validación y agregación
+FACTOR_MEMORIA_TRABAJO = 4
+FILAS_MUESTRA = 10_000
+TAMANO_BLOQUE_MINIMO = 1_000
+
+# Las huellas únicas se acumulan en disco, repartidas por sus 4 bits altos en
+# 16 particiones que se deduplican una a una al final
+BITS_PARTICION_HUELLAS = 4
+
+
+def estimar_bytes_por_fila(ruta_archivo: str, sep: str = ';', filas_muestra: int = FILAS_MUESTRA) -> float:
+    """
+    Estima la memoria que ocupa una fila del CSV una vez cargada en pandas.
+    
+    Args:
+        ruta_archivo: Ruta al CSV
+        sep: Separador del CSV
+        filas_muestra: Filas leídas para la estimación
+    
+    Returns:
+        Bytes por fila (incluye el contenido de los textos)
+    """
+    with abrir_texto(ruta_archivo) as texto:
+        muestra = pd.read_csv(texto, sep=sep, nrows=filas_muestra)
+    if muestra.empty:
+        raise Exception(f"[ERROR] El archivo no contiene registros: {ruta_archivo}")
+    return muestra.memory_usage(deep=True).sum() / len(muestra)
+
+
+def calcular_tamano_bloque(ruta_archivo: str, memoria_maxima_mb: float, sep: str = ';') -> int:
+    """
+    Número de filas por bloque que respeta el techo de memoria indicado.
+    
+    Args:
+        ruta_archivo: Ruta al CSV
+        memoria_maxima_mb: Memoria máxima para el bloque en proceso (MB)
+        sep: Separador del CSV
+    
+    Returns:
+        Filas por bloque (al menos TAMANO_BLOQUE_MINIMO)
+    """
+    bytes_por_fila = estimar_bytes_por_fila(ruta_archivo, sep=sep)
+    filas = int(memoria_maxima_mb * 1e6 / (bytes_por_fila * FACTOR_MEMORIA_TRABAJO))
+    filas = max(filas, TAMANO_BLOQUE_MINIMO)
+    
+    print(f"[BLOQUES] {bytes_por_fila:,.0f} bytes por fila, techo {memoria_maxima_mb:,.0f} MB: "
+          f"{filas:,} filas por bloque")
+    
+    return filas
+
+
+def _sumar_por_semana(partes: List[pd.DataFrame], columnas: List[str]) -> pd.DataFrame:
+    """Suma por (ano, semana) las columnas de conteos parciales"""
+    agrupado = pd.concat(partes).groupby(['ano', 'semana'], sort=True)[columnas].sum()
+    return agrupado.reset_index()
+
+
+def _repartir_huellas(huellas: pd.Series, dir_huellas: Path) -> None:
+    """
+    Anexa las huellas únicas de un bloque (con sus repeticiones) a los archivos
+    de su partición, según los bits altos de la huella.
+    """
+    unicas, conteos = np.unique(huellas.to_numpy().astype(np.uint64), return_counts=True)
+    desplazamiento = np.uint64(64 - BITS_PARTICION_HUELLAS)
+    limites = np.searchsorted(unicas, np.arange(1, 2 ** BITS_PARTICION_HUELLAS, dtype=np.uint64) << desplazamiento)
+    
+    for particion, (parte, conteos_parte) in enumerate(zip(np.split(unicas, limites), np.split(conteos, limites))):
+        if len(parte):
+            with open(dir_huellas / f'huellas_{particion:02d}.bin', 'ab') as f:
+                parte.tofile(f)
+            with open(dir_huellas / f'conteos_{particion:02d}.bin', 'ab') as f:
+                conteos_parte.astype(np.int64).tofile(f)
+
+
+def _fusionar_huellas(dir_huellas: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Deduplica una vez, partición por partición, las huellas anexadas por
+    `_repartir_huellas`. Las particiones van en orden de sus bits altos, de
+    modo que el resultado queda ordenado.
+    """
+    unicas, conteos = [np.empty(0, dtype=np.uint64)], [np.empty(0, dtype=np.int64)]
+    for particion in range(2 ** BITS_PARTICION_HUELLAS):
+        ruta = dir_huellas / f'huellas_{particion:02d}.bin'
+        if not ruta.exists():
+            continue
+        huellas = np.fromfile(ruta, dtype=np.uint64)
+        repeticiones = np.fromfile(dir_huellas / f'conteos_{particion:02d}.bin', dtype=np.int64)
+        unicas_particion, inversa = np.unique(huellas, return_inverse=True)
+        unicas.append(unicas_particion)
+        conteos.append(np.bincount(inversa.ravel(), weights=repeticiones,
+                                   minlength=len(unicas_particion)).astype(np.int64))
+    return np.concatenate(unicas), np.concatenate(conteos)
+
+
+def _anexar_csv(df: pd.DataFrame, ruta: Path, primero: bool, compresion: Optional[str] = None) -> None:
+    """Escribe el bloque en el CSV (con encabezado solo en el primer bloque)"""
+    df.to_csv(ruta, index=False, encoding='utf-8', mode='w' if primero else 'a', header=primero,
+              compression=compresion)
+
+
+def limpiar_por_bloques(bloques: Iterable[pd.DataFrame], columnas_texto: List[str],
+                        estrategia: str = 'eliminar',
+                        esquema: Optional[Dict[str, str]] = None,
+                        mapeo_canonico: Optional[Dict[str, Dict[str, str]]] = None,
+                        reglas: Optional[List[Dict]] = None,
+                        ruta_limpio: Optional[str] = None,
+                        dir_dataset: Optional[str] = None,
+                        ruta_cuarentena: Optional[str] = None) -> Dict:
+    """
+    Limpia un flujo de bloques crudos sin materializar la tabla completa.
+    
+    Cada bloque pasa por validación, estandarización de texto, esquema
+    compacto y creación de 'fecha' (`transformar_filas_validas`); las filas
+    limpias se anexan a los archivos de salida y solo se conservan agregados
+    parciales: serie semanal, cubo de casos, huellas semanales, huellas únicas
+    con sus repeticiones, perfil de calidad de los datos crudos y conteos por
+    regla. Al terminar los parciales se fusionan.
+    
+    Como las reglas y las transformaciones son por fila, el resultado es el
+    mismo que `limpiar_datos_fusionado` sobre la tabla completa seguido de
+    `agrupar_por_semana_epidemiologica`, `construir_cubo` y
+    `calcular_huellas_semanales`. La memoria depende del tamaño del bloque,
+    no del total de filas.
+    
+    Las huellas únicas se acumulan en disco (junto a `ruta_limpio` o
+    `dir_dataset`) y se deduplican una sola vez al final. Ese paso, y el
+    resultado, ocupan 16 bytes por registro distinto, fuera del techo de
+    memoria del bloque.
+    
+    Las columnas numéricas que el esquema no compacta conservan el tipo
+    inferido en cada bloque: en la cuarentena, por ejemplo, una semana puede
+    escribirse como '9' en un bloque y '9.0' en otro que tenga nulos.
+    
+    Args:
+        bloques: Bloques crudos con tipos compactos (ej: `ingestion.iterar_bloques`)
+        columnas_texto: Columnas de texto a estandarizar
+        estrategia: 'eliminar', 'rellenar_vacio', 'rellenar_desconocido'
+        esquema: Diccionario columna -> tipo (por defecto ESQUEMA_CASOS)
+        mapeo_canonico: Diccionario opcional columna -> {variante: canonico}
+        reglas: Reglas de validación (por defecto REGLAS_POR_DEFECTO)
+        ruta_limpio: CSV donde escribir la tabla de casos limpia ('.csv', '.csv.gz'
+            o '.csv.zst'); se escribe de forma atómica con suma de verificación
+        dir_dataset: Directorio del dataset particionado por ano y provincia
+        ruta_cuarentena: CSV donde escribir las filas rechazadas con sus motivos
+    
+    Returns:
+        Diccionario con 'serie', 'cubo', 'huellas_semanales', 'huellas_unicas',
+        'conteos_huellas', 'perfil', 'calidad', 'reporte' y 'bloques'
+    """
+    reglas = reglas_para_estrategia(reglas, estrategia)
+    
+    salidas = {}
+    for clave, ruta in [('limpio', ruta_limpio), ('cuarentena', ruta_cuarentena)]:
+        if ruta:
+            salidas[clave] = Path(ruta).with_name(Path(ruta).name + '.tmp')
+            salidas[clave].parent.mkdir(parents=True, exist_ok=True)
+    if dir_dataset:
+        salidas['dataset'] = Path(dir_dataset).with_name(Path(dir_dataset).name + '.tmp')
+        if salidas['dataset'].exists():
+            shutil.rmtree(salidas['dataset'])
+    
+    series, cubos, semanales = [], [], []
+    perfil = None
+    resumen = None
+    registros_originales = registros_finales = nulos_despues = 0
+    numero = 0
+    
+    # Las huellas únicas de cada bloque se reparten en disco, junto a las salidas
+    dir_temporal = Path(ruta_limpio or dir_dataset).parent if (ruta_limpio or dir_dataset) else None
+    if dir_temporal is not None:
+        dir_temporal.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix='huellas_', dir=dir_temporal) as dir_huellas:
+        for numero, bloque in enumerate(bloques, 1):
+            primero = numero == 1
+    
+            # Calidad y huellas sobre los datos crudos
+            huellas = calcular_huella_filas(bloque)
+            _repartir_huellas(huellas, Path(dir_huellas))
+            semanales = [_sumar_por_semana(semanales + [calcular_huellas_semanales(bloque, huellas)],
+                                           ['registros', 'huella'])]
+            perfil = fusionar_perfiles([perfil, perfilar(bloque)])
+            registros_originales += len(bloque)
+    
+            # Validación (los conteos por regla se suman entre bloques)
+            motivos = evaluar_reglas(bloque, reglas)
+            resumen_bloque = resumir_motivos(motivos, reglas)
+            if resumen is None:
+                resumen = resumen_bloque
+            else:
+                resumen[['rechazadas', 'fallas']] += resumen_bloque[['rechazadas', 'fallas']]
+            if 'cuarentena' in salidas:
+                _anexar_csv(tabla_cuarentena(bloque, motivos, reglas), salidas['cuarentena'], primero)
+    
+            # Transformación y escritura de las filas válidas
+            df_limpio = transformar_filas_validas(bloque, motivos == 0, columnas_texto, estrategia,
+                                                  esquema, mapeo_canonico)
+            registros_finales += len(df_limpio)
+            nulos_despues += int(df_limpio.isnull().sum().sum())
+            if 'limpio' in salidas:
+                _anexar_csv(df_limpio, salidas['limpio'], primero, COMPRESION_CSV.get(formato_de(ruta_limpio)))
+            if 'dataset' in salidas:
+                anexar_dataset_particionado(df_limpio, str(salidas['dataset']))
+    
+            # Agregación parcial
+            if len(df_limpio):
+                serie = df_limpio.groupby(['ano', 'semana']).size().reset_index(name='casos')
+                series = [_sumar_por_semana(series + [serie], ['casos'])]
+                cubos = [fusionar_cubos(cubos + [agregar_cubo(df_limpio)])]
+    
+            print(f"[BLOQUES] Bloque {numero:,}: {len(bloque):,} registros, {len(df_limpio):,} validos")
+    
+        unicas, conteos = _fusionar_huellas(Path(dir_huellas))
+    
+    if numero == 0:
+        raise Exception("[ERROR] No se recibieron bloques para limpiar")
+    
+    # Publicar las salidas completas
+    for clave, destino in [('limpio', ruta_limpio), ('cuarentena', ruta_cuarentena)]:
+        if clave in salidas:
+            salidas[clave].replace(destino)
+    if 'limpio' in salidas:
+        registrar_suma(Path(ruta_limpio))
+        eliminar_variantes(ruta_limpio, conservar=[formato_de(ruta_limpio)])
+    if 'dataset' in salidas:
+        if Path(dir_dataset).exists():
+            shutil.rmtree(dir_dataset)
+        salidas['dataset'].mkdir(parents=True, exist_ok=True)
+        salidas['dataset'].rename(dir_dataset)
+    
+    reportar_motivos(resumen)
+    if ruta_cuarentena:
+        print(f"[CUARENTENA] {int(resumen['rechazadas'].sum()):,} registros rechazados "
+              f"guardados en: {ruta_cuarentena}")
+    
+    df_semanales = semanales[0]
+    df_semanales['huella'] = df_semanales['huella'].astype('uint64')
+    
+    calidad = resumir_calidad(registros_originales, registros_originales - len(unicas),
+                              nulos_por_columna(perfil))
+    reporte = formatear_reporte_limpieza(registros_originales, registros_finales,
+                                         total_nulos(perfil), nulos_despues)
+    
+    print(f"[BLOQUES] {numero:,} bloques procesados: {registros_originales:,} registros, "
+          f"{registros_finales:,} limpios")
+    
+    return {
+        'serie': series[0] if series else pd.DataFrame(columns=['ano', 'semana', 'casos']),
+        'cubo': cubos[0] if cubos else None,
+        'huellas_semanales': df_semanales,
+        'huellas_unicas': pd.Series(unicas, name='huella'),
+        'conteos_huellas': conteos,
+        'perfil': perfil,
+        'calidad': calidad,
+        'reporte': reporte,
+        'bloques': numero
+    }
@@ -0,0 +1,160 @@
+"""
+Módulo de huellas de registros (hash de 64 bits por fila)
+Sistema de Análisis de Dengue en Perú
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def calcular_huella_filas(df: pd.DataFrame) -> pd.Series:
+    """
+    Calcula un hash de 64 bits por fila, estable frente a cambios de tipo.
+    
+    Las columnas numéricas se normalizan a float64 y las columnas se recorren
+    en orden alfabético, de modo que el mismo contenido produce el mismo hash
+    aunque el DataFrame se haya cargado con tipos compactos o no. Al no
+    depender del índice ni del orden de las columnas, la huella sirve para
+    comparar registros entre versiones del dataset.
+    
+    Args:
+        df: DataFrame de registros
+    
+    Returns:
+        Serie uint64 'huella' con el mismo índice que `df`
+    """
+    columnas = sorted(df.columns)
+    normalizado = pd.DataFrame({
+        col: df[col].astype('float64') if pd.api.types.is_numeric_dtype(df[col]) else df[col]
+        for col in columnas
+    }, index=df.index)
+    return pd.util.hash_pandas_object(normalizado, index=False).rename('huella')
+
+
+def mascara_duplicados(huellas: pd.Series, huellas_previas: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Marca los registros duplicados a partir de sus huellas.
+    
+    Un registro es duplicado si su huella ya apareció antes en `huellas`
+    (se conserva la primera aparición, como `df.duplicated()`) o si está en
+    las huellas de una versión anterior.
+    
+    Args:
+        huellas: Huellas de `calcular_huella_filas`
+        huellas_previas: Huellas guardadas de una versión anterior (opcional)
+    
+    Returns:
+        Arreglo booleano con una posición por registro
+    """
+    duplicados = huellas.duplicated().to_numpy()
+    if huellas_previas is not None:
+        duplicados |= np.isin(huellas.to_numpy(), huellas_previas)
+    return duplicados
+
+
+def contar_duplicados(huellas: pd.Series) -> int:
+    """
+    Cuenta los registros duplicados (equivale a `df.duplicated().sum()`).
+    
+    Args:
+        huellas: Huellas de `calcular_huella_filas`
+    
+    Returns:
+        Número de registros duplicados
+    """
+    return int(huellas.duplicated().sum())
+
+
+def eliminar_duplicados(df: pd.DataFrame, huellas: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    Elimina los registros duplicados conservando la primera aparición.
+    
+    Args:
+        df: DataFrame de registros
+        huellas: Huellas ya calculadas de `df` (se calculan si es None)
+    
+    Returns:
+        DataFrame sin duplicados
+    """
+    if huellas is None:
+        huellas = calcular_huella_filas(df)
+    
+    df_unico = df[~mascara_duplicados(huellas)]
+    print(f"[HUELLAS] Eliminados {len(df) - len(df_unico):,} registros duplicados")
+    
+    return df_unico
+
+
+def comparar_versiones(huellas_actuales: pd.Series, huellas_previas: np.ndarray,
+                       conteos: Optional[np.ndarray] = None) -> Dict:
+    """
+    Compara los registros de dos versiones del dataset por sus huellas.
+    
+    La comparación es por contenido: un registro modificado cuenta como nuevo
+    en la versión actual y como ausente respecto a la anterior.
+    
+    Args:
+        huellas_actuales: Huellas de la versión actual
+        huellas_previas: Huellas de la versión anterior (ver `cargar_huellas`)
+        conteos: Repeticiones de cada huella actual, cuando `huellas_actuales`
+            son huellas únicas (ver `fuera_de_memoria`); la máscara es entonces
+            por huella y los conteos por registro
+    
+    Returns:
+        Diccionario con la máscara de registros nuevos y los conteos
+    """
+    actuales = np.unique(huellas_actuales.to_numpy())
+    nuevos = ~np.isin(huellas_actuales.to_numpy(), huellas_previas)
+    conteos = np.ones(len(nuevos), dtype=np.int64) if conteos is None else np.asarray(conteos)
+    
+    comparacion = {
+        'mascara_nuevos': nuevos,
+        'registros_nuevos': int(conteos[nuevos].sum()),
+        'registros_conservados': int(conteos[~nuevos].sum()),
+        'registros_ausentes': int((~np.isin(huellas_previas, actuales)).sum())
+    }
+    
+    print(f"[HUELLAS] Registros nuevos o modificados: {comparacion['registros_nuevos']:,}, "
+          f"sin cambios: {comparacion['registros_conservados']:,}, "
+          f"ausentes respecto a la version anterior: {comparacion['registros_ausentes']:,}")
+    
+    return comparacion
+
+
+def guardar_huellas(huellas: pd.Series, ruta_archivo: str) -> None:
+    """
+    Guarda las huellas únicas (ordenadas) de una versión en formato .npy.
+    
+    Args:
+        huellas: Huellas de `calcular_huella_filas`
+        ruta_archivo: Ruta del archivo .npy
+    """
+    ruta = Path(ruta_archivo)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    
+    unicas = np.unique(huellas.to_numpy().astype(np.uint64))
+    ruta_tmp = ruta.with_name(ruta.name + '.tmp')
+    with open(ruta_tmp, 'wb') as f:
+        np.save(f, unicas)
+    ruta_tmp.replace(ruta)
+    
+    print(f"[HUELLAS] {len(unicas):,} huellas guardadas en: {ruta_archivo}")
+
+
+def cargar_huellas(ruta_archivo: str) -> Optional[np.ndarray]:
+    """
+    Carga las huellas guardadas de una versión anterior.
+    
+    El archivo se abre en modo memoria mapeada, sin leerlo completo.
+    
+    Args:
+        ruta_archivo: Ruta del archivo .npy
+    
+    Returns:
+        Arreglo uint64 ordenado, o None si no existe
+    """
+    if not Path(ruta_archivo).exists():
+        return None
+    return np.load(ruta_archivo, mmap_mode='r')
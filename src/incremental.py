@@ -0,0 +1,149 @@
+"""
+Módulo de ingesta incremental por semana epidemiológica
+Sistema de Análisis de Dengue en Perú
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Optional
+
+from huellas import calcular_huella_filas
+
+
+def calcular_huellas_semanales(df: pd.DataFrame, huellas: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    Calcula una huella por rebanada (ano, semana) de los datos crudos.
+    
+    La huella es la suma (módulo 2^64) de los hashes de las filas de la
+    rebanada, por lo que no depende del orden de las filas y cambia si se
+    agrega, elimina o modifica cualquier registro de esa semana.
+    
+    Args:
+        df: DataFrame crudo con columnas 'ano' y 'semana'
+        huellas: Huellas por fila ya calculadas (`calcular_huella_filas`)
+    
+    Returns:
+        DataFrame con columnas 'ano', 'semana', 'registros' y 'huella'
+    """
+    hashes = calcular_huella_filas(df) if huellas is None else huellas
+    agrupado = hashes.groupby([df['ano'], df['semana']], sort=True)
+    
+    huellas = pd.DataFrame({
+        'registros': agrupado.size(),
+        'huella': agrupado.sum().astype('uint64')
+    }).reset_index()
+    
+    return huellas
+
+
+def cargar_estado_semanas(ruta_estado: str) -> Optional[pd.DataFrame]:
+    """
+    Carga las huellas semanales registradas en la última ejecución.
+    
+    Args:
+        ruta_estado: Ruta del archivo de estado
+    
+    Returns:
+        DataFrame de huellas, o None si no existe estado previo
+    """
+    if not Path(ruta_estado).exists():
+        return None
+    return pd.read_csv(ruta_estado, dtype={'huella': 'uint64'})
+
+
+def guardar_estado_semanas(huellas: pd.DataFrame, ruta_estado: str) -> None:
+    """
+    Guarda las huellas semanales para la siguiente ejecución incremental.
+    
+    Args:
+        huellas: DataFrame de `calcular_huellas_semanales`
+        ruta_estado: Ruta del archivo de estado
+    """
+    Path(ruta_estado).parent.mkdir(parents=True, exist_ok=True)
+    huellas.to_csv(ruta_estado, index=False, encoding='utf-8')
+    print(f"[INCREMENTAL] Estado de {len(huellas):,} semanas guardado en: {ruta_estado}")
+
+
+def detectar_semanas_modificadas(huellas_actuales: pd.DataFrame,
+                                 huellas_previas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compara las huellas actuales con las de la última ejecución.
+    
+    Args:
+        huellas_actuales: Huellas del archivo crudo actual
+        huellas_previas: Huellas registradas en la ejecución anterior
+    
+    Returns:
+        DataFrame con 'ano', 'semana' y 'cambio' ('nueva', 'modificada' o 'eliminada')
+    """
+    comparacion = huellas_actuales.merge(
+        huellas_previas, on=['ano', 'semana'], how='outer',
+        suffixes=('', '_previa'), indicator=True
+    )
+    
+    cambio = np.select(
+        [comparacion['_merge'] == 'left_only',
+         comparacion['_merge'] == 'right_only',
+         (comparacion['huella'] != comparacion['huella_previa'])
+         | (comparacion['registros'] != comparacion['registros_previa'])],
+        ['nueva', 'eliminada', 'modificada'],
+        default=''
+    )
+    
+    modificadas = comparacion.loc[cambio != '', ['ano', 'semana']].copy()
+    modificadas['cambio'] = cambio[cambio != '']
+    modificadas = modificadas.sort_values(['ano', 'semana']).reset_index(drop=True)
+    
+    resumen = modificadas['cambio'].value_counts()
+    print(f"[INCREMENTAL] Semanas nuevas: {resumen.get('nueva', 0):,}, "
+          f"modificadas: {resumen.get('modificada', 0):,}, "
+          f"eliminadas: {resumen.get('eliminada', 0):,}")
+    
+    return modificadas
+
+
+def mascara_semanas(df: pd.DataFrame, semanas: pd.DataFrame) -> np.ndarray:
+    """
+    Indica qué filas pertenecen a alguna de las semanas indicadas.
+    
+    Args:
+        df: DataFrame con columnas 'ano' y 'semana'
+        semanas: DataFrame con columnas 'ano' y 'semana'
+    
+    Returns:
+        Arreglo booleano con una posición por fila de `df`
+    """
+    # float64 admite los nulos que pueda tener el dato crudo (nunca coinciden)
+    claves = pd.MultiIndex.from_arrays([semanas['ano'].astype('float64'), semanas['semana'].astype('float64')])
+    filas = pd.MultiIndex.from_arrays([df['ano'].astype('float64'), df['semana'].astype('float64')])
+    return filas.isin(claves)
+
+
+def actualizar_serie_temporal(df_serie: pd.DataFrame, df_limpio_semanas: pd.DataFrame,
+                              semanas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Actualiza la serie (ano, semana, casos) solo en las semanas modificadas.
+    
+    Las filas de la serie de esas semanas se reemplazan por el conteo de los
+    registros limpios nuevos; el resto de la serie no se recalcula.
+    
+    Args:
+        df_serie: Serie temporal existente
+        df_limpio_semanas: Registros limpios de las semanas modificadas
+        semanas: Semanas modificadas ('ano', 'semana')
+    
+    Returns:
+        Serie temporal actualizada y ordenada
+    """
+    conservadas = df_serie[~mascara_semanas(df_serie, semanas)]
+    
+    nuevas = df_limpio_semanas.groupby(['ano', 'semana']).size().reset_index(name='casos')
+    
+    df_actualizada = pd.concat([conservadas, nuevas.astype(conservadas.dtypes.to_dict())])
+    df_actualizada = df_actualizada.sort_values(['ano', 'semana']).reset_index(drop=True)
+    
+    print(f"[INCREMENTAL] Serie temporal: {len(nuevas):,} semanas recalculadas, "
+          f"{len(conservadas):,} conservadas")
+    
+    return df_actualizada
@@ -5,23 +5,131 @@ Sistema de Análisis de Dengue en Perú
 
 import pandas as pd
 import numpy as np
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List, Iterable, Iterator, Optional, Sequence
+import shutil
 from pathlib import Path
 
+from archivos_crudos import abrir_texto
+from cache_datos import cargar_con_cache
+from esquema import aplicar_esquema, concatenar_compacto, leer_csv_compacto
+from motores import MOTOR_POR_DEFECTO, leer_csv_polars, validar_motor
+from perfil_calidad import nulos_por_columna, perfilar, resumir_perfil
+from persistencia import cargar_tabla, guardar_tabla
 
-def cargar_datos_dengue(ruta_archivo: str, sep: str = ';') -> pd.DataFrame:
+
+# Filas por bloque cuando se necesita aplicar filtros sin cargar el CSV completo
+TAMANO_CHUNK_POR_DEFECTO = 500_000
+
+
+def cargar_datos_dengue(ruta_archivo: str, sep: str = ';', chunksize: Optional[int] = None,
+                        departamento: Optional[str] = None, anos: Optional[Iterable[int]] = None,
+                        provincias: Optional[Iterable[str]] = None, usar_cache: bool = False,
+                        columnas: Optional[List[str]] = None,
+                        dir_cache: Optional[str] = None, compacto: bool = False,
+                        motor: str = MOTOR_POR_DEFECTO) -> pd.DataFrame:
     """
     Carga el dataset de dengue desde un archivo CSV.
     
+    Si se indica `chunksize`, el archivo se lee por bloques y los filtros
+    (departamento, años, provincias) se aplican a cada bloque conforme se lee,
+    de modo que la memoria pico depende del tamaño del bloque y del subconjunto
+    seleccionado, no del archivo nacional completo. El registro por bloque queda
+    en `df.attrs['registro_chunks']`.
+    
+    Con `usar_cache=True` el CSV se convierte una sola vez a Parquet (clave: hash
+    del contenido) y las cargas siguientes leen el archivo columnar, con
+    proyección de columnas y los mismos filtros aplicados en la lectura. La
+    caché se construye por bloques de `chunksize` filas, sin cargar el CSV
+    completo. Si pyarrow no está disponible se usa la lectura CSV.
+    
+    Con `compacto=True` se aplica el esquema de tipos compactos (`esquema.ESQUEMA_CASOS`);
+    en modo por bloques se compacta cada bloque conforme se lee.
+    
+    `ruta_archivo` puede ser un CSV o un archivo .zip, .gz o .zst que lo
+    contenga: se descomprime al vuelo mientras se lee. La codificación
+    (UTF-8 o latin-1) se detecta sobre el primer bloque (ver `archivos_crudos`).
+    
+    Con `motor='polars'` el CSV se escanea con un LazyFrame de Polars y los
+    filtros y la proyección de columnas se aplican durante el escaneo (ver
+    `motores.leer_csv_polars`); `chunksize` y `usar_cache` no se usan (se avisa
+    si se indican).
+    
     Args:
-        ruta_archivo: Ruta al archivo CSV
+        ruta_archivo: Ruta al archivo CSV (o .zip, .gz, .zst)
         sep: Separador del CSV (por defecto ';')
+        chunksize: Número de filas por bloque (None lee el archivo completo)
+        departamento: Departamento a conservar (ej: 'LORETO'), en modo por bloques o caché
+        anos: Años a conservar, en modo por bloques o caché
+        provincias: Provincias a conservar, en modo por bloques o caché
+        usar_cache: Si True, lee desde la caché Parquet
+        columnas: Columnas a cargar (solo con caché)
+        dir_cache: Directorio de la caché (por defecto `.cache` junto al CSV)
+        compacto: Si True, aplica el esquema de tipos compactos
+        motor: 'pandas' o 'polars' (ver `motores`)
     
     Returns:
         DataFrame con los datos cargados
     """
+    if validar_motor(motor) == 'polars':
+        if usar_cache or chunksize is not None:
+            print(f"[AVISO] El motor polars no usa la cache ni la lectura por bloques, "
+                  f"se ignoran usar_cache y chunksize")
+        try:
+            df = leer_csv_polars(ruta_archivo, sep=sep, departamento=departamento, anos=anos,
+                                 provincias=provincias, columnas=columnas)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"[ERROR] No se encontro el archivo: {ruta_archivo}")
+        except Exception as e:
+            raise Exception(f"[ERROR] Error al cargar los datos: {str(e)}")
+        if compacto:
+            df = aplicar_esquema(df)
+        print(f"[OK] Datos cargados exitosamente (motor polars)")
+        print(f"Total de registros: {len(df):,}")
+        print(f"Total de columnas: {len(df.columns)}")
+        return df
+    
+    if usar_cache:
+        filtros = []
+        if departamento is not None:
+            filtros.append(('departamento', '==', departamento.upper()))
+        if anos is not None:
+            filtros.append(('ano', 'in', list(anos)))
+        if provincias is not None:
+            filtros.append(('provincia', 'in', list(provincias)))
+        
+        try:
+            df = cargar_con_cache(ruta_archivo, sep=sep, columnas=columnas,
+                                  filtros=filtros or None, dir_cache=dir_cache,
+                                  chunksize=chunksize or TAMANO_CHUNK_POR_DEFECTO)
+            if compacto:
+                df = aplicar_esquema(df)
+            print(f"[OK] Datos cargados exitosamente (cache Parquet)")
+            print(f"Total de registros: {len(df):,}")
+            print(f"Total de columnas: {len(df.columns)}")
+            return df
+        except ImportError:
+            print(f"[AVISO] pyarrow no disponible, se lee el CSV sin cache")
+            if filtros and chunksize is None:
+                chunksize = TAMANO_CHUNK_POR_DEFECTO
+    
+    if chunksize is not None:
+        df, registro = leer_datos_por_chunks(
+            ruta_archivo, sep=sep, chunksize=chunksize, departamento=departamento,
+            anos=anos, provincias=provincias, compacto=compacto
+        )
+        df.attrs['registro_chunks'] = registro
+        print(f"[OK] Datos cargados exitosamente (lectura por bloques)")
+        print(f"Bloques leidos: {len(registro):,}")
+        print(f"Registros leidos: {sum(r['filas_leidas'] for r in registro):,}")
+        print(f"Total de registros: {len(df):,}")
+        print(f"Total de columnas: {len(df.columns)}")
+        return df
+    
     try:
-        df = pd.read_csv(ruta_archivo, sep=sep, encoding='utf-8', low_memory=False)
+        with abrir_texto(ruta_archivo) as texto:
+            df = pd.read_csv(texto, sep=sep, low_memory=False)
+        if compacto:
+            df = aplicar_esquema(df)
         print(f"[OK] Datos cargados exitosamente")
         print(f"Total de registros: {len(df):,}")
         print(f"Total de columnas: {len(df.columns)}")
@@ -32,23 +140,135 @@ def cargar_datos_dengue(ruta_archivo: str, sep: str = ';') -> pd.DataFrame:
         raise Exception(f"[ERROR] Error al cargar los datos: {str(e)}")
 
 
-def validar_integridad(df: pd.DataFrame) -> Dict:
+def iterar_bloques(ruta_archivo: str, sep: str = ';', chunksize: int = TAMANO_CHUNK_POR_DEFECTO,
+                   departamento: Optional[str] = None, anos: Optional[Iterable[int]] = None,
+                   provincias: Optional[Iterable[str]] = None,
+                   compacto: bool = False) -> Iterator[Tuple[pd.DataFrame, int]]:
+    """
+    Recorre el CSV por bloques y entrega cada bloque ya filtrado.
+    
+    Los bloques conservan la numeración global de filas en su índice. Un
+    bloque sin coincidencias se entrega vacío (con las columnas del archivo).
+    Los archivos comprimidos se descomprimen conforme avanza la lectura.
+    
+    Args:
+        ruta_archivo: Ruta al archivo CSV (o .zip, .gz, .zst)
+        sep: Separador del CSV
+        chunksize: Número de filas por bloque
+        departamento: Departamento a conservar (se compara en mayúsculas)
+        anos: Años a conservar
+        provincias: Provincias a conservar
+        compacto: Si True, aplica el esquema de tipos compactos a cada bloque
+    
+    Yields:
+        Tupla (bloque filtrado, filas leídas del archivo en ese bloque)
+    """
+    departamento = departamento.upper() if departamento else None
+    anos = list(anos) if anos is not None else None
+    provincias = list(provincias) if provincias is not None else None
+    
+    with abrir_texto(ruta_archivo) as texto, pd.read_csv(texto, sep=sep, chunksize=chunksize) as lector:
+        for chunk in lector:
+            mascara = np.ones(len(chunk), dtype=bool)
+            if departamento is not None:
+                mascara &= (chunk['departamento'] == departamento).to_numpy()
+            if anos is not None:
+                mascara &= chunk['ano'].isin(anos).to_numpy()
+            if provincias is not None:
+                mascara &= chunk['provincia'].isin(provincias).to_numpy()
+            
+            parte = chunk if mascara.all() else chunk[mascara]
+            yield (aplicar_esquema(parte) if compacto else parte), len(chunk)
+
+
+def leer_datos_por_chunks(ruta_archivo: str, sep: str = ';', chunksize: int = TAMANO_CHUNK_POR_DEFECTO,
+                          departamento: Optional[str] = None, anos: Optional[Iterable[int]] = None,
+                          provincias: Optional[Iterable[str]] = None,
+                          compacto: bool = False) -> Tuple[pd.DataFrame, List[Dict]]:
+    """
+    Lee el CSV por bloques aplicando los filtros a cada bloque (filter pushdown).
+    
+    El resultado es el mismo DataFrame que `cargar_datos_dengue` seguido de
+    `filtrar_por_departamento`: mismas filas, mismo orden y mismas etiquetas
+    de índice, ya que los bloques conservan la numeración global de filas.
+    
+    Args:
+        ruta_archivo: Ruta al archivo CSV
+        sep: Separador del CSV
+        chunksize: Número de filas por bloque
+        departamento: Departamento a conservar (se compara en mayúsculas)
+        anos: Años a conservar
+        provincias: Provincias a conservar
+        compacto: Si True, aplica el esquema de tipos compactos a cada bloque
+    
+    Returns:
+        Tupla (DataFrame filtrado, registro con filas leídas y conservadas por bloque)
+    """
+    partes = []
+    registro = []
+    vacio = None
+    
+    try:
+        bloques = iterar_bloques(ruta_archivo, sep=sep, chunksize=chunksize, departamento=departamento,
+                                 anos=anos, provincias=provincias, compacto=compacto)
+        for numero, (parte, filas_leidas) in enumerate(bloques, 1):
+            if vacio is None:
+                vacio = parte.iloc[:0]
+            if len(parte):
+                partes.append(parte)
+            
+            registro.append({
+                'chunk': numero,
+                'filas_leidas': filas_leidas,
+                'filas_conservadas': len(parte)
+            })
+    except FileNotFoundError:
+        raise FileNotFoundError(f"[ERROR] No se encontro el archivo: {ruta_archivo}")
+    except Exception as e:
+        raise Exception(f"[ERROR] Error al cargar los datos: {str(e)}")
+    
+    if vacio is None:
+        raise Exception(f"[ERROR] El archivo no contiene registros: {ruta_archivo}")
+    
+    # Sin coincidencias se devuelve un DataFrame vacío con las columnas del archivo
+    if not partes:
+        partes = [vacio]
+    
+    if compacto:
+        return concatenar_compacto(partes), registro
+    
+    df = pd.concat(partes) if len(partes) > 1 else partes[0].copy()
+    
+    return df, registro
+
+
+def validar_integridad(df: pd.DataFrame, perfil: Optional[Dict] = None) -> Dict:
     """
     Valida la integridad del dataset.
     
+    Las métricas por columna salen del perfil de calidad, que se calcula en
+    una sola pasada (o se recibe ya calculado, por ejemplo fusionado por
+    bloques con `perfil_calidad.fusionar_perfiles`).
+    
     Args:
         df: DataFrame a validar
+        perfil: Perfil de `perfil_calidad.perfilar` sobre `df` (opcional)
     
     Returns:
         Diccionario con métricas de validación
     """
+    if perfil is None:
+        perfil = perfilar(df)
+    nulos = nulos_por_columna(perfil)
+    
     validacion = {
         'total_registros': len(df),
         'total_columnas': len(df.columns),
         'columnas': list(df.columns),
-        'valores_nulos': df.isnull().sum().to_dict(),
-        'porcentaje_nulos': ((df.isnull().sum() / len(df)) * 100).to_dict(),
-        'tipos_datos': df.dtypes.to_dict()
+        'valores_nulos': nulos.to_dict(),
+        'porcentaje_nulos': ((nulos / len(df)) * 100).to_dict(),
+        'tipos_datos': df.dtypes.to_dict(),
+        'perfil': resumir_perfil(perfil)
     }
     
     return validacion
@@ -74,6 +294,140 @@ def filtrar_por_departamento(df: pd.DataFrame, departamento: str) -> pd.DataFram
     return df_filtrado
 
 
+def particionar_por_departamento(df: pd.DataFrame, dir_salida: str,
+                                 por_ano: bool = False) -> Dict[str, List[Path]]:
+    """
+    Escribe una partición en disco por departamento (y opcionalmente por año).
+    
+    Se recorre el DataFrame una sola vez para asignar códigos de grupo; cada
+    partición se obtiene después con `take` sobre sus posiciones, en lugar de
+    una máscara booleana sobre la tabla nacional por cada departamento. Las
+    particiones se guardan como `departamento=<DEP>[/ano=<AÑO>]/datos.csv`.
+    Las filas sin departamento no se asignan a ninguna partición.
+    
+    Args:
+        df: DataFrame nacional
+        dir_salida: Directorio base de las particiones (se reemplaza)
+        por_ano: Si True, particiona también por año
+    
+    Returns:
+        Diccionario departamento -> lista de archivos escritos
+    """
+    # Las particiones de una ejecución anterior (con o sin año) no deben mezclarse con las nuevas
+    if Path(dir_salida).exists():
+        shutil.rmtree(dir_salida)
+    
+    claves = ['departamento', 'ano'] if por_ano else ['departamento']
+    grupos = df.groupby(claves, sort=True, observed=True).indices
+    
+    particiones = {}
+    for clave, posiciones in grupos.items():
+        departamento, ano = (clave if por_ano else (clave, None))
+        ruta = Path(dir_salida) / f"departamento={departamento}"
+        if por_ano:
+            ruta = ruta / f"ano={ano}"
+        ruta = ruta / 'datos.csv'
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        
+        df.take(posiciones).to_csv(ruta, index=False, encoding='utf-8')
+        particiones.setdefault(departamento, []).append(ruta)
+    
+    print(f"[PARTICION] {len(particiones)} departamentos, {len(grupos)} particiones escritas en: {dir_salida}")
+    
+    return particiones
+
+
+def cargar_particion_departamento(dir_particiones: str, departamento: str) -> pd.DataFrame:
+    """
+    Carga la partición de un departamento escrita por `particionar_por_departamento`.
+    
+    Args:
+        dir_particiones: Directorio base de las particiones
+        departamento: Nombre del departamento
+    
+    Returns:
+        DataFrame con tipos compactos
+    """
+    dir_departamento = Path(dir_particiones) / f"departamento={departamento.upper()}"
+    archivos = sorted(dir_departamento.rglob('datos.csv'))
+    if not archivos:
+        raise FileNotFoundError(f"[ERROR] No existe la particion: {dir_departamento}")
+    
+    partes = [leer_csv_compacto(ruta) for ruta in archivos]
+    df = concatenar_compacto(partes).reset_index(drop=True)
+    
+    print(f"[PARTICION] {departamento.upper()}: {len(df):,} registros ({len(archivos)} archivos)")
+    
+    return df
+
+
+def particionar_por_departamento_por_bloques(ruta_archivo: str, dir_salida: str, sep: str = ';',
+                                             chunksize: int = TAMANO_CHUNK_POR_DEFECTO) -> Dict[str, Path]:
+    """
+    Escribe una partición por departamento leyendo el CSV nacional por bloques.
+    
+    Produce las mismas particiones que `particionar_por_departamento` (sin
+    `por_ano`), pero cada bloque se reparte y se anexa a los archivos de sus
+    departamentos, de modo que la tabla nacional nunca está completa en memoria.
+    
+    Args:
+        ruta_archivo: Ruta al CSV nacional
+        dir_salida: Directorio base de las particiones (se reemplaza)
+        sep: Separador del CSV
+        chunksize: Número de filas por bloque
+    
+    Returns:
+        Diccionario departamento -> archivo de la partición
+    """
+    dir_salida = Path(dir_salida)
+    if dir_salida.exists():
+        shutil.rmtree(dir_salida)
+    
+    particiones = {}
+    for bloque, _ in iterar_bloques(ruta_archivo, sep=sep, chunksize=chunksize):
+        grupos = bloque.groupby('departamento', sort=True).indices
+        for departamento, posiciones in grupos.items():
+            ruta = dir_salida / f"departamento={departamento}" / 'datos.csv'
+            nueva = departamento not in particiones
+            if nueva:
+                ruta.parent.mkdir(parents=True, exist_ok=True)
+                particiones[departamento] = ruta
+            bloque.take(posiciones).to_csv(ruta, index=False, encoding='utf-8',
+                                           mode='w' if nueva else 'a', header=nueva)
+    
+    particiones = dict(sorted(particiones.items()))
+    print(f"[PARTICION] {len(particiones)} departamentos escritos por bloques en: {dir_salida}")
+    
+    return particiones
+
+
+def iterar_particion_departamento(dir_particiones: str, departamento: str,
+                                  chunksize: int = TAMANO_CHUNK_POR_DEFECTO) -> Iterator[pd.DataFrame]:
+    """
+    Recorre por bloques la partición de un departamento, con tipos compactos.
+    
+    Args:
+        dir_particiones: Directorio base de las particiones
+        departamento: Nombre del departamento
+        chunksize: Número de filas por bloque
+    
+    Yields:
+        Bloques de la partición, con la numeración de filas de la partición
+    """
+    dir_departamento = Path(dir_particiones) / f"departamento={departamento.upper()}"
+    archivos = sorted(dir_departamento.rglob('datos.csv'))
+    if not archivos:
+        raise FileNotFoundError(f"[ERROR] No existe la particion: {dir_departamento}")
+    
+    filas = 0
+    for ruta in archivos:
+        with pd.read_csv(ruta, encoding='utf-8', chunksize=chunksize) as lector:
+            for bloque in lector:
+                bloque.index = pd.RangeIndex(filas, filas + len(bloque))
+                filas += len(bloque)
+                yield aplicar_esquema(bloque)
+
+
 def obtener_resumen_temporal(df: pd.DataFrame) -> pd.Series:
     """
     Obtiene un resumen de la distribución temporal de casos.
@@ -107,22 +461,218 @@ def obtener_resumen_geografico(df: pd.DataFrame, nivel: str = 'provincia') -> pd
     return df[nivel].value_counts()
 
 
-def guardar_datos_procesados(df: pd.DataFrame, ruta_salida: str) -> None:
+def guardar_datos_procesados(df: pd.DataFrame, ruta_salida: str,
+                             formatos: Sequence[str] = ('csv',)) -> List[Path]:
     """
-    Guarda el DataFrame procesado en un archivo CSV.
+    Guarda el DataFrame procesado en uno o varios formatos.
+    
+    Cada archivo se escribe en un temporal que se renombra al terminar, de
+    modo que una interrupción no deja un archivo truncado, y se acompaña de
+    una suma de verificación `<archivo>.blake2b`. Formatos: 'csv', 'csv.gz',
+    'csv.zst' y 'parquet' (zstd con codificación por diccionario); ver
+    `persistencia`.
     
     Args:
         df: DataFrame a guardar
-        ruta_salida: Ruta del archivo de salida
+        ruta_salida: Ruta del archivo de salida (la extensión se ajusta a cada formato)
+        formatos: Formatos a escribir
+    
+    Returns:
+        Rutas de los archivos escritos
     """
     try:
-        # Crear directorio si no existe
-        Path(ruta_salida).parent.mkdir(parents=True, exist_ok=True)
-        
-        df.to_csv(ruta_salida, index=False, encoding='utf-8')
-        print(f"[OK] Datos guardados en: {ruta_salida}")
+        rutas = guardar_tabla(df, ruta_salida, formatos)
     except Exception as e:
         raise Exception(f"[ERROR] Error al guardar los datos: {str(e)}")
+    
+    for ruta in rutas:
+        print(f"[OK] Datos guardados en: {ruta}")
+    
+    return rutas
+
+
+def cargar_datos_procesados(ruta_archivo: str, compacto: bool = True) -> pd.DataFrame:
+    """
+    Carga una tabla escrita por `guardar_datos_procesados`.
+    
+    Se elige automáticamente el formato más rápido disponible (Parquet, luego
+    CSV comprimido, luego CSV) cuya suma de verificación sea válida.
+    
+    Args:
+        ruta_archivo: Ruta de la tabla (cualquiera de sus formatos)
+        compacto: Si True, aplica el esquema de tipos compactos
+    
+    Returns:
+        DataFrame con la tabla
+    """
+    return cargar_tabla(ruta_archivo, compacto=compacto)
+
+
+def guardar_dataset_particionado(df: pd.DataFrame, dir_base: str,
+                                 columnas_particion: Tuple[str, ...] = ('ano', 'provincia')) -> int:
+    """
+    Guarda el DataFrame procesado como dataset particionado estilo Hive.
+    
+    Cada combinación de valores de las columnas de partición se escribe en
+    `<dir_base>/ano=<AÑO>/provincia=<PROVINCIA>/datos.csv`. El dataset se
+    escribe en un directorio temporal y reemplaza al anterior al terminar.
+    
+    Args:
+        df: DataFrame a guardar
+        dir_base: Directorio raíz del dataset
+        columnas_particion: Columnas usadas como niveles de partición
+    
+    Returns:
+        Número de particiones escritas
+    """
+    dir_base = Path(dir_base)
+    dir_tmp = dir_base.with_name(dir_base.name + '.tmp')
+    if dir_tmp.exists():
+        shutil.rmtree(dir_tmp)
+    
+    try:
+        grupos = df.groupby(list(columnas_particion), sort=True, observed=True).indices
+        for clave, posiciones in grupos.items():
+            clave = clave if isinstance(clave, tuple) else (clave,)
+            ruta = dir_tmp.joinpath(*[f"{col}={valor}" for col, valor in zip(columnas_particion, clave)])
+            ruta.mkdir(parents=True, exist_ok=True)
+            df.take(posiciones).to_csv(ruta / 'datos.csv', index=False, encoding='utf-8')
+        
+        if dir_base.exists():
+            shutil.rmtree(dir_base)
+        dir_tmp.rename(dir_base)
+    except Exception as e:
+        raise Exception(f"[ERROR] Error al guardar el dataset particionado: {str(e)}")
+    
+    print(f"[OK] Dataset particionado guardado en: {dir_base} ({len(grupos)} particiones)")
+    
+    return len(grupos)
+
+
+def anexar_dataset_particionado(df: pd.DataFrame, dir_base: str,
+                                columnas_particion: Tuple[str, ...] = ('ano', 'provincia')) -> int:
+    """
+    Anexa las filas del DataFrame a las particiones de un dataset estilo Hive.
+    
+    Permite escribir el dataset por bloques: las particiones que aún no
+    existen se crean con encabezado y las demás reciben las filas al final,
+    en el orden de llegada.
+    
+    Args:
+        df: Bloque de filas a anexar
+        dir_base: Directorio raíz del dataset
+        columnas_particion: Columnas usadas como niveles de partición
+    
+    Returns:
+        Número de particiones modificadas
+    """
+    dir_base = Path(dir_base)
+    grupos = df.groupby(list(columnas_particion), sort=True, observed=True).indices
+    
+    for clave, posiciones in grupos.items():
+        clave = clave if isinstance(clave, tuple) else (clave,)
+        ruta = dir_base.joinpath(*[f"{col}={valor}" for col, valor in zip(columnas_particion, clave)])
+        ruta.mkdir(parents=True, exist_ok=True)
+        archivo = ruta / 'datos.csv'
+        nuevo = not archivo.exists()
+        df.take(posiciones).to_csv(archivo, index=False, encoding='utf-8',
+                                   mode='w' if nuevo else 'a', header=nuevo)
+    
+    return len(grupos)
+
+
+def actualizar_dataset_particionado(df: pd.DataFrame, dir_base: str, anos: Iterable[int],
+                                    columnas_particion: Tuple[str, ...] = ('ano', 'provincia')) -> int:
+    """
+    Reemplaza en el dataset particionado solo las particiones de los años indicados.
+    
+    Args:
+        df: DataFrame con el contenido completo de esos años
+        dir_base: Directorio raíz del dataset
+        anos: Años cuyas particiones se reescriben
+        columnas_particion: Columnas usadas como niveles de partición (la primera debe ser 'ano')
+    
+    Returns:
+        Número de particiones escritas
+    """
+    dir_base = Path(dir_base)
+    escritas = 0
+    
+    try:
+        for ano in sorted(set(int(a) for a in anos)):
+            dir_ano = dir_base / f"ano={ano}"
+            if dir_ano.exists():
+                shutil.rmtree(dir_ano)
+            
+            df_ano = df[df['ano'] == ano]
+            grupos = df_ano.groupby(list(columnas_particion), sort=True, observed=True).indices
+            for clave, posiciones in grupos.items():
+                ruta = dir_base.joinpath(*[f"{col}={valor}" for col, valor in zip(columnas_particion, clave)])
+                ruta.mkdir(parents=True, exist_ok=True)
+                df_ano.take(posiciones).to_csv(ruta / 'datos.csv', index=False, encoding='utf-8')
+                escritas += 1
+    except Exception as e:
+        raise Exception(f"[ERROR] Error al actualizar el dataset particionado: {str(e)}")
+    
+    print(f"[OK] Dataset particionado actualizado en: {dir_base} ({escritas} particiones reescritas)")
+    
+    return escritas
+
+
+def listar_particiones(dir_base: str) -> pd.DataFrame:
+    """
+    Lista las particiones de un dataset estilo Hive a partir de sus directorios.
+    
+    Args:
+        dir_base: Directorio raíz del dataset
+    
+    Returns:
+        DataFrame con una fila por partición: valores de partición y 'ruta'
+    """
+    filas = []
+    for archivo in sorted(Path(dir_base).rglob('datos.csv')):
+        fila = {}
+        for parte in archivo.relative_to(dir_base).parent.parts:
+            columna, _, valor = parte.partition('=')
+            fila[columna] = int(valor) if valor.lstrip('-').isdigit() else valor
+        fila['ruta'] = archivo
+        filas.append(fila)
+    
+    return pd.DataFrame(filas)
+
+
+def leer_dataset_particionado(dir_base: str, anos: Optional[Iterable[int]] = None,
+                              provincias: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Lee un dataset particionado abriendo solo las particiones que cumplen los
+    predicados (poda de particiones).
+    
+    Args:
+        dir_base: Directorio raíz del dataset
+        anos: Años a leer (None lee todos)
+        provincias: Provincias a leer (None lee todas)
+    
+    Returns:
+        DataFrame con tipos compactos
+    """
+    particiones = listar_particiones(dir_base)
+    if particiones.empty:
+        raise FileNotFoundError(f"[ERROR] No se encontraron particiones en: {dir_base}")
+    
+    seleccion = np.ones(len(particiones), dtype=bool)
+    if anos is not None:
+        seleccion &= particiones['ano'].isin(list(anos)).to_numpy()
+    if provincias is not None:
+        seleccion &= particiones['provincia'].isin(list(provincias)).to_numpy()
+    rutas = particiones.loc[seleccion, 'ruta']
+    
+    if rutas.empty:
+        # Ninguna partición coincide: DataFrame vacío con las columnas del dataset
+        return leer_csv_compacto(particiones['ruta'].iloc[0], nrows=0)
+    
+    df = concatenar_compacto([leer_csv_compacto(ruta) for ruta in rutas])
+    
+    return df.reset_index(drop=True)
 
 
 def generar_reporte_validacion(validacion: Dict) -> str:
@@ -155,6 +705,13 @@ def generar_reporte_validacion(validacion: Dict) -> str:
     else:
         reporte.append("  [OK] No se encontraron valores nulos")
     
+    if 'perfil' in validacion:
+        reporte.append("\nPerfil de columnas:")
+        for col, fila in validacion['perfil'].iterrows():
+            distintos = f"{fila['distintos']:,}" + ('' if fila['distintos_exacto'] else ' (aprox.)')
+            rango = f", rango {fila['minimo']:g} - {fila['maximo']:g}" if pd.notna(fila['minimo']) else ''
+            reporte.append(f"  - {col}: {distintos} valores distintos{rango}")
+    
     reporte.append("\n" + "=" * 60)
     
     return "\n".join(reporte)
@@ -10,34 +10,44 @@ from statsmodels.tsa.statespace.sarimax import SARIMAX
 from statsmodels.tsa.stattools import adfuller, acf, pacf
 from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 import warnings
 warnings.filterwarnings('ignore')
 
+from almacen_series import NombreGeografia, serie_pandas
+from calendario_epi import fecha_inicio_semana
+from perfiles_graficos import PERFIL_POR_DEFECTO, ajustar_diseno, guardar_figura
 
-def preparar_serie_temporal(df_serie: pd.DataFrame) -> pd.Series:
+
+def preparar_serie_temporal(df_serie: Optional[pd.DataFrame] = None, almacen: Optional[Dict] = None,
+                            nivel: str = 'region', nombre: NombreGeografia = None) -> pd.Series:
     """
     Prepara la serie temporal para modelado SARIMA.
     
+    Si se indica `almacen`, la serie se lee del almacén de series semanales
+    (semanas sin casos como 0) en lugar de `df_serie`.
+    
     Args:
         df_serie: DataFrame con columnas 'ano', 'semana', 'casos'
+        almacen: Almacén de `almacen_series.abrir_almacen_series` (opcional)
+        nivel: Con almacén, 'region', 'provincia' o 'distrito'
+        nombre: Con almacén, nombre de la provincia o tupla (provincia, distrito)
     
     Returns:
         Serie temporal indexada por fecha
     """
-    # Crear fecha
-    df_serie['fecha'] = pd.to_datetime(
-        df_serie['ano'].astype(str) + '-W' + df_serie['semana'].astype(str).str.zfill(2) + '-1',
-        format='%Y-W%W-%w',
-        errors='coerce'
-    )
-    
-    # Eliminar valores nulos
-    df_serie = df_serie.dropna(subset=['fecha'])
-    
-    # Crear serie temporal
-    serie = df_serie.set_index('fecha')['casos']
-    serie = serie.sort_index()
+    if almacen is not None:
+        serie = serie_pandas(almacen, nivel, nombre)
+    else:
+        # Crear fecha
+        df_serie['fecha'] = fecha_inicio_semana(df_serie['ano'], df_serie['semana'])
+        
+        # Eliminar valores nulos
+        df_serie = df_serie.dropna(subset=['fecha'])
+        
+        # Crear serie temporal
+        serie = df_serie.set_index('fecha')['casos']
+        serie = serie.sort_index()
     
     print(f"[PREPARACION] Serie temporal creada")
     print(f"  - Periodo: {serie.index.min()} a {serie.index.max()}")
@@ -102,7 +112,8 @@ def diferenciar_serie(serie: pd.Series, orden: int = 1, estacional: bool = False
     return serie_diff
 
 
-def graficar_acf_pacf(serie: pd.Series, lags: int = 52, guardar: bool = False, ruta: str = None):
+def graficar_acf_pacf(serie: pd.Series, lags: int = 52, guardar: bool = False, ruta: str = None,
+                      perfil: str = PERFIL_POR_DEFECTO):
     """
     Grafica ACF y PACF para identificar parámetros.
     
@@ -111,6 +122,7 @@ def graficar_acf_pacf(serie: pd.Series, lags: int = 52, guardar: bool = False, r
         lags: Número de lags a mostrar
         guardar: Si True, guarda el gráfico
         ruta: Ruta donde guardar
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
     """
     fig, axes = plt.subplots(2, 1, figsize=(14, 8))
     
@@ -124,11 +136,10 @@ def graficar_acf_pacf(serie: pd.Series, lags: int = 52, guardar: bool = False, r
     axes[1].set_title('Autocorrelación Parcial (PACF)', fontsize=14, fontweight='bold')
     axes[1].grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    ajustar_diseno(perfil)
     
     if guardar and ruta:
-        plt.savefig(ruta, dpi=300, bbox_inches='tight')
-        print(f"[GRAFICO] ACF/PACF guardado en: {ruta}")
+        guardar_figura(ruta, perfil, 'ACF/PACF')
     
     plt.close()
 
@@ -242,7 +253,8 @@ def evaluar_modelo(y_true: pd.Series, y_pred: pd.Series) -> Dict:
 
 
 def graficar_predicciones(serie_train: pd.Series, serie_test: pd.Series, 
-                          predicciones: pd.Series, guardar: bool = False, ruta: str = None):
+                          predicciones: pd.Series, guardar: bool = False, ruta: str = None,
+                          perfil: str = PERFIL_POR_DEFECTO):
     """
     Grafica los resultados del modelo.
     
@@ -252,6 +264,7 @@ def graficar_predicciones(serie_train: pd.Series, serie_test: pd.Series,
         predicciones: Predicciones del modelo
         guardar: Si True, guarda el gráfico
         ruta: Ruta donde guardar
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
     """
     fig, ax = plt.subplots(figsize=(16, 6))
     
@@ -271,16 +284,16 @@ def graficar_predicciones(serie_train: pd.Series, serie_test: pd.Series,
     ax.legend(fontsize=11)
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    ajustar_diseno(perfil)
     
     if guardar and ruta:
-        plt.savefig(ruta, dpi=300, bbox_inches='tight')
-        print(f"[GRAFICO] Predicciones guardado en: {ruta}")
+        guardar_figura(ruta, perfil, 'Predicciones')
     
     plt.close()
 
 
-def graficar_residuos(modelo: SARIMAX, guardar: bool = False, ruta: str = None):
+def graficar_residuos(modelo: SARIMAX, guardar: bool = False, ruta: str = None,
+                      perfil: str = PERFIL_POR_DEFECTO):
     """
     Grafica el análisis de residuos del modelo.
     
@@ -288,6 +301,7 @@ def graficar_residuos(modelo: SARIMAX, guardar: bool = False, ruta: str = None):
         modelo: Modelo SARIMA entrenado
         guardar: Si True, guarda el gráfico
         ruta: Ruta donde guardar
+        perfil: Perfil de renderizado ('publicacion' o 'borrador')
     """
     residuos = modelo.resid
     
@@ -318,11 +332,10 @@ def graficar_residuos(modelo: SARIMAX, guardar: bool = False, ruta: str = None):
     axes[1, 1].set_title('Q-Q Plot', fontsize=12, fontweight='bold')
     axes[1, 1].grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    ajustar_diseno(perfil)
     
     if guardar and ruta:
-        plt.savefig(ruta, dpi=300, bbox_inches='tight')
-        print(f"[GRAFICO] Residuos guardado en: {ruta}")
+        guardar_figura(ruta, perfil, 'Residuos')
     
     plt.close()
 
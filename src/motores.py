@@ -0,0 +1,133 @@
+"""
+Módulo de motores de DataFrame (pandas o Polars/Arrow) para ingesta y limpieza
+Sistema de Análisis de Dengue en Perú
+"""
+
+import pandas as pd
+from typing import Iterable, List, Optional
+
+from archivos_crudos import abrir_texto, detectar_codificacion, es_comprimido
+from esquema import ESQUEMA_CASOS
+
+
+# 'pandas' ejecuta las operaciones en modo eager; 'polars' usa LazyFrames
+# (poda de predicados y columnas en la lectura) y agrupaciones multihilo.
+# Los resultados se devuelven siempre como DataFrames de pandas.
+MOTORES = ('pandas', 'polars')
+MOTOR_POR_DEFECTO = 'pandas'
+
+
+def validar_motor(motor: str) -> str:
+    """
+    Comprueba que el motor exista y que su dependencia esté instalada.
+    
+    Si Polars no está disponible se avisa y se usa pandas.
+    
+    Args:
+        motor: 'pandas' o 'polars'
+    
+    Returns:
+        Motor a usar
+    """
+    if motor not in MOTORES:
+        raise ValueError(f"[ERROR] Motor desconocido: '{motor}' (opciones: {', '.join(MOTORES)})")
+    
+    if motor == 'polars':
+        try:
+            import polars  # noqa: F401
+        except ImportError:
+            print(f"[AVISO] polars no disponible, se usa el motor pandas")
+            return 'pandas'
+    
+    return motor
+
+
+def leer_csv_polars(ruta_archivo: str, sep: str = ';', departamento: Optional[str] = None,
+                    anos: Optional[Iterable[int]] = None, provincias: Optional[Iterable[str]] = None,
+                    columnas: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lee el CSV con un LazyFrame de Polars aplicando los filtros durante el escaneo.
+    
+    El resultado tiene las mismas filas, el mismo orden y las mismas etiquetas
+    de índice que `ingestion.leer_datos_por_chunks` con los mismos filtros.
+    Las columnas de texto del esquema se leen como texto y las numéricas como
+    float; las numéricas sin nulos y con valores enteros se devuelven como
+    int64, igual que las infiere `pandas.read_csv`, de modo que los tipos
+    coinciden con los de la lectura con pandas también sin `aplicar_esquema`.
+    
+    Args:
+        ruta_archivo: Ruta al archivo CSV
+        sep: Separador del CSV
+        departamento: Departamento a conservar (se compara en mayúsculas)
+        anos: Años a conservar
+        provincias: Provincias a conservar
+        columnas: Columnas a cargar (None carga todas)
+    
+    Returns:
+        DataFrame de pandas con los registros seleccionados
+    """
+    import polars as pl
+    
+    tipos = {col: pl.String if dtype == 'category' else pl.Float64
+             for col, dtype in ESQUEMA_CASOS.items()}
+    
+    codificacion = detectar_codificacion(ruta_archivo)
+    if es_comprimido(ruta_archivo) or codificacion != 'utf-8':
+        # scan_csv solo lee CSV UTF-8 sin comprimir: se decodifica en memoria y los
+        # filtros se aplican después de la lectura
+        print(f"[AVISO] Archivo comprimido o no UTF-8: polars lo lee completo antes de filtrar")
+        with abrir_texto(ruta_archivo, codificacion) as texto:
+            fuente = pl.read_csv(texto.read().encode('utf-8'), separator=sep, schema_overrides=tipos,
+                                 infer_schema_length=10_000).lazy()
+    else:
+        fuente = pl.scan_csv(ruta_archivo, separator=sep, encoding='utf8', schema_overrides=tipos,
+                             infer_schema_length=10_000)
+    consulta = fuente.with_row_index('__fila')
+    if departamento is not None:
+        consulta = consulta.filter(pl.col('departamento') == departamento.upper())
+    if anos is not None:
+        consulta = consulta.filter(pl.col('ano').is_in([float(ano) for ano in anos]))
+    if provincias is not None:
+        consulta = consulta.filter(pl.col('provincia').is_in(list(provincias)))
+    if columnas is not None:
+        consulta = consulta.select(['__fila'] + list(columnas))
+    
+    df = consulta.collect().to_pandas()
+    df = df.set_index('__fila')
+    df.index = df.index.astype('int64').rename(None)
+    
+    for col in df.columns:
+        if tipos.get(col) == pl.Float64 and df[col].notna().all() and (df[col] % 1 == 0).all():
+            df[col] = df[col].astype('int64')
+    
+    return df
+
+
+def agrupar_semanas_polars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cuenta los casos por (ano, semana) con la agrupación multihilo de Polars.
+    
+    Devuelve lo mismo que `df.groupby(['ano', 'semana']).size()`: las
+    semanas con claves nulas se descartan y los tipos de 'ano' y 'semana' se
+    conservan.
+    
+    Args:
+        df: DataFrame de pandas con columnas 'ano' y 'semana'
+    
+    Returns:
+        DataFrame con 'ano', 'semana' y 'casos', ordenado por semana
+    """
+    import polars as pl
+    
+    conteo = (
+        pl.from_pandas(df[['ano', 'semana']])
+        .lazy()
+        .drop_nulls()
+        .group_by(['ano', 'semana'])
+        .agg(pl.len().cast(pl.Int64).alias('casos'))
+        .sort(['ano', 'semana'])
+        .collect()
+        .to_pandas()
+    )
+    
+    return conteo.astype({'ano': df['ano'].dtype, 'semana': df['semana'].dtype})
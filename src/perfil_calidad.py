@@ -0,0 +1,166 @@
+"""
+Módulo de perfil de calidad por columna (una sola pasada, fusionable por bloques)
+Sistema de Análisis de Dengue en Perú
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Iterable, Optional
+
+
+# Valores distintos que se conservan en el histograma de una columna; por
+# encima (ej: 'ubigeo') el histograma se descarta y los distintos se estiman
+MAXIMO_VALORES_HISTOGRAMA = 5_000
+
+# Tamaño del boceto KMV (k valores mínimos de hash) para estimar distintos:
+# error relativo ~ 1/sqrt(k), exacto por debajo de k valores distintos
+TAMANO_BOCETO = 1_024
+
+
+def _hashes_valores(valores: pd.Index) -> np.ndarray:
+    """Hash de 64 bits de cada valor distinto (los números se normalizan a float64)"""
+    if pd.api.types.is_numeric_dtype(valores):
+        return pd.util.hash_array(valores.to_numpy(dtype='float64'))
+    return pd.util.hash_array(valores.astype(str).to_numpy(dtype=object))
+
+
+def _perfilar_columna(serie: pd.Series) -> Dict:
+    """Perfil de una columna a partir de un único conteo de valores"""
+    conteos = serie.value_counts(dropna=True, sort=False)
+    conteos = conteos[conteos > 0]
+    numerica = pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie)
+    
+    return {
+        'tipo': str(serie.dtype),
+        'nulos': int(len(serie) - conteos.sum()),
+        'minimo': conteos.index.min() if numerica and len(conteos) else None,
+        'maximo': conteos.index.max() if numerica and len(conteos) else None,
+        'histograma': conteos.astype(np.int64) if len(conteos) <= MAXIMO_VALORES_HISTOGRAMA else None,
+        'boceto': np.unique(_hashes_valores(conteos.index))[:TAMANO_BOCETO]
+    }
+
+
+def perfilar(df: pd.DataFrame) -> Dict:
+    """
+    Calcula el perfil de calidad del DataFrame recorriendo cada columna una vez.
+    
+    Por columna se obtienen los nulos, una estimación de valores distintos,
+    el mínimo y el máximo (columnas numéricas) y el histograma de valores,
+    todos a partir de un solo `value_counts`. Los perfiles de varios bloques
+    se combinan con `fusionar_perfiles`.
+    
+    Args:
+        df: DataFrame a perfilar
+    
+    Returns:
+        Diccionario con 'registros' y 'columnas' (columna -> perfil)
+    """
+    return {
+        'registros': len(df),
+        'columnas': {col: _perfilar_columna(df[col]) for col in df.columns}
+    }
+
+
+def _fusionar_columna(a: Dict, b: Dict) -> Dict:
+    """Combina los perfiles de una misma columna en dos bloques"""
+    extremos = {}
+    for clave, funcion in [('minimo', min), ('maximo', max)]:
+        valores = [v for v in (a[clave], b[clave]) if v is not None]
+        extremos[clave] = funcion(valores) if valores else None
+    
+    histograma = None
+    if a['histograma'] is not None and b['histograma'] is not None:
+        histograma = pd.concat([a['histograma'], b['histograma']]).groupby(level=0, sort=False).sum()
+        if len(histograma) > MAXIMO_VALORES_HISTOGRAMA:
+            histograma = None
+    
+    return {
+        'tipo': a['tipo'],
+        'nulos': a['nulos'] + b['nulos'],
+        **extremos,
+        'histograma': histograma,
+        'boceto': np.union1d(a['boceto'], b['boceto'])[:TAMANO_BOCETO]
+    }
+
+
+def fusionar_perfiles(perfiles: Iterable[Optional[Dict]]) -> Dict:
+    """
+    Combina perfiles de bloques de la misma tabla en el perfil de la tabla completa.
+    
+    Los nulos, los histogramas y los extremos se combinan de forma exacta; los
+    bocetos de distintos se unen conservando los k hashes menores. Los
+    elementos None se ignoran, de modo que puede acumularse con
+    `perfil = fusionar_perfiles([perfil, perfilar(bloque)])`.
+    
+    Args:
+        perfiles: Perfiles de `perfilar`
+    
+    Returns:
+        Perfil combinado
+    """
+    resultado = None
+    for perfil in perfiles:
+        if perfil is None:
+            continue
+        if resultado is None:
+            resultado = perfil
+            continue
+        columnas = dict(resultado['columnas'])
+        for col, perfil_col in perfil['columnas'].items():
+            columnas[col] = _fusionar_columna(columnas[col], perfil_col) if col in columnas else perfil_col
+        resultado = {'registros': resultado['registros'] + perfil['registros'], 'columnas': columnas}
+    
+    if resultado is None:
+        raise Exception("[ERROR] No se recibieron perfiles para fusionar")
+    
+    return resultado
+
+
+def estimar_distintos(perfil_columna: Dict) -> int:
+    """
+    Valores distintos de una columna: exacto si se conserva el histograma,
+    estimado con el boceto KMV en caso contrario.
+    """
+    if perfil_columna['histograma'] is not None:
+        return len(perfil_columna['histograma'])
+    boceto = perfil_columna['boceto']
+    if len(boceto) < TAMANO_BOCETO:
+        return len(boceto)
+    return int(round((TAMANO_BOCETO - 1) / (float(boceto[-1]) / 2.0**64)))
+
+
+def nulos_por_columna(perfil: Dict) -> pd.Series:
+    """Nulos por columna del perfil, como `df.isnull().sum()`"""
+    return pd.Series({col: p['nulos'] for col, p in perfil['columnas'].items()}, dtype=np.int64)
+
+
+def total_nulos(perfil: Dict) -> int:
+    """Total de valores nulos del perfil, como `df.isnull().sum().sum()`"""
+    return int(sum(p['nulos'] for p in perfil['columnas'].values()))
+
+
+def resumir_perfil(perfil: Dict) -> pd.DataFrame:
+    """
+    Tabla con una fila por columna: tipo, nulos, porcentaje de nulos,
+    distintos (y si el valor es exacto), mínimo y máximo.
+    
+    Args:
+        perfil: Perfil de `perfilar` o `fusionar_perfiles`
+    
+    Returns:
+        DataFrame indexado por columna
+    """
+    registros = perfil['registros']
+    filas = {
+        col: {
+            'tipo': p['tipo'],
+            'nulos': p['nulos'],
+            'porcentaje_nulos': (p['nulos'] / registros * 100) if registros else 0.0,
+            'distintos': estimar_distintos(p),
+            'distintos_exacto': p['histograma'] is not None or len(p['boceto']) < TAMANO_BOCETO,
+            'minimo': p['minimo'],
+            'maximo': p['maximo']
+        }
+        for col, p in perfil['columnas'].items()
+    }
+    return pd.DataFrame.from_dict(filas, orient='index')
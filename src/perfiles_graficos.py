@@ -0,0 +1,129 @@
+"""
+Módulo de perfiles de renderizado de gráficos (publicación o borrador)
+Sistema de Análisis de Dengue en Perú
+"""
+
+import matplotlib.pyplot as plt
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+# 'publicacion' es el renderizado de siempre (PNG a 300 dpi con márgenes
+# ajustados). 'borrador' está pensado para las ejecuciones rutinarias: baja
+# resolución, sin ajuste de márgenes, mapas de calor con pcolormesh sin
+# bordes de celda y WebP comprimido.
+PERFILES = {
+    'publicacion': {
+        'dpi': 300,
+        'ajustar_margenes': True,
+        'mapa_calor_rapido': False,
+        'extension': '.png',
+        'opciones_guardado': {}
+    },
+    'borrador': {
+        'dpi': 72,
+        'ajustar_margenes': False,
+        'mapa_calor_rapido': True,
+        'extension': '.webp',
+        'opciones_guardado': {'pil_kwargs': {'quality': 80, 'method': 0}}
+    }
+}
+PERFIL_POR_DEFECTO = 'publicacion'
+
+# Figura única del proceso cuando se generan paquetes por lotes: cada gráfico
+# la limpia y la redimensiona en lugar de crear y destruir una figura nueva
+_FIGURA_REUTILIZABLE = None
+
+PARAMETROS_MARGENES = ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+
+
+def validar_perfil(perfil: str) -> Dict:
+    """
+    Devuelve la configuración del perfil de renderizado.
+    
+    Args:
+        perfil: 'publicacion' o 'borrador'
+    
+    Returns:
+        Diccionario con la configuración del perfil
+    """
+    if perfil not in PERFILES:
+        raise ValueError(f"[ERROR] Perfil de renderizado desconocido: '{perfil}' "
+                         f"(opciones: {', '.join(PERFILES)})")
+    return PERFILES[perfil]
+
+
+def ruta_figura(ruta: str, perfil: str = PERFIL_POR_DEFECTO) -> str:
+    """Ruta con la extensión del formato del perfil ('serie.png' -> 'serie.webp' en borrador)"""
+    return str(Path(ruta).with_suffix(validar_perfil(perfil)['extension']))
+
+
+def ajustar_diseno(perfil: str = PERFIL_POR_DEFECTO):
+    """Ajusta los márgenes de la figura actual (solo en el perfil de publicación)"""
+    if validar_perfil(perfil)['ajustar_margenes']:
+        plt.tight_layout()
+
+
+def activar_figura_reutilizable():
+    """Hace que `crear_figura` reutilice una sola figura en este proceso (ej: procesos de lotes)"""
+    global _FIGURA_REUTILIZABLE
+    if _FIGURA_REUTILIZABLE is None:
+        _FIGURA_REUTILIZABLE = plt.figure()
+
+
+def crear_figura(nrows: int = 1, ncols: int = 1, figsize: Optional[Tuple[float, float]] = None):
+    """
+    Crea una figura con sus ejes, como `plt.subplots`.
+    
+    Si el proceso activó la figura reutilizable, se limpia esa figura, se
+    restauran su tamaño y sus márgenes y se dibujan en ella los nuevos ejes.
+    
+    Args:
+        nrows: Filas de ejes
+        ncols: Columnas de ejes
+        figsize: Tamaño en pulgadas (None usa el del estilo)
+    
+    Returns:
+        Tupla (figura, ejes)
+    """
+    figura = _FIGURA_REUTILIZABLE
+    if figura is None:
+        return plt.subplots(nrows, ncols, figsize=figsize)
+    
+    figura.clear()
+    figura.set_size_inches(figsize or plt.rcParams['figure.figsize'])
+    figura.subplots_adjust(**{k: plt.rcParams[f'figure.subplot.{k}'] for k in PARAMETROS_MARGENES})
+    plt.figure(figura.number)
+    
+    return figura, figura.subplots(nrows, ncols)
+
+
+def cerrar_figura():
+    """Cierra la figura actual (la figura reutilizable se conserva para el siguiente gráfico)"""
+    if _FIGURA_REUTILIZABLE is None:
+        plt.close()
+
+
+def guardar_figura(ruta: str, perfil: str = PERFIL_POR_DEFECTO, descripcion: Optional[str] = None) -> str:
+    """
+    Guarda la figura actual con la resolución y el formato del perfil.
+    
+    Args:
+        ruta: Ruta del gráfico (la extensión se reemplaza por la del perfil)
+        perfil: 'publicacion' o 'borrador'
+        descripcion: Nombre del gráfico para el mensaje (opcional)
+    
+    Returns:
+        Ruta del archivo escrito
+    """
+    configuracion = validar_perfil(perfil)
+    ruta = ruta_figura(ruta, perfil)
+    
+    opciones = dict(configuracion['opciones_guardado'])
+    if configuracion['ajustar_margenes']:
+        opciones['bbox_inches'] = 'tight'
+    plt.savefig(ruta, dpi=configuracion['dpi'], **opciones)
+    
+    print(f"[GRAFICO] {descripcion + ' guardado' if descripcion else 'Guardado'} en: {ruta}")
+    
+    return ruta
@@ -0,0 +1,218 @@
+"""
+Módulo de escritura atómica y lectura verificada de tablas procesadas
+Sistema de Análisis de Dengue en Perú
+"""
+
+import pandas as pd
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+from cache_datos import calcular_hash_archivo
+from esquema import aplicar_esquema, leer_csv_compacto
+
+
+# Formatos de una tabla procesada, en orden de preferencia de lectura (el más
+# rápido primero). Todas las variantes comparten el nombre base:
+# dengue_loreto_limpio.parquet, dengue_loreto_limpio.csv.zst, ...
+FORMATOS = ('parquet', 'csv.zst', 'csv.gz', 'csv')
+COMPRESION_CSV = {'csv': None, 'csv.gz': 'gzip', 'csv.zst': 'zstd'}
+SUFIJO_SUMA = '.blake2b'
+
+
+def ruta_base(ruta_archivo: str) -> Path:
+    """Ruta sin extensión de formato ('datos.csv.gz' -> 'datos')"""
+    ruta = Path(ruta_archivo)
+    formato = formato_de(ruta)
+    return ruta.with_name(ruta.name[:-len(formato) - 1]) if formato else ruta
+
+
+def ruta_formato(ruta_archivo: str, formato: str) -> Path:
+    """Ruta de la variante de la tabla en el formato indicado"""
+    base = ruta_base(ruta_archivo)
+    return base.with_name(f"{base.name}.{formato}")
+
+
+def formato_de(ruta_archivo: str) -> Optional[str]:
+    """Formato de la variante según su extensión ('datos.csv.gz' -> 'csv.gz')"""
+    nombre = Path(ruta_archivo).name
+    return next((formato for formato in FORMATOS if nombre.endswith('.' + formato)), None)
+
+
+def ruta_suma(ruta_archivo: Path) -> Path:
+    """Ruta del archivo con la suma de verificación de `ruta_archivo`"""
+    return ruta_archivo.with_name(ruta_archivo.name + SUFIJO_SUMA)
+
+
+def registrar_suma(ruta_archivo: Path) -> str:
+    """
+    Escribe la suma de verificación (BLAKE2b) junto al archivo.
+    
+    Args:
+        ruta_archivo: Archivo ya escrito
+    
+    Returns:
+        Hash hexadecimal del contenido
+    """
+    suma = calcular_hash_archivo(str(ruta_archivo))
+    ruta = ruta_suma(ruta_archivo)
+    ruta_tmp = ruta.with_name(ruta.name + '.tmp')
+    ruta_tmp.write_text(f"{suma}  {ruta_archivo.name}\n", encoding='utf-8')
+    ruta_tmp.replace(ruta)
+    return suma
+
+
+def verificar_suma(ruta_archivo: Path) -> Optional[bool]:
+    """
+    Comprueba el archivo contra su suma de verificación.
+    
+    Args:
+        ruta_archivo: Archivo a comprobar
+    
+    Returns:
+        True si coincide, False si no coincide, None si no hay suma registrada
+    """
+    ruta = ruta_suma(ruta_archivo)
+    if not ruta.exists():
+        return None
+    esperada = ruta.read_text(encoding='utf-8').split()[0]
+    return calcular_hash_archivo(str(ruta_archivo)) == esperada
+
+
+def escribir_atomico(ruta_archivo: Path, escribir: Callable[[Path], None]) -> Path:
+    """
+    Escribe en un temporal, lo renombra sobre el destino y registra su suma.
+    
+    Si la escritura falla, el archivo anterior queda intacto. La suma anterior
+    se elimina antes del renombrado, de modo que una interrupción nunca deja
+    el archivo nuevo junto a la suma del anterior (un archivo sin suma se
+    acepta, uno con la suma de otro se descartaría en `buscar_variante`).
+    
+    Args:
+        ruta_archivo: Archivo de destino
+        escribir: Función que escribe el contenido en la ruta recibida
+    
+    Returns:
+        Ruta del archivo escrito
+    """
+    ruta_archivo.parent.mkdir(parents=True, exist_ok=True)
+    ruta_tmp = ruta_archivo.with_name(ruta_archivo.name + '.tmp')
+    try:
+        escribir(ruta_tmp)
+        ruta_suma(ruta_archivo).unlink(missing_ok=True)
+        ruta_tmp.replace(ruta_archivo)
+    finally:
+        if ruta_tmp.exists():
+            ruta_tmp.unlink()
+    registrar_suma(ruta_archivo)
+    return ruta_archivo
+
+
+def eliminar_variantes(ruta_archivo: str, conservar: Sequence[str] = ()) -> None:
+    """Elimina las variantes de la tabla (y sus sumas) en formatos no conservados"""
+    for formato in FORMATOS:
+        if formato in conservar:
+            continue
+        ruta = ruta_formato(ruta_archivo, formato)
+        for archivo in (ruta, ruta_suma(ruta)):
+            if archivo.exists():
+                archivo.unlink()
+
+
+def guardar_tabla(df: pd.DataFrame, ruta_archivo: str, formatos: Sequence[str] = ('csv',)) -> List[Path]:
+    """
+    Guarda la tabla en uno o varios formatos, de forma atómica y con suma de verificación.
+    
+    Parquet se escribe con zstd y codificación por diccionario (las columnas
+    categóricas se guardan como diccionario). Los CSV comprimidos usan gzip
+    o zstd. Las variantes de formatos no pedidos se eliminan para que los
+    lectores no tomen una versión anterior.
+    
+    Args:
+        df: DataFrame a guardar
+        ruta_archivo: Ruta de la tabla (la extensión se reemplaza por la de cada formato)
+        formatos: Formatos a escribir (ver FORMATOS)
+    
+    Returns:
+        Rutas escritas
+    """
+    escritas = {}
+    for formato in formatos:
+        if formato not in FORMATOS:
+            raise ValueError(f"[ERROR] Formato desconocido: '{formato}' (opciones: {', '.join(FORMATOS)})")
+        ruta = ruta_formato(ruta_archivo, formato)
+    
+        if formato == 'parquet':
+            escribir = lambda tmp: df.to_parquet(tmp, index=False, compression='zstd', use_dictionary=True)
+        else:
+            compresion = COMPRESION_CSV[formato]
+            escribir = lambda tmp, c=compresion: df.to_csv(tmp, index=False, encoding='utf-8',
+                                                           compression=c)
+        try:
+            escritas[formato] = escribir_atomico(ruta, escribir)
+        except ImportError as e:
+            print(f"[AVISO] Formato {formato} no disponible ({e}), se omite")
+    
+    if not escritas:
+        raise Exception(f"[ERROR] No se pudo escribir ningun formato de: {ruta_archivo}")
+    
+    eliminar_variantes(ruta_archivo, conservar=list(escritas))
+    
+    return list(escritas.values())
+
+
+def buscar_variante(ruta_archivo: str) -> Optional[Path]:
+    """
+    Devuelve la variante más rápida de leer cuya suma de verificación es válida.
+    
+    Las variantes sin suma registrada (escritas antes de existir las sumas)
+    se aceptan; las que no coinciden se descartan con un aviso.
+    
+    Args:
+        ruta_archivo: Ruta de la tabla (cualquier variante o la ruta base)
+    
+    Returns:
+        Ruta de la variante elegida, o None si no hay ninguna válida
+    """
+    for formato in FORMATOS:
+        ruta = ruta_formato(ruta_archivo, formato)
+        if not ruta.exists():
+            continue
+        if formato == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                continue
+        if formato == 'csv.zst':
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                continue
+        if verificar_suma(ruta) is False:
+            print(f"[AVISO] Suma de verificacion invalida, se descarta: {ruta}")
+            continue
+        return ruta
+    return None
+
+
+def cargar_tabla(ruta_archivo: str, compacto: bool = True, **kwargs) -> pd.DataFrame:
+    """
+    Carga una tabla procesada eligiendo la variante verificada más rápida.
+    
+    Args:
+        ruta_archivo: Ruta de la tabla (cualquier variante o la ruta base)
+        compacto: Si True, aplica el esquema de tipos compactos
+        **kwargs: Argumentos adicionales para la lectura de CSV
+    
+    Returns:
+        DataFrame con la tabla
+    """
+    ruta = buscar_variante(ruta_archivo)
+    if ruta is None:
+        raise FileNotFoundError(f"[ERROR] No existe una version valida de: {ruta_base(ruta_archivo)}")
+    
+    if ruta.name.endswith('.parquet'):
+        df = pd.read_parquet(ruta)
+        return aplicar_esquema(df) if compacto else df
+    if compacto:
+        return leer_csv_compacto(ruta, **kwargs)
+    return pd.read_csv(ruta, **kwargs)
@@ -0,0 +1,290 @@
+"""
+Módulo de reglas de validación declarativas con salida a cuarentena
+Sistema de Análisis de Dengue en Perú
+"""
+
+import json
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from calendario_epi import fecha_inicio_semana
+
+
+# Reglas por defecto: las mismas validaciones que aplicaba la limpieza.
+# Tipos de regla:
+#   - 'no_nulo':    'columnas' no pueden tener nulos
+#   - 'rango':      'columna' entre 'minimo' y 'maximo' (inclusivos; nulos fallan)
+#   - 'categorias': 'columna' dentro de 'valores' ('permitir_nulos' opcional)
+#   - 'calendario': las 'columnas' (año, semana) existen en el calendario
+#                   epidemiológico (falla la semana 53 de los años de 52 semanas;
+#                   los nulos y las semanas fuera de 1-53 quedan para las otras reglas)
+#   - 'expresion':  'expresion' booleana entre columnas evaluada con DataFrame.eval,
+#                   ej: {'codigo': 'SEMANA_53_INVALIDA', 'tipo': 'expresion',
+#                        'expresion': 'semana <= 52 | ano in [2003, 2008, 2014, 2020]', ...}
+# El orden importa: la regla i ocupa el bit i del código de motivos, y la
+# primera regla que falla (bit más bajo) es la que se informa como causa.
+REGLAS_POR_DEFECTO = [
+    {'codigo': 'NULO_CRITICO', 'tipo': 'no_nulo',
+     'columnas': ['departamento', 'provincia', 'ano', 'semana'],
+     'descripcion': 'valores nulos en columnas criticas'},
+    {'codigo': 'ANO_FUERA_RANGO', 'tipo': 'rango', 'columna': 'ano',
+     'minimo': 2000, 'maximo': 2024, 'descripcion': 'anos fuera de rango'},
+    {'codigo': 'SEMANA_FUERA_RANGO', 'tipo': 'rango', 'columna': 'semana',
+     'minimo': 1, 'maximo': 53, 'descripcion': 'semanas fuera de rango'},
+    {'codigo': 'SEMANA_INEXISTENTE', 'tipo': 'calendario', 'columnas': ['ano', 'semana'],
+     'descripcion': 'semana 53 en anos de 52 semanas'},
+    {'codigo': 'EDAD_INVALIDA', 'tipo': 'rango', 'columna': 'edad',
+     'minimo': 0, 'maximo': 120, 'descripcion': 'edades invalidas'},
+]
+
+MAXIMO_REGLAS = 64
+
+
+def cargar_reglas(ruta_archivo: str) -> List[Dict]:
+    """
+    Carga una lista de reglas desde un archivo JSON.
+    
+    Args:
+        ruta_archivo: Ruta al JSON (lista de reglas con el formato de REGLAS_POR_DEFECTO)
+    
+    Returns:
+        Lista de reglas
+    """
+    with open(ruta_archivo, 'r', encoding='utf-8') as f:
+        reglas = json.load(f)
+    
+    print(f"[REGLAS] {len(reglas)} reglas cargadas desde: {ruta_archivo}")
+    
+    return reglas
+
+
+def seleccionar_reglas(codigos: List[str], reglas: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Devuelve el subconjunto de reglas con los códigos indicados (en su orden original).
+    
+    Args:
+        codigos: Códigos de las reglas a conservar
+        reglas: Lista de reglas (por defecto REGLAS_POR_DEFECTO)
+    
+    Returns:
+        Lista de reglas
+    """
+    reglas = REGLAS_POR_DEFECTO if reglas is None else reglas
+    return [regla for regla in reglas if regla['codigo'] in codigos]
+
+
+def _compilar_regla(regla: Dict) -> Tuple[List[str], Callable[[pd.DataFrame], pd.Series]]:
+    """Devuelve las columnas que usa la regla y una función df -> máscara de filas válidas"""
+    tipo = regla['tipo']
+    
+    if tipo == 'no_nulo':
+        columnas = list(regla['columnas'])
+        return columnas, lambda df: df[columnas].notnull().all(axis=1)
+    
+    if tipo == 'rango':
+        col = regla['columna']
+        minimo, maximo = regla.get('minimo'), regla.get('maximo')
+        
+        def dentro_de_rango(df):
+            valida = df[col].notnull()
+            if minimo is not None:
+                valida &= df[col] >= minimo
+            if maximo is not None:
+                valida &= df[col] <= maximo
+            return valida
+        return [col], dentro_de_rango
+    
+    if tipo == 'categorias':
+        col = regla['columna']
+        valores = list(regla['valores'])
+        permitir_nulos = regla.get('permitir_nulos', False)
+        return [col], lambda df: df[col].isin(valores) | (df[col].isnull() & permitir_nulos)
+    
+    if tipo == 'calendario':
+        col_ano, col_semana = regla['columnas']
+        
+        def semana_existe(df):
+            # Solo la semana 53 puede faltar en el calendario; sin ella no hay fecha
+            semana_53 = (df[col_semana] == 53).fillna(False).astype(bool)
+            fechas = fecha_inicio_semana(df[col_ano], df[col_semana])
+            return ~semana_53 | fechas.notna()
+        return [col_ano, col_semana], semana_existe
+    
+    if tipo == 'expresion':
+        expresion = regla['expresion']
+        return list(regla.get('columnas', [])), lambda df: df.eval(expresion).fillna(False).astype(bool)
+    
+    raise ValueError(f"[ERROR] Tipo de regla desconocido: '{tipo}' ({regla.get('codigo')})")
+
+
+def evaluar_reglas(df: pd.DataFrame, reglas: Optional[List[Dict]] = None) -> np.ndarray:
+    """
+    Evalúa todas las reglas y devuelve un código de motivos por fila.
+    
+    Cada regla que falla enciende su bit (la regla i es el bit i). Las reglas
+    cuyas columnas no están en `df` se omiten.
+    
+    Args:
+        df: DataFrame a validar
+        reglas: Lista de reglas (por defecto REGLAS_POR_DEFECTO)
+    
+    Returns:
+        Arreglo uint64 con el código de motivos de cada fila (0 = válida)
+    """
+    reglas = REGLAS_POR_DEFECTO if reglas is None else reglas
+    if len(reglas) > MAXIMO_REGLAS:
+        raise ValueError(f"[ERROR] Se admiten como maximo {MAXIMO_REGLAS} reglas")
+    
+    motivos = np.zeros(len(df), dtype=np.uint64)
+    for bit, regla in enumerate(reglas):
+        columnas, es_valida = _compilar_regla(regla)
+        if not all(col in df.columns for col in columnas):
+            continue
+        falla = ~np.asarray(es_valida(df), dtype=bool)
+        motivos[falla] |= np.uint64(1 << bit)
+    
+    return motivos
+
+
+def primer_motivo(motivos: np.ndarray) -> np.ndarray:
+    """
+    Índice de la primera regla que falla en cada fila (-1 si la fila es válida).
+    
+    Args:
+        motivos: Códigos de `evaluar_reglas`
+    
+    Returns:
+        Arreglo int con el índice de regla del bit más bajo encendido
+    """
+    motivos = np.asarray(motivos, dtype=np.uint64)
+    bit_bajo = motivos & (~motivos + np.uint64(1))
+    primero = np.full(len(motivos), -1, dtype=np.int64)
+    con_motivo = motivos != 0
+    primero[con_motivo] = np.log2(bit_bajo[con_motivo].astype(np.float64)).astype(np.int64)
+    return primero
+
+
+def resumir_motivos(motivos: np.ndarray, reglas: Optional[List[Dict]] = None) -> pd.DataFrame:
+    """
+    Cuenta las filas rechazadas por regla.
+    
+    'rechazadas' cuenta las filas cuya primera regla fallida es esa (la suma
+    es el total rechazado); 'fallas' cuenta todas las filas que la incumplen.
+    
+    Args:
+        motivos: Códigos de `evaluar_reglas`
+        reglas: Lista de reglas usada en la evaluación
+    
+    Returns:
+        DataFrame con 'codigo', 'descripcion', 'rechazadas' y 'fallas'
+    """
+    reglas = REGLAS_POR_DEFECTO if reglas is None else reglas
+    primero = primer_motivo(motivos)
+    rechazadas = np.bincount(primero[primero >= 0], minlength=len(reglas))
+    
+    return pd.DataFrame({
+        'codigo': [regla['codigo'] for regla in reglas],
+        'descripcion': [regla.get('descripcion', regla['codigo']) for regla in reglas],
+        'rechazadas': rechazadas[:len(reglas)],
+        'fallas': [int(((motivos >> np.uint64(bit)) & np.uint64(1)).sum()) for bit in range(len(reglas))]
+    })
+
+
+def describir_motivos(motivos: np.ndarray, reglas: Optional[List[Dict]] = None) -> pd.Series:
+    """
+    Convierte los códigos de motivos en texto ('ANO_FUERA_RANGO|EDAD_INVALIDA').
+    
+    El texto se arma una vez por código distinto y se reparte a las filas.
+    
+    Args:
+        motivos: Códigos de `evaluar_reglas`
+        reglas: Lista de reglas usada en la evaluación
+    
+    Returns:
+        Serie de texto con un valor por fila ('' para las filas válidas)
+    """
+    reglas = REGLAS_POR_DEFECTO if reglas is None else reglas
+    codigos, inversa = np.unique(motivos, return_inverse=True)
+    
+    textos = np.array(['|'.join(regla['codigo'] for bit, regla in enumerate(reglas)
+                                if int(codigo) >> bit & 1)
+                       for codigo in codigos], dtype=object)
+    
+    return pd.Series(textos[inversa.ravel()], dtype=object)
+
+
+def guardar_cuarentena(df: pd.DataFrame, motivos: np.ndarray, ruta_salida: str,
+                       reglas: Optional[List[Dict]] = None) -> int:
+    """
+    Escribe las filas rechazadas con sus motivos en un archivo de cuarentena.
+    
+    Args:
+        df: DataFrame evaluado
+        motivos: Códigos de `evaluar_reglas` para `df`
+        ruta_salida: Ruta del CSV de cuarentena
+        reglas: Lista de reglas usada en la evaluación
+    
+    Returns:
+        Número de filas en cuarentena
+    """
+    df_cuarentena = tabla_cuarentena(df, motivos, reglas)
+    
+    Path(ruta_salida).parent.mkdir(parents=True, exist_ok=True)
+    df_cuarentena.to_csv(ruta_salida, index=False, encoding='utf-8')
+    print(f"[CUARENTENA] {len(df_cuarentena):,} registros rechazados guardados en: {ruta_salida}")
+    
+    return len(df_cuarentena)
+
+
+def tabla_cuarentena(df: pd.DataFrame, motivos: np.ndarray,
+                     reglas: Optional[List[Dict]] = None) -> pd.DataFrame:
+    """
+    Filas rechazadas con las columnas 'codigo_motivos' y 'motivos'.
+    
+    Args:
+        df: DataFrame evaluado
+        motivos: Códigos de `evaluar_reglas` para `df`
+        reglas: Lista de reglas usada en la evaluación
+    
+    Returns:
+        DataFrame de cuarentena
+    """
+    rechazadas = np.flatnonzero(motivos)
+    
+    return df.take(rechazadas).assign(
+        codigo_motivos=motivos[rechazadas],
+        motivos=describir_motivos(motivos[rechazadas], reglas).to_numpy()
+    )
+
+
+def reportar_motivos(resumen: pd.DataFrame) -> None:
+    """Imprime los registros eliminados por cada regla (primera regla fallida)"""
+    for _, fila in resumen.iterrows():
+        if fila['rechazadas'] > 0:
+            print(f"[VALIDACION] Eliminados {fila['rechazadas']:,} registros con {fila['descripcion']}")
+
+
+def aplicar_reglas(df: pd.DataFrame, reglas: Optional[List[Dict]] = None,
+                   ruta_cuarentena: Optional[str] = None) -> pd.DataFrame:
+    """
+    Evalúa las reglas en una sola pasada y conserva solo las filas válidas.
+    
+    Args:
+        df: DataFrame a validar
+        reglas: Lista de reglas (por defecto REGLAS_POR_DEFECTO)
+        ruta_cuarentena: Si se indica, las filas rechazadas se guardan ahí
+            con sus motivos
+    
+    Returns:
+        DataFrame con las filas válidas
+    """
+    reglas = REGLAS_POR_DEFECTO if reglas is None else reglas
+    motivos = evaluar_reglas(df, reglas)
+    
+    reportar_motivos(resumir_motivos(motivos, reglas))
+    if ruta_cuarentena:
+        guardar_cuarentena(df, motivos, ruta_cuarentena, reglas)
+    
+    return df[motivos == 0].copy()